@@ -1,10 +1,30 @@
 #!/usr/bin/env python3
 """
 Script to add visual diagrams to all JOIN lesson files
+
+Each diagram's `result` is computed by running its `sql` over `tableA`/`tableB`
+in an in-memory SQLite DB, so the example can never disagree with what the
+JOIN really returns. The diagram (SVG) and the input/result tables (HTML)
+are rendered here, at build time, into content-hashed files under
+backend/lesson-assets/ that the backend serves as immutable static assets;
+the lesson JSON references them from `visualDiagrams[].assets`.
+
+Re-running the script replaces each lesson's `<id>-visual` concept in place
+and leaves files that are already current untouched.
 """
 
+import argparse
+import hashlib
 import json
 import os
+import sqlite3
+import sys
+from html import escape
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+from id_normalizer import detect_format, render, write_atomic
+from lesson_profiling import NULL_PROFILER, add_profile_arguments, profiling
 
 # Define visual diagrams for each JOIN type
 VISUAL_DIAGRAMS = {
@@ -15,6 +35,8 @@ VISUAL_DIAGRAMS = {
         "leftTable": "Employees",
         "rightTable": "Departments",
         "highlightedArea": "intersection",
+        "tableNames": ["employees", "departments"],
+        "sql": "SELECT e.id, e.name, e.dept_id, d.name AS dept_name FROM employees e INNER JOIN departments d ON e.dept_id = d.id",
         "example": {
             "tableA": [
                 {"id": 1, "name": "Alice", "dept_id": 1},
@@ -26,10 +48,6 @@ VISUAL_DIAGRAMS = {
                 {"id": 1, "name": "Engineering"},
                 {"id": 2, "name": "Marketing"},
                 {"id": 4, "name": "Sales"}
-            ],
-            "result": [
-                {"id": 1, "name": "Alice", "dept_id": 1, "dept_name": "Engineering"},
-                {"id": 2, "name": "Bob", "dept_id": 2, "dept_name": "Marketing"}
             ]
         }
     },
@@ -40,6 +58,8 @@ VISUAL_DIAGRAMS = {
         "leftTable": "Employees",
         "rightTable": "Departments",
         "highlightedArea": "left-and-intersection",
+        "tableNames": ["employees", "departments"],
+        "sql": "SELECT e.id, e.name, e.dept_id, d.name AS dept_name FROM employees e LEFT JOIN departments d ON e.dept_id = d.id",
         "example": {
             "tableA": [
                 {"id": 1, "name": "Alice", "dept_id": 1},
@@ -51,12 +71,6 @@ VISUAL_DIAGRAMS = {
                 {"id": 1, "name": "Engineering"},
                 {"id": 2, "name": "Marketing"},
                 {"id": 4, "name": "Sales"}
-            ],
-            "result": [
-                {"id": 1, "name": "Alice", "dept_id": 1, "dept_name": "Engineering"},
-                {"id": 2, "name": "Bob", "dept_id": 2, "dept_name": "Marketing"},
-                {"id": 3, "name": "Charlie", "dept_id": 3, "dept_name": None},
-                {"id": 4, "name": "Diana", "dept_id": None, "dept_name": None}
             ]
         }
     },
@@ -67,6 +81,8 @@ VISUAL_DIAGRAMS = {
         "leftTable": "Employees",
         "rightTable": "Departments",
         "highlightedArea": "right-and-intersection",
+        "tableNames": ["employees", "departments"],
+        "sql": "SELECT e.id, e.name, d.id AS dept_id, d.name AS dept_name FROM employees e RIGHT JOIN departments d ON e.dept_id = d.id",
         "example": {
             "tableA": [
                 {"id": 1, "name": "Alice", "dept_id": 1},
@@ -77,12 +93,6 @@ VISUAL_DIAGRAMS = {
                 {"id": 2, "name": "Marketing"},
                 {"id": 3, "name": "HR"},
                 {"id": 4, "name": "Sales"}
-            ],
-            "result": [
-                {"id": 1, "name": "Alice", "dept_id": 1, "dept_name": "Engineering"},
-                {"id": 2, "name": "Bob", "dept_id": 2, "dept_name": "Marketing"},
-                {"id": None, "name": None, "dept_id": 3, "dept_name": "HR"},
-                {"id": None, "name": None, "dept_id": 4, "dept_name": "Sales"}
             ]
         }
     },
@@ -93,6 +103,8 @@ VISUAL_DIAGRAMS = {
         "leftTable": "Employees",
         "rightTable": "Departments",
         "highlightedArea": "all",
+        "tableNames": ["employees", "departments"],
+        "sql": "SELECT e.id, e.name, COALESCE(e.dept_id, d.id) AS dept_id, d.name AS dept_name FROM employees e FULL OUTER JOIN departments d ON e.dept_id = d.id",
         "example": {
             "tableA": [
                 {"id": 1, "name": "Alice", "dept_id": 1},
@@ -103,12 +115,6 @@ VISUAL_DIAGRAMS = {
                 {"id": 1, "name": "Engineering"},
                 {"id": 2, "name": "Marketing"},
                 {"id": 4, "name": "Sales"}
-            ],
-            "result": [
-                {"id": 1, "name": "Alice", "dept_id": 1, "dept_name": "Engineering"},
-                {"id": 2, "name": "Bob", "dept_id": 2, "dept_name": "Marketing"},
-                {"id": 3, "name": "Charlie", "dept_id": None, "dept_name": None},
-                {"id": None, "name": None, "dept_id": 4, "dept_name": "Sales"}
             ]
         }
     },
@@ -119,6 +125,8 @@ VISUAL_DIAGRAMS = {
         "leftTable": "Sizes",
         "rightTable": "Colors",
         "highlightedArea": "all",
+        "tableNames": ["sizes", "colors"],
+        "sql": "SELECT s.size, c.color FROM sizes s CROSS JOIN colors c",
         "example": {
             "tableA": [
                 {"size": "Small"},
@@ -128,14 +136,6 @@ VISUAL_DIAGRAMS = {
             "tableB": [
                 {"color": "Red"},
                 {"color": "Blue"}
-            ],
-            "result": [
-                {"size": "Small", "color": "Red"},
-                {"size": "Small", "color": "Blue"},
-                {"size": "Medium", "color": "Red"},
-                {"size": "Medium", "color": "Blue"},
-                {"size": "Large", "color": "Red"},
-                {"size": "Large", "color": "Blue"}
             ]
         }
     },
@@ -146,6 +146,8 @@ VISUAL_DIAGRAMS = {
         "leftTable": "Employees (as Employee)",
         "rightTable": "Employees (as Manager)",
         "highlightedArea": "self-reference",
+        "tableNames": ["employees"],
+        "sql": "SELECT e.name AS employee, m.name AS manager FROM employees e INNER JOIN employees m ON e.manager_id = m.id",
         "example": {
             "tableA": [
                 {"id": 1, "name": "Alice", "manager_id": None},
@@ -153,22 +155,205 @@ VISUAL_DIAGRAMS = {
                 {"id": 3, "name": "Charlie", "manager_id": 1},
                 {"id": 4, "name": "Diana", "manager_id": 2}
             ],
-            "tableB": "Same as Table A",
-            "result": [
-                {"employee": "Bob", "manager": "Alice"},
-                {"employee": "Charlie", "manager": "Alice"},
-                {"employee": "Diana", "manager": "Bob"}
-            ]
+            "tableB": "Same as Table A"
         }
     }
 }
 
-def add_visual_to_lesson(lesson_id, lesson_file):
-    """Add visual diagram to a lesson JSON file"""
+ASSET_URL_PREFIX = "/lesson-assets"
+
+VENN_FILL = "#3b82f6"
+OUTLINE = "#64748b"
+LABEL = "#334155"
+
+
+# === Computing results ===
+
+def _create_table(conn, name, rows):
+    columns = list(rows[0].keys())
+    conn.execute(f"CREATE TABLE {name} ({', '.join(columns)})")
+    conn.executemany(f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                     [tuple(row.get(column) for column in columns) for row in rows])
+
+
+def compute_result(diagram):
+    """Run the diagram's JOIN over its example tables and return the rows as dicts."""
+    example = diagram["example"]
+    conn = sqlite3.connect(":memory:")
+    try:
+        names = diagram["tableNames"]
+        _create_table(conn, names[0], example["tableA"])
+        if isinstance(example["tableB"], list):
+            _create_table(conn, names[1], example["tableB"])
+        cursor = conn.execute(diagram["sql"])
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+    finally:
+        conn.close()
+
+
+# === Rendering ===
+
+def _svg(width, height, body, title):
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" width="{width}" '
+            f'height="{height}" role="img" aria-label="{escape(title)}">'
+            f'<title>{escape(title)}</title>{body}</svg>\n')
+
+
+def _text(x, y, text, anchor="middle", size=12):
+    return (f'<text x="{x}" y="{y}" text-anchor="{anchor}" font-family="sans-serif" font-size="{size}" '
+            f'fill="{LABEL}">{escape(str(text))}</text>')
+
+
+def render_venn(diagram):
+    left, right, r, cy = 95, 165, 60, 80
+    circle_a = f'<circle cx="{left}" cy="{cy}" r="{r}"/>'
+    circle_b = f'<circle cx="{right}" cy="{cy}" r="{r}"/>'
+    fill = f'fill="{VENN_FILL}" fill-opacity="0.55"'
+    area = diagram["highlightedArea"]
+    if area == "intersection":
+        shaded = f'<clipPath id="b">{circle_b}</clipPath><circle cx="{left}" cy="{cy}" r="{r}" {fill} clip-path="url(#b)"/>'
+    elif area == "left-and-intersection":
+        shaded = f'<circle cx="{left}" cy="{cy}" r="{r}" {fill}/>'
+    elif area == "right-and-intersection":
+        shaded = f'<circle cx="{right}" cy="{cy}" r="{r}" {fill}/>'
+    else:
+        shaded = f'<circle cx="{left}" cy="{cy}" r="{r}" {fill}/><circle cx="{right}" cy="{cy}" r="{r}" {fill}/>'
+    outlines = (f'<g fill="none" stroke="{OUTLINE}" stroke-width="2">'
+                f'<circle cx="{left}" cy="{cy}" r="{r}"/><circle cx="{right}" cy="{cy}" r="{r}"/></g>')
+    labels = _text(left - 25, cy + 4, diagram["leftTable"]) + _text(right + 25, cy + 4, diagram["rightTable"])
+    return _svg(260, 160, shaded + outlines + labels + _text(130, 155, diagram["joinType"], size=11),
+                f"{diagram['joinType']} diagram")
+
+
+def render_grid(diagram, result):
+    rows = list(dict.fromkeys(str(r[list(r)[0]]) for r in result))
+    cols = list(dict.fromkeys(str(r[list(r)[1]]) for r in result))
+    cell_w, cell_h, head_w, head_h = 90, 30, 80, 30
+    body = []
+    for j, col in enumerate(cols):
+        body.append(_text(head_w + j * cell_w + cell_w / 2, head_h - 10, col))
+    for i, row in enumerate(rows):
+        y = head_h + i * cell_h
+        body.append(_text(head_w - 8, y + 20, row, anchor="end"))
+        for j, col in enumerate(cols):
+            x = head_w + j * cell_w
+            body.append(f'<rect x="{x + 2}" y="{y + 2}" width="{cell_w - 4}" height="{cell_h - 4}" rx="4" '
+                        f'fill="{VENN_FILL}" fill-opacity="0.2" stroke="{OUTLINE}"/>')
+            body.append(_text(x + cell_w / 2, y + 19, f"{row} · {col}", size=11))
+    return _svg(head_w + len(cols) * cell_w, head_h + len(rows) * cell_h + 5, "".join(body),
+                f"{diagram['joinType']} diagram")
+
+
+def render_hierarchy(diagram):
+    people = diagram["example"]["tableA"]
+    by_id = {p["id"]: p for p in people}
+
+    def depth(person):
+        level = 0
+        while person.get("manager_id") in by_id and level < len(people):
+            person = by_id[person["manager_id"]]
+            level += 1
+        return level
+
+    levels = {}
+    for person in people:
+        levels.setdefault(depth(person), []).append(person)
+    node_w, node_h, gap_x, gap_y = 90, 28, 20, 50
+    width = max(len(group) for group in levels.values()) * (node_w + gap_x) + gap_x
+    positions = {}
+    for level, group in sorted(levels.items()):
+        offset = (width - len(group) * (node_w + gap_x) + gap_x) / 2
+        for i, person in enumerate(group):
+            positions[person["id"]] = (offset + i * (node_w + gap_x), 10 + level * (node_h + gap_y))
+    body = []
+    for person in people:
+        if person.get("manager_id") in positions:
+            x, y = positions[person["id"]]
+            mx, my = positions[person["manager_id"]]
+            body.append(f'<line x1="{mx + node_w / 2}" y1="{my + node_h}" x2="{x + node_w / 2}" y2="{y}" '
+                        f'stroke="{OUTLINE}" stroke-width="1.5"/>')
+    for person in people:
+        x, y = positions[person["id"]]
+        body.append(f'<rect x="{x}" y="{y}" width="{node_w}" height="{node_h}" rx="6" fill="{VENN_FILL}" '
+                    f'fill-opacity="0.2" stroke="{OUTLINE}"/>')
+        body.append(_text(x + node_w / 2, y + 18, person["name"]))
+    height = 10 + len(levels) * (node_h + gap_y) - gap_y + 10
+    return _svg(width, height, "".join(body), f"{diagram['joinType']} diagram")
+
+
+def render_diagram(diagram, result):
+    if diagram["type"] == "grid-diagram":
+        return render_grid(diagram, result)
+    if diagram["type"] == "hierarchy-diagram":
+        return render_hierarchy(diagram)
+    return render_venn(diagram)
+
+
+def _html_table(caption, rows):
+    if not rows:
+        return f'<table><caption>{escape(caption)}</caption><tbody><tr><td>(no rows)</td></tr></tbody></table>'
+    columns = list(rows[0].keys())
+    head = "".join(f"<th>{escape(str(c))}</th>" for c in columns)
+    body = "".join(
+        "<tr>" + "".join('<td class="null">NULL</td>' if row.get(c) is None else f"<td>{escape(str(row[c]))}</td>"
+                         for c in columns) + "</tr>"
+        for row in rows)
+    return f"<table><caption>{escape(caption)}</caption><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def render_tables(diagram, result):
+    """HTML fragment with the example's input tables and the JOIN result."""
+    example = diagram["example"]
+    parts = [_html_table(diagram["leftTable"], example["tableA"])]
+    if isinstance(example["tableB"], list):
+        parts.append(_html_table(diagram["rightTable"], example["tableB"]))
+    parts.append(f'<pre class="join-visual-sql">{escape(diagram["sql"])}</pre>')
+    parts.append(_html_table("Result", result))
+    return f'<div class="join-visual-tables">{"".join(parts)}</div>\n'
+
+
+# === Assets ===
+
+def write_asset(asset_dir, stem, suffix, text):
+    """
+    Write `text` to <stem>.<hash>.<suffix> (content-hashed, so it can be cached
+    forever), remove older versions of the same asset, and return its URL.
+    """
+    data = text.encode("utf-8")
+    name = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{suffix}"
+    path = asset_dir / name
+    if not path.exists():
+        tmp_path = asset_dir / f".{name}.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    for old in asset_dir.glob(f"{stem}.*.{suffix}"):
+        if old.name != name:
+            old.unlink()
+    return f"{ASSET_URL_PREFIX}/{name}"
+
+
+def build_visual(lesson_id, diagram, asset_dir):
+    """The diagram as stored in the lesson: computed result plus asset URLs."""
+    result = compute_result(diagram)
+    visual = {key: value for key, value in diagram.items() if key != "tableNames"}
+    visual["example"] = {**diagram["example"], "result": result}
+    visual["assets"] = {
+        "diagram": write_asset(asset_dir, f"{lesson_id}-diagram", "svg", render_diagram(diagram, result)),
+        "tables": write_asset(asset_dir, f"{lesson_id}-tables", "html", render_tables(diagram, result)),
+    }
+    return visual
+
+
+def add_visual_to_lesson(lesson_id, lesson_file, asset_dir, profiler=NULL_PROFILER):
+    """Add (or refresh) the visual diagram concept of a lesson JSON file"""
     
     # Read the lesson file
-    with open(lesson_file, 'r', encoding='utf-8') as f:
-        lesson_data = json.load(f)
+    with profiler.phase(lesson_id, "read"):
+        with open(lesson_file, 'rb') as f:
+            raw = f.read()
+    with profiler.phase(lesson_id, "parse"):
+        lesson_data = json.loads(raw)
     
     # Get the visual diagram for this JOIN type
     visual_diagram = VISUAL_DIAGRAMS.get(lesson_id)
@@ -177,37 +362,51 @@ def add_visual_to_lesson(lesson_id, lesson_file):
         print(f"No visual diagram defined for {lesson_id}")
         return False
     
-    # Add content structure if it doesn't exist
-    if 'content' not in lesson_data:
-        lesson_data['content'] = {}
-    
-    if 'theory' not in lesson_data['content']:
-        lesson_data['content']['theory'] = {}
-    
-    if 'concepts' not in lesson_data['content']['theory']:
-        lesson_data['content']['theory']['concepts'] = []
+    with profiler.phase(lesson_id, "transform"):
+        concepts = lesson_data.setdefault('content', {}).setdefault('theory', {}).setdefault('concepts', [])
     
-    # Add the visual diagram as a concept
-    visual_concept = {
-        "id": f"{lesson_id}-visual",
-        "title": f"Visual Guide to {visual_diagram['joinType']}",
-        "content": visual_diagram['description'],
-        "visualDiagrams": [visual_diagram]
-    }
-    
-    lesson_data['content']['theory']['concepts'].append(visual_concept)
+        visual_concept = {
+            "id": f"{lesson_id}-visual",
+            "title": f"Visual Guide to {visual_diagram['joinType']}",
+            "content": visual_diagram['description'],
+            "visualDiagrams": [build_visual(lesson_id, visual_diagram, asset_dir)]
+        }
     
+        # Replace the concept from an earlier run instead of adding another one
+        existing = [i for i, concept in enumerate(concepts) if concept.get('id') == visual_concept['id']]
+        if existing:
+            concepts[existing[0]] = visual_concept
+            for i in reversed(existing[1:]):
+                del concepts[i]
+        else:
+            concepts.append(visual_concept)
+        # Keep the file's own JSON style so only the concept shows up in diffs
+        output = render(lesson_data, detect_format(raw))
+
+    if output == raw:
+        print(f"✓ {lesson_id} visual diagram is up to date")
+        return True
+
     # Write back to file
-    with open(lesson_file, 'w', encoding='utf-8') as f:
-        json.dump(lesson_data, f, indent=4, ensure_ascii=False)
-    
-    print(f"✅ Added visual diagram to {lesson_id}")
+    with profiler.phase(lesson_id, "write"):
+        write_atomic(lesson_file, output)
+
+    print(f"✅ Updated visual diagram for {lesson_id}")
     return True
 
 def main():
     """Main function to process all JOIN lessons"""
+    parser = argparse.ArgumentParser(description="Add visual diagrams to the JOIN lessons")
+    parser.add_argument("--content-dir", default="backend/lesson-content",
+                        help="directory with the lesson JSON files")
+    parser.add_argument("--asset-dir", default="backend/lesson-assets",
+                        help="where the rendered SVG/HTML assets are written")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
     
-    lesson_dir = "backend/lesson-content"
+    lesson_dir = args.content_dir
+    asset_dir = Path(args.asset_dir)
+    asset_dir.mkdir(parents=True, exist_ok=True)
     join_lessons = [
         "lesson_inner-join.json",
         "lesson_left-join.json",
@@ -220,14 +419,15 @@ def main():
     print("Adding visual diagrams to JOIN lessons...")
     print("=" * 50)
     
-    for lesson_file in join_lessons:
-        lesson_path = os.path.join(lesson_dir, lesson_file)
-        lesson_id = lesson_file.replace("lesson_", "").replace(".json", "")
-        
-        if os.path.exists(lesson_path):
-            add_visual_to_lesson(lesson_id, lesson_path)
-        else:
-            print(f"❌ File not found: {lesson_path}")
+    with profiling(args.profile, "add_join_visuals", args.profile_out) as profiler:
+        for lesson_file in join_lessons:
+            lesson_path = os.path.join(lesson_dir, lesson_file)
+            lesson_id = lesson_file.replace("lesson_", "").replace(".json", "")
+            
+            if os.path.exists(lesson_path):
+                add_visual_to_lesson(lesson_id, lesson_path, asset_dir, profiler)
+            else:
+                print(f"❌ File not found: {lesson_path}")
     
     print("=" * 50)
     print("✨ Done! All JOIN lessons now have visual diagrams.")
@@ -1,28 +1,14 @@
-import json, os
-
-for filename in os.listdir("lesson-content"):
-    if filename.endswith(".json"):
-        path = f"lesson-content/{filename}"
-        with open(path, "r") as f:
-            lesson = json.load(f)
-
-        lesson_id = lesson["id"]
-
-        # Update quiz IDs
-        if "quiz" in lesson:
-            for q in lesson["quiz"]:
-                if not q["id"].startswith(lesson_id):
-                    q["id"] = f"{lesson_id}_{q['id']}"
-
-        # Update challenge step IDs
-        if "challenges" in lesson:
-            for ch in lesson["challenges"]:
-                ch["id"] = f"{lesson_id}_{ch['id']}"
-                for step in ch["steps"]:
-                    if not step["stepId"].startswith(lesson_id):
-                        step["stepId"] = f"{lesson_id}_{step['stepId']}"
-
-        with open(path, "w") as f:
-            json.dump(lesson, f, indent=2)
-
-print("✅ All lesson IDs updated.")
+# Superseded by tools/normalize-ids.py, which applies the practice, quiz,
+# challenge and step id rules in one idempotent pass and only rewrites files
+# whose bytes actually change. Kept so existing habits/scripts still work;
+# like the original script, it only rewrites quiz, challenge and challenge step ids.
+import runpy
+import sys
+from pathlib import Path
+
+NORMALIZER = Path(__file__).resolve().parent / "tools" / "normalize-ids.py"
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(NORMALIZER.parent))
+    sys.argv = [str(NORMALIZER), "--write", "--only", "quiz", "--only", "challenges", "--only", "steps", *sys.argv[1:]]
+    runpy.run_path(str(NORMALIZER), run_name="__main__")
@@ -5,12 +5,13 @@ const bodyParser = require('body-parser');
 const mongoose = require('mongoose');
 const rateLimit = require('express-rate-limit');
 const fetch = require('node-fetch');
+const path = require('path');
 require('dotenv').config();
 
 // Local services and utils
 const lessonService = require('./services/lessonService');
 const validationService = require('./services/validationService');
-const { getLessonDB } = require('./utils/db');
+const catalogService = require('./services/catalogService');
 const { sanitizeQuery } = require('./utils/security');
 
 const app = express();
@@ -195,6 +196,35 @@ app.get('/api/lessons/', (req, res) => {
   }
 });
 
+// Lesson catalog: summaries only, filterable by ?category= and ?difficulty=
+app.get('/api/catalog', async (req, res) => {
+  try {
+    const { category, difficulty } = req.query;
+    const lessons = await catalogService.listLessons({ category, difficulty });
+    res.json(lessons);
+  } catch (error) {
+    res.status(500).json({ success: false, error: 'Failed to load lesson catalog' });
+  }
+});
+
+app.get('/api/catalog/categories', async (req, res) => {
+  try {
+    res.json(await catalogService.listCategories());
+  } catch (error) {
+    res.status(500).json({ success: false, error: 'Failed to load lesson catalog' });
+  }
+});
+
+// Full-text search: ?q=...&section=theory|example|quiz|practice&limit=20
+app.get('/api/search', async (req, res) => {
+  try {
+    const { q, section, limit } = req.query;
+    res.json(await catalogService.searchLessons(q, { section, limit }));
+  } catch (error) {
+    res.status(500).json({ success: false, error: 'Failed to search lessons' });
+  }
+});
+
 // Validate query
 app.post('/api/validate', async (req, res) => {
   try {
@@ -245,14 +275,13 @@ app.post('/api/execute', async (req, res) => {
         });
       });
     } else {
-      const db = getLessonDB(lessonId);
-      db.all(sanitized, (err, rows) => {
-        db.close();
-        if (err) return res.json({ success: false, error: err.message });
-
+      try {
+        const rows = await validationService.runLessonQuery(lessonId, sanitized);
         const columns = rows.length > 0 ? Object.keys(rows[0]) : [];
         res.json({ success: true, data: rows, columns });
-      });
+      } catch (err) {
+        res.json({ success: false, error: err.message });
+      }
     }
   } catch (error) {
     res.status(500).json({ success: false, error: error.message });
@@ -312,6 +341,16 @@ app.post('/api/submit-feedback', feedbackLimiter, async (req, res) => {
 });
 
 
+// =================== STATIC LESSON ASSETS ===================
+// Diagrams and tables pre-rendered by add_join_visuals.py; file names carry a
+// content hash, so they never change and can be cached for good.
+app.use('/lesson-assets', express.static(path.join(__dirname, 'lesson-assets'), {
+  immutable: true,
+  maxAge: '1y',
+  index: false
+}));
+
+
 // =================== ERROR HANDLING ===================
 app.use((req, res) => {
   res.status(404).json({ success: false, error: 'Endpoint not found' });
@@ -0,0 +1,103 @@
+const sqlite3 = require('sqlite3');
+const path = require('path');
+const fs = require('fs');
+
+// Built by tools/build-lesson-catalog.py
+const CATALOG_PATH = path.resolve(__dirname, '../lesson-data', 'catalog.db');
+
+function query(sql, params = []) {
+  return new Promise((resolve, reject) => {
+    if (!fs.existsSync(CATALOG_PATH)) {
+      return reject(new Error('❌ Lesson catalog not found: catalog.db'));
+    }
+    const db = new sqlite3.Database(CATALOG_PATH, sqlite3.OPEN_READONLY);
+    db.all(sql, params, (err, rows) => {
+      db.close();
+      if (err) reject(err);
+      else resolve(rows);
+    });
+  });
+}
+
+// Lesson summaries, optionally filtered by category and/or difficulty.
+function listLessons({ category, difficulty } = {}) {
+  const clauses = [];
+  const params = [];
+  if (category) {
+    clauses.push('category = ?');
+    params.push(category);
+  }
+  if (difficulty) {
+    clauses.push('difficulty = ?');
+    params.push(difficulty);
+  }
+  const where = clauses.length ? ` WHERE ${clauses.join(' AND ')}` : '';
+  return query(
+    `SELECT id, title, category, difficulty, estimated_time AS estimatedTime,
+            (SELECT COUNT(*) FROM exercises e WHERE e.lesson_id = lessons.id) AS exerciseCount,
+            (SELECT COUNT(*) FROM quiz_items q WHERE q.lesson_id = lessons.id) AS quizCount
+     FROM lessons${where} ORDER BY position`,
+    params
+  );
+}
+
+function listCategories() {
+  return query(
+    `SELECT category, COUNT(*) AS lessonCount FROM lessons
+     GROUP BY category ORDER BY MIN(position)`
+  );
+}
+
+// Must match SEARCH_WEIGHTS / SNIPPET_TOKENS in tools/lesson_catalog.py.
+const SEARCH_WEIGHTS = '0.0, 0.0, 0.0, 5.0, 1.0';
+const SNIPPET_TOKENS = 16;
+const SEARCH_SECTIONS = ['theory', 'example', 'quiz', 'practice'];
+// Private-use characters mark the hit in a snippet until it has been escaped.
+const HIT_START = '\uE000';
+const HIT_END = '\uE001';
+const HTML_ESCAPES = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' };
+
+// Snippet text is raw lesson content (SQL with < and >): escape it, then
+// turn the hit markers into <mark> tags.
+function snippetHtml(snippet) {
+  return String(snippet || '')
+    .replace(/[&<>"']/g, (c) => HTML_ESCAPES[c])
+    .split(HIT_START).join('<mark>')
+    .split(HIT_END).join('</mark>');
+}
+
+// Free text -> FTS5 MATCH expression, same as match_query() in
+// tools/lesson_catalog.py: every word must match, the last one as a prefix.
+function matchQuery(text) {
+  const words = String(text || '').match(/[\p{L}\p{N}_]+/gu);
+  if (!words) return null;
+  const terms = words.map((word) => `"${word}"`);
+  terms[terms.length - 1] += '*';
+  return terms.join(' ');
+}
+
+// Full-text search over lesson theory, examples, quiz and practice, best
+// (lowest BM25) first. Each hit names the lesson and the quiz/exercise id.
+async function searchLessons(text, { section, limit = 20 } = {}) {
+  const expression = matchQuery(text);
+  if (!expression) return [];
+  const params = [expression];
+  let sectionClause = '';
+  if (section && SEARCH_SECTIONS.includes(section)) {
+    sectionClause = ' AND s.section = ?';
+    params.push(section);
+  }
+  params.push(Math.min(Math.max(parseInt(limit, 10) || 20, 1), 100));
+  const hits = await query(
+    `SELECT s.lesson_id AS lessonId, l.title AS lessonTitle, s.section, s.item_id AS itemId,
+            s.title, snippet(search, 4, '${HIT_START}', '${HIT_END}', '…', ${SNIPPET_TOKENS}) AS snippet,
+            bm25(search, ${SEARCH_WEIGHTS}) AS score
+     FROM search s LEFT JOIN lessons l ON l.id = s.lesson_id
+     WHERE search MATCH ?${sectionClause}
+     ORDER BY score LIMIT ?`,
+    params
+  );
+  return hits.map((hit) => ({ ...hit, snippet: snippetHtml(hit.snippet) }));
+}
+
+module.exports = { listLessons, listCategories, searchLessons };
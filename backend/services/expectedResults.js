@@ -0,0 +1,93 @@
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+
+// Sidecars written by tools/build-expected-results.py, next to each lesson DB.
+const LESSON_DATA_DIR = path.resolve(__dirname, '../lesson-data');
+const ARTIFACT_VERSION = 2;
+const MOD = 1n << 256n;
+
+// lessonId -> { stamp, artifact }
+const cache = new Map();
+
+function fileSha256(filePath) {
+  return crypto.createHash('sha256').update(fs.readFileSync(filePath)).digest('hex');
+}
+
+// Returns the lesson's expected-results artifact, or null if it is missing or
+// was computed from a different version of the lesson DB.
+function getExpectedResults(lessonId) {
+  const dbPath = path.join(LESSON_DATA_DIR, `lesson_${lessonId}.db`);
+  const sidecarPath = path.join(LESSON_DATA_DIR, `lesson_${lessonId}.expected.json`);
+  if (!fs.existsSync(dbPath) || !fs.existsSync(sidecarPath)) return null;
+
+  const dbStat = fs.statSync(dbPath);
+  const sidecarStat = fs.statSync(sidecarPath);
+  const stamp = `${dbStat.mtimeMs}:${dbStat.size}:${sidecarStat.mtimeMs}:${sidecarStat.size}`;
+
+  const cached = cache.get(lessonId);
+  if (cached && cached.stamp === stamp) return cached.artifact;
+
+  let artifact = null;
+  try {
+    const parsed = JSON.parse(fs.readFileSync(sidecarPath, 'utf8'));
+    if (parsed.version === ARTIFACT_VERSION && parsed.db_sha256 === fileSha256(dbPath)) {
+      artifact = parsed;
+    }
+  } catch (err) {
+    artifact = null;
+  }
+  cache.set(lessonId, { stamp, artifact });
+  return artifact;
+}
+
+// Expected result for one exercise, only when it can be graded from the
+// fingerprint alone (a row-returning solution with unique column names).
+function getExpectedResult(lessonId, exerciseId) {
+  const artifact = getExpectedResults(lessonId);
+  const entry = artifact && artifact.exercises[exerciseId];
+  if (!entry || entry.status !== 'ok' || entry.type !== 'rows') return null;
+  if (new Set(entry.columns).size !== entry.columns.length) return null;
+  return entry;
+}
+
+// Must match canonical_value() in tools/expected_results.py; both are checked
+// against canonical-values.json (node test-canonical-values.js).
+// Integers are written out in full (BigInt, never 1e+21), other numbers as
+// their shortest round-trip digits in exponent form without "+" (1e-7, 1.5e0).
+function canonicalValue(value) {
+  if (value === null || value === undefined) return 'n';
+  if (typeof value === 'bigint') value = Number(value);
+  if (typeof value === 'number') {
+    return Number.isInteger(value)
+      ? `i:${BigInt(value)}`
+      : `f:${value.toExponential().replace('e+', 'e')}`;
+  }
+  if (Buffer.isBuffer(value)) return `b:${value.toString('hex')}`;
+  return `s:${value}`;
+}
+
+// Order-insensitive multiset fingerprint, same as fingerprint_rows() in Python.
+function fingerprintRows(rows) {
+  let total = 0n;
+  for (const row of rows) {
+    const text = Object.keys(row).sort()
+      .map(key => `${key}\x1e${canonicalValue(row[key])}`)
+      .join('\x1f');
+    const digest = crypto.createHash('sha256').update(text, 'utf8').digest('hex');
+    total = (total + BigInt(`0x${digest}`)) % MOD;
+  }
+  return total.toString(16).padStart(64, '0');
+}
+
+function matchesExpected(rows, expected) {
+  if (!Array.isArray(rows) || rows.length !== expected.row_count) return false;
+  if (rows.length > 0) {
+    const keys = Object.keys(rows[0]).sort();
+    const columns = [...expected.columns].sort();
+    if (keys.length !== columns.length || keys.some((key, i) => key !== columns[i])) return false;
+  }
+  return fingerprintRows(rows) === expected.fingerprint;
+}
+
+module.exports = { getExpectedResult, canonicalValue, fingerprintRows, matchesExpected };
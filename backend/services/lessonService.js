@@ -1,9 +1,19 @@
 const fs = require('fs');
 const path = require('path');
+const { createBundleCache } = require('../utils/lessonBundle');
 
 const LESSON_CONTENT_DIR = path.resolve(__dirname, '../lesson-content');
 
+// Opt-in: serve lessons from a bundle compiled by tools/build-lesson-bundle.py
+// (e.g. LESSON_BUNDLE=lesson-data/lessons.bundle). Rebuild it after editing lessons.
+const currentBundle = process.env.LESSON_BUNDLE
+  ? createBundleCache(path.resolve(__dirname, '..', process.env.LESSON_BUNDLE))
+  : () => null;
+
 function getLesson(lessonId) {
+  const bundle = currentBundle();
+  if (bundle) return bundle.get(lessonId);
+
   const lessonPath = path.join(LESSON_CONTENT_DIR, `lesson_${lessonId}.json`);
   if (!fs.existsSync(lessonPath)) return null;
   const raw = fs.readFileSync(lessonPath, 'utf8');
@@ -11,6 +21,9 @@ function getLesson(lessonId) {
 }
 
 function getAllLessons() {
+  const bundle = currentBundle();
+  if (bundle) return bundle.all();
+
   const files = fs.readdirSync(LESSON_CONTENT_DIR)
     .filter(file => file.endsWith('.json'));
   return files.map(file => {
@@ -1,6 +1,9 @@
 const { getLessonDB, getTempLessonDB, cleanupTempDB } = require('../utils/db');
 const { sanitizeQuery } = require('../utils/security');
 const lessonService = require('./lessonService');
+const { getExpectedResult, matchesExpected } = require('./expectedResults');
+const queryEngine = require('../utils/queryEngine');
+const { getQueryBudget, armDeadline } = require('../utils/queryBudgets');
 
 // A more robust function to compare two arrays of query results.
 // It is immune to row order and column order.
@@ -50,17 +53,19 @@ async function validateSolution(userQuery, lessonId, exerciseId) {
     // Check if this lesson teaches DDL operations
     const isDDLLesson = ['alter-table', 'create-table', 'drop-table', 'data-definition'].includes(lessonId);
 
-    // For DDL operations, create separate temporary databases for user and correct queries
+    // For DDL operations, create separate temporary databases for user and correct queries.
+    // Read-only lessons go through runLessonQuery (pooled engine or a one-off handle).
     if (isDDLLesson) {
       userDb = getTempLessonDB(lessonId);
       correctDb = getTempLessonDB(lessonId);
-    } else {
-      userDb = getLessonDB(lessonId);
-      correctDb = userDb; // Use same db for read-only operations
     }
+    const { deadlineMs } = getQueryBudget(lessonId);
+    const run = (db, query) => (isDDLLesson
+      ? runQuery(db, query, true, deadlineMs)
+      : runLessonQuery(lessonId, query));
 
     // Run both queries
-    const userRes = await runQuery(userDb, userQuery, isDDLLesson).catch(err => {
+    const userRes = await run(userDb, userQuery).catch(err => {
       return { error: err.message };
     });
 
@@ -74,7 +79,48 @@ async function validateSolution(userQuery, lessonId, exerciseId) {
       };
     }
 
-    const correctRes = await runQuery(correctDb, exercise.solution, isDDLLesson);
+    // Precomputed fingerprint of the reference result: a match means we can
+    // skip running the solution. On a mismatch fall through to the full
+    // comparison so feedback still includes the expected rows.
+    if (!isDDLLesson) {
+      const expected = getExpectedResult(lessonId, exerciseId);
+      if (expected && matchesExpected(userRes, expected)) {
+        return {
+          valid: true,
+          message: 'Correct! Well done.',
+          userResult: userRes,
+          correctResult: userRes
+        };
+      }
+    }
+
+    // Let the query engine grade it when it runs: duplicate rows count, numbers
+    // get a tolerance and the response carries a diff of missing/extra rows.
+    // The engine grades the rows we already have and runs only the solution;
+    // the expected output shown is its bounded sample of the reference rows.
+    if (!isDDLLesson && queryEngine.isEnabled()) {
+      const verdict = await queryEngine.compareQuery(
+        lessonId, userRes, exercise.solution, exercise.compare
+      ).catch(() => null);
+      if (verdict) {
+        return {
+          valid: verdict.equal,
+          message: verdict.equal ? 'Correct! Well done.' : 'Incorrect. Compare your results with the expected output.',
+          userResult: userRes,
+          correctResult: verdict.equal ? userRes : queryEngine.toObjects(verdict.columns, verdict.sample),
+          correctRowCount: verdict.expected_rows,
+          diff: {
+            reason: verdict.reason,
+            missing: verdict.missing,
+            extra: verdict.extra,
+            missingCount: verdict.missing_count,
+            extraCount: verdict.extra_count
+          }
+        };
+      }
+    }
+
+    const correctRes = await run(correctDb, exercise.solution);
 
     // For DDL operations, check if the operation succeeded (no error means success)
     if (isDDLLesson) {
@@ -100,34 +146,30 @@ async function validateSolution(userQuery, lessonId, exerciseId) {
     return { valid: false, message: e.message, userResult: [], correctResult: [] };
   } finally {
     // Clean up databases
-    if (userDb) {
-      if (userDb.tempPath) {
-        cleanupTempDB(userDb);
-      } else {
-        userDb.close();
-      }
-    }
-    if (correctDb && correctDb !== userDb && correctDb.tempPath) {
-      cleanupTempDB(correctDb);
-    }
+    if (userDb) cleanupTempDB(userDb);
+    if (correctDb) cleanupTempDB(correctDb);
   }
 }
 
 
-function runQuery(db, query, allowDDL = false) {
+// Runs `query`, interrupting it once `deadlineMs` has passed (QueryTimeoutError).
+function runQuery(db, query, allowDDL = false, deadlineMs = null) {
   return new Promise((resolve, reject) => {
     try {
       const safe = sanitizeQuery(query, allowDDL);
-      
+      const settle = deadlineMs ? armDeadline(db, deadlineMs) : err => err;
+
       // For DDL operations (ALTER, CREATE, DROP), use db.run instead of db.all
       if (allowDDL) {
         db.run(safe, function(err) {
-          if (err) reject(err);
+          const error = settle(err);
+          if (error) reject(error);
           else resolve({ success: true, changes: this.changes });
         });
       } else {
         db.all(safe, (err, rows) => {
-          if (err) reject(err);
+          const error = settle(err);
+          if (error) reject(error);
           else resolve(rows || []);
         });
       }
@@ -137,4 +179,20 @@ function runQuery(db, query, allowDDL = false) {
   });
 }
 
-module.exports = { validateSolution };
+// Read-only query against a lesson DB: through the pooled query engine when
+// it is configured and reachable, otherwise on a short-lived handle. Either
+// way the lesson's query budget applies.
+async function runLessonQuery(lessonId, query) {
+  if (queryEngine.isEnabled()) {
+    const rows = await queryEngine.executeQuery(lessonId, sanitizeQuery(query, false));
+    if (rows) return rows;
+  }
+  const db = getLessonDB(lessonId);
+  try {
+    return await runQuery(db, query, false, getQueryBudget(lessonId).deadlineMs);
+  } finally {
+    db.close();
+  }
+}
+
+module.exports = { validateSolution, runLessonQuery };
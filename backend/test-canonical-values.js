@@ -0,0 +1,28 @@
+#!/usr/bin/env node
+
+// Checks canonicalValue() against the shared vectors in
+// services/canonical-values.json. tools/check-canonical-values.py checks the
+// Python twin against the same file, so a fingerprint computed at build time
+// always matches the one computed here at request time.
+const { canonicalValue } = require('./services/expectedResults');
+const { cases } = require('./services/canonical-values.json');
+
+const parse = {
+  float: Number,
+  int: Number,
+  text: value => value,
+  null: () => null,
+  blob: value => Buffer.from(value, 'hex')
+};
+
+let failed = 0;
+for (const { type, value, canonical } of cases) {
+  const actual = canonicalValue(parse[type](value));
+  if (actual !== canonical) {
+    failed += 1;
+    console.log(`❌ ${type} ${value}: expected ${canonical}, got ${actual}`);
+  }
+}
+
+console.log(failed ? `\n❌ ${failed} of ${cases.length} case(s) failed` : `✅ ${cases.length} cases match`);
+process.exit(failed ? 1 : 0);
@@ -4,11 +4,19 @@ Script to add practice exercises and quiz questions to all lesson JSON files.
 This will enhance each lesson with interactive content.
 """
 
+import argparse
 import json
 import os
 import glob
+import sys
+from pathlib import Path
 from typing import Dict, List, Any
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools"))
+from lesson_profiling import NULL_PROFILER, add_profile_arguments, profiling
+from lesson_schema import errors as schema_errors
+from solution_check import check_lesson, check_lessons
+
 def generate_practice_exercises(lesson_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Generate practice exercises based on lesson content."""
     lesson_id = lesson_data.get('id', '')
@@ -178,6 +186,110 @@ def generate_practice_exercises(lesson_data: Dict[str, Any]) -> List[Dict[str, A
     
     return practices
 
+NUMERIC_TYPES = ('INT', 'REAL', 'NUM', 'DEC', 'FLOA', 'DOUB')
+
+def _is_numeric(column: Dict[str, Any]) -> bool:
+    return any(t in column.get('type', '').upper() for t in NUMERIC_TYPES)
+
+def _join_pair(tables: List[Dict[str, Any]]):
+    """(left, right, left_column, right_column) for two tables sharing a key column, or None."""
+    for left in tables:
+        for right in tables:
+            if left is right:
+                continue
+            key = next((c['name'] for c in right['columns'] if 'PRIMARY KEY' in c.get('constraints', '').upper()), None)
+            if key is None:
+                continue
+            singular = right['name'][:-1] if right['name'].endswith('s') else right['name']
+            for column in left['columns']:
+                if 'PRIMARY KEY' in column.get('constraints', '').upper():
+                    continue
+                if column['name'] == key or column['name'] == f"{singular}_{key}" or column['name'] == f"{singular}_id":
+                    return left, right, column['name'], key
+    return None
+
+def generate_schema_practice(lesson_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Practice exercises built from the lesson's own tables, used when the
+    topic-based exercises don't run against the lesson DB.
+    Returns an empty list for lessons without tables.
+    """
+    tables = [t for t in lesson_data.get('schema', {}).get('tables', []) if t.get('columns')]
+    if not tables:
+        return []
+    title = lesson_data.get('title', '')
+    table = tables[0]
+    name = table['name']
+    columns = [c['name'] for c in table['columns']]
+    shown = columns[1:3] if len(columns) > 2 else columns
+    numeric = next((c['name'] for c in table['columns'][1:] if _is_numeric(c)), None)
+    text = next((c['name'] for c in table['columns'][1:] if not _is_numeric(c)), columns[-1])
+
+    practices = [
+        {
+            "id": "practice_1",
+            "title": f"Explore the {name} Table",
+            "description": f"Write a query that returns every row and column from the {name} table.",
+            "starterCode": f"-- Practice {title}\n-- Write your query here",
+            "solution": f"SELECT * FROM {name};",
+            "hint": "Use SELECT * to get all columns, and don't forget the table name after FROM.",
+            "expectedOutput": f"All rows and columns from {name}."
+        },
+        {
+            "id": "practice_2",
+            "title": f"Choose and Sort {name.title()} Columns",
+            "description": f"Return only {' and '.join(shown)} from {name}, sorted by {shown[-1]}.",
+            "starterCode": f"-- Select specific columns from {name}\n-- Your code here",
+            "solution": f"SELECT {', '.join(shown)} FROM {name} ORDER BY {shown[-1]};",
+            "hint": "List the columns after SELECT and add ORDER BY at the end.",
+            "expectedOutput": f"{', '.join(shown)} for every row, in order of {shown[-1]}."
+        }
+    ]
+    if numeric:
+        practices.append({
+            "id": "practice_3",
+            "title": f"Above-Average {numeric.replace('_', ' ').title()}",
+            "description": f"Find the rows in {name} whose {numeric} is above the average {numeric}.",
+            "starterCode": f"-- Filter {name} with a subquery\n-- Your query here",
+            "solution": f"SELECT * FROM {name} WHERE {numeric} > (SELECT AVG({numeric}) FROM {name});",
+            "hint": "Compare the column with a subquery that computes AVG() over the same table.",
+            "expectedOutput": f"Rows of {name} with an above-average {numeric}."
+        })
+    else:
+        practices.append({
+            "id": "practice_3",
+            "title": f"Filter {name.title()}",
+            "description": f"Return the rows of {name} that have a value for {text}.",
+            "starterCode": f"-- Filter {name}\n-- Your query here",
+            "solution": f"SELECT * FROM {name} WHERE {text} IS NOT NULL;",
+            "hint": "Use IS NOT NULL in the WHERE clause.",
+            "expectedOutput": f"Rows of {name} where {text} is set."
+        })
+
+    pair = _join_pair(tables)
+    if pair:
+        left, right, left_column, right_column = pair
+        practices.append({
+            "id": "practice_4",
+            "title": f"Combine {left['name'].title()} and {right['name'].title()}",
+            "description": f"Join {left['name']} with {right['name']} on {left_column} and return all matching rows.",
+            "starterCode": f"-- Join {left['name']} and {right['name']}\n-- Your query here",
+            "solution": f"SELECT * FROM {left['name']} JOIN {right['name']} ON {left['name']}.{left_column} = {right['name']}.{right_column};",
+            "hint": "Match the key column in one table with the primary key of the other.",
+            "expectedOutput": f"Rows of {left['name']} combined with their {right['name']} row."
+        })
+    else:
+        practices.append({
+            "id": "practice_4",
+            "title": f"Count {name.title()} by {text.replace('_', ' ').title()}",
+            "description": f"Count how many rows of {name} share each {text}.",
+            "starterCode": f"-- Summarize {name}\n-- Your query here",
+            "solution": f"SELECT {text}, COUNT(*) AS row_count FROM {name} GROUP BY {text} ORDER BY row_count DESC;",
+            "hint": "Use GROUP BY with COUNT(*).",
+            "expectedOutput": f"One row per {text} with its count."
+        })
+    return practices
+
 def generate_quiz_questions(lesson_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Generate quiz questions based on lesson content."""
     lesson_id = lesson_data.get('id', '')
@@ -275,49 +387,136 @@ def generate_quiz_questions(lesson_data: Dict[str, Any]) -> List[Dict[str, Any]]
     
     return quiz_questions
 
-def update_lesson_file(file_path: str) -> bool:
-    """Update a single lesson file with practice and quiz content."""
+def prepare_lesson_update(file_path: str, profiler=NULL_PROFILER):
+    """
+    Read a lesson and add any missing practice and quiz content.
+    Returns (lesson_data, added_practice, changed), or None if the lesson
+    can't be updated.
+    """
+    name = os.path.basename(file_path)
     try:
         # Read the existing lesson file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lesson_data = json.load(f)
+        with profiler.phase(name, "read"):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                raw = f.read()
+        with profiler.phase(name, "parse"):
+            lesson_data = json.loads(raw)
         
         # Check if practice and quiz already exist and have content
         has_practice = lesson_data.get('practice') and len(lesson_data['practice']) >= 4
         has_quiz = lesson_data.get('quiz') and len(lesson_data['quiz']) >= 8
         
         if has_practice and has_quiz:
-            print(f"✓ {os.path.basename(file_path)} already has sufficient practice and quiz content")
-            return True
+            print(f"✓ {name} already has sufficient practice and quiz content")
+            return lesson_data, False, False
         
-        # Generate practice exercises if needed
-        if not has_practice:
-            lesson_data['practice'] = generate_practice_exercises(lesson_data)
-            print(f"+ Added {len(lesson_data['practice'])} practice exercises to {os.path.basename(file_path)}")
+        with profiler.phase(name, "transform"):
+            # Generate practice exercises if needed
+            if not has_practice:
+                lesson_data['practice'] = generate_practice_exercises(lesson_data)
+                print(f"+ Added {len(lesson_data['practice'])} practice exercises to {name}")
+
+            # Generate quiz questions if needed
+            if not has_quiz:
+                lesson_data['quiz'] = generate_quiz_questions(lesson_data)
+                print(f"+ Added {len(lesson_data['quiz'])} quiz questions to {name}")
+
+            problems = schema_errors(lesson_data, ["practice", "quiz", "ids"])
         
-        # Generate quiz questions if needed  
-        if not has_quiz:
-            lesson_data['quiz'] = generate_quiz_questions(lesson_data)
-            print(f"+ Added {len(lesson_data['quiz'])} quiz questions to {os.path.basename(file_path)}")
+        if problems:
+            print(f"✗ Not writing {name}: generated content is invalid")
+            for problem in problems:
+                print(f"    - {problem}")
+            return None
         
-        # Write the updated lesson file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(lesson_data, f, indent=4, ensure_ascii=False)
+        return lesson_data, not has_practice, True
         
+    except Exception as e:
+        print(f"✗ Error updating {file_path}: {str(e)}")
+        return None
+
+def check_practice(lessons: Dict[str, Dict[str, Any]], data_dir: Path, jobs: int, profiler=NULL_PROFILER):
+    """
+    Run every practice solution against its lesson's DB (see tools/solution_check.py).
+    Returns {file_path: [(exercise_id, message), ...]} for the lessons that fail.
+    """
+    practice_only = {path: {"id": lesson.get('id'), "practice": lesson['practice']} for path, lesson in lessons.items()}
+    if profiler.enabled:
+        # Stay in-process so each lesson's check is timed.
+        failures = {}
+        for path, lesson in practice_only.items():
+            with profiler.phase(os.path.basename(path), "verify"):
+                failures[path] = check_lesson(lesson, data_dir)
+    else:
+        by_id = check_lessons(practice_only.values(), data_dir, jobs)
+        failures = {path: by_id[lesson['id']] for path, lesson in practice_only.items()}
+    return {path: failed for path, failed in failures.items() if failed}
+
+def verify_generated_practice(lessons: Dict[str, Dict[str, Any]], data_dir: Path, jobs: int,
+                              profiler=NULL_PROFILER) -> Dict[str, Dict[str, Any]]:
+    """
+    Check generated practice against the real lesson DBs. Lessons that fail
+    get exercises regenerated from their own schema and are checked again;
+    lessons that still fail are left out of the result.
+    """
+    failures = check_practice(lessons, data_dir, jobs, profiler)
+    verified = {path: lesson for path, lesson in lessons.items() if path not in failures}
+
+    retry = {}
+    for path, failed in failures.items():
+        regenerated = generate_schema_practice(lessons[path])
+        if regenerated:
+            lessons[path]['practice'] = regenerated
+            retry[path] = lessons[path]
+            print(f"↻ Regenerated practice for {os.path.basename(path)} from its schema "
+                  f"({len(failed)} solution(s) failed against the lesson DB)")
+        else:
+            report_rejected(path, failed)
+
+    still_failing = check_practice(retry, data_dir, jobs, profiler) if retry else {}
+    for path, lesson in retry.items():
+        if path in still_failing:
+            report_rejected(path, still_failing[path])
+        else:
+            verified[path] = lesson
+    return verified
+
+def report_rejected(path: str, failed) -> None:
+    print(f"✗ Not writing {os.path.basename(path)}: generated solutions don't run against the lesson DB")
+    for exercise_id, message in failed:
+        print(f"    - {exercise_id}: {message}")
+
+def write_lesson_file(file_path: str, lesson_data: Dict[str, Any], profiler=NULL_PROFILER) -> bool:
+    """Write an updated lesson file."""
+    try:
+        with profiler.phase(os.path.basename(file_path), "write"):
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(lesson_data, f, indent=4, ensure_ascii=False)
         return True
-        
     except Exception as e:
         print(f"✗ Error updating {file_path}: {str(e)}")
         return False
 
 def main():
     """Main function to update all lesson files."""
+    parser = argparse.ArgumentParser(description="Add practice exercises and quiz questions to lesson files")
+    parser.add_argument("--content-dir", type=Path, default=Path("lesson-content"))
+    parser.add_argument("--data-dir", type=Path, default=Path("lesson-data"),
+                        help="lesson DBs the generated solutions are checked against")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="worker processes for checking solutions (default: one per core)")
+    parser.add_argument("--no-verify", action="store_true",
+                        help="write generated practice without running it against the lesson DBs")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
     print("🚀 Starting lesson content update...")
     print("Adding practice exercises and quiz questions to all lesson files...\n")
     
     # Find all lesson JSON files
-    lesson_files = glob.glob("lesson-content/lesson_*.json")
-    lesson_files.extend(glob.glob("lesson-content/*.json"))
+    lesson_files = glob.glob(str(args.content_dir / "lesson_*.json"))
+    lesson_files.extend(glob.glob(str(args.content_dir / "*.json")))
+    lesson_files = sorted(set(lesson_files))  # lesson_*.json also matches *.json
     
     if not lesson_files:
         print("❌ No lesson files found!")
@@ -326,10 +525,28 @@ def main():
     updated_count = 0
     total_count = len(lesson_files)
     
-    # Update each lesson file
-    for file_path in sorted(lesson_files):
-        if update_lesson_file(file_path):
-            updated_count += 1
+    with profiling(args.profile, "update_lessons_with_practice_quiz", args.profile_out) as profiler:
+        changed = {}
+        generated = {}
+        for file_path in lesson_files:
+            result = prepare_lesson_update(file_path, profiler)
+            if result is None:
+                continue
+            lesson_data, added_practice, was_changed = result
+            if not was_changed:
+                updated_count += 1
+            elif added_practice and not args.no_verify:
+                generated[file_path] = lesson_data
+            else:
+                changed[file_path] = lesson_data
+
+        if generated:
+            print(f"\n🔍 Checking generated solutions for {len(generated)} lesson(s) against {args.data_dir}...")
+            changed.update(verify_generated_practice(generated, args.data_dir, args.jobs, profiler))
+
+        for file_path in sorted(changed):
+            if write_lesson_file(file_path, changed[file_path], profiler):
+                updated_count += 1
     
     print(f"\n✅ Update complete!")
     print(f"📊 Successfully updated {updated_count}/{total_count} lesson files")
@@ -1,14 +1,72 @@
 const sqlite3 = require('sqlite3');
 const path = require('path');
 const fs = require('fs');
+const crypto = require('crypto');
+
+const LESSON_DATA_DIR = path.resolve(__dirname, '../lesson-data');
+// Written by tools/auto-create-lesson-dbs.py; records each finished DB's SHA-256.
+const MANIFEST_PATH = path.join(LESSON_DATA_DIR, '.build-manifest.json');
+const MMAP_SIZE = 256 * 1024 * 1024;
+
+let manifestCache = { stamp: null, lessons: {} };
+// lessonId -> { stamp, immutable }
+const finalizedCache = new Map();
+
+function fileStamp(stat) {
+  return `${stat.ino}:${stat.mtimeMs}:${stat.size}`;
+}
+
+function manifestLessons() {
+  let stamp;
+  try {
+    stamp = fileStamp(fs.statSync(MANIFEST_PATH));
+  } catch (err) {
+    return {};
+  }
+  if (manifestCache.stamp !== stamp) {
+    let lessons = {};
+    try {
+      lessons = JSON.parse(fs.readFileSync(MANIFEST_PATH, 'utf8')).lessons || {};
+    } catch (err) {
+      lessons = {};
+    }
+    manifestCache = { stamp, lessons };
+  }
+  return manifestCache.lessons;
+}
+
+// True when the file is exactly the finalized build the manifest recorded.
+// Such a DB is only ever replaced by rename, never written in place, so it
+// is safe to open with immutable=1 (no locking, no change detection).
+function isFinalized(lessonId, dbPath) {
+  const stamp = fileStamp(fs.statSync(dbPath));
+  const cached = finalizedCache.get(lessonId);
+  if (cached && cached.stamp === stamp) return cached.immutable;
+
+  const entry = manifestLessons()[lessonId];
+  const immutable = Boolean(entry && entry.sha256) &&
+    crypto.createHash('sha256').update(fs.readFileSync(dbPath)).digest('hex') === entry.sha256;
+  finalizedCache.set(lessonId, { stamp, immutable });
+  return immutable;
+}
 
 function getLessonDB(lessonId, readOnly = true) {
-  const dbPath = path.resolve(__dirname, '../lesson-data', `lesson_${lessonId}.db`);
+  const dbPath = path.join(LESSON_DATA_DIR, `lesson_${lessonId}.db`);
 
   if (!fs.existsSync(dbPath)) {
     throw new Error(`❌ Database not found: lesson_${lessonId}.db`);
   }
 
+  if (readOnly && isFinalized(lessonId, dbPath)) {
+    const db = new sqlite3.Database(`file:${dbPath}?mode=ro&immutable=1`,
+      sqlite3.OPEN_READONLY | sqlite3.OPEN_URI);
+    db.serialize(() => {
+      db.run('PRAGMA query_only = ON');
+      db.run(`PRAGMA mmap_size = ${MMAP_SIZE}`);
+    });
+    return db;
+  }
+
   const mode = readOnly
     ? sqlite3.OPEN_READONLY
     : sqlite3.OPEN_READWRITE | sqlite3.OPEN_CREATE;
@@ -0,0 +1,68 @@
+const fs = require('fs');
+
+// Reader for the bundle written by tools/build-lesson-bundle.py.
+// Layout: "SQLFLB01" | uint32 LE header length | JSON header | data blocks.
+const MAGIC = 'SQLFLB01';
+const REF_KEY = '$s';
+
+function decode(value, strings) {
+  if (Array.isArray(value)) return value.map(item => decode(item, strings));
+  if (value && typeof value === 'object') {
+    const keys = Object.keys(value);
+    if (keys.length === 1 && keys[0] === REF_KEY) return strings[value[REF_KEY]];
+    const out = {};
+    for (const key of keys) out[key] = decode(value[key], strings);
+    return out;
+  }
+  return value;
+}
+
+function loadBundle(bundlePath) {
+  const data = fs.readFileSync(bundlePath);
+  if (data.toString('latin1', 0, MAGIC.length) !== MAGIC) {
+    throw new Error(`Not a lesson bundle: ${bundlePath}`);
+  }
+  const headerLength = data.readUInt32LE(MAGIC.length);
+  const start = MAGIC.length + 4;
+  const header = JSON.parse(data.toString('utf8', start, start + headerLength));
+  const base = start + headerLength;
+  const slice = ([offset, length]) => data.toString('utf8', base + offset, base + offset + length);
+
+  let strings = null;
+  const lessons = new Map();
+
+  return {
+    version: header.version,
+    ids: () => [...header.order],
+    has: (lessonId) => Object.prototype.hasOwnProperty.call(header.lessons, lessonId),
+    get(lessonId) {
+      if (!this.has(lessonId)) return null;
+      if (!lessons.has(lessonId)) {
+        if (strings === null) strings = JSON.parse(slice(header.strings));
+        lessons.set(lessonId, decode(JSON.parse(slice(header.lessons[lessonId])), strings));
+      }
+      return lessons.get(lessonId);
+    },
+    all() {
+      return header.order.map(lessonId => this.get(lessonId));
+    }
+  };
+}
+
+// Keeps one parsed bundle in memory and reloads it only when the file changes.
+function createBundleCache(bundlePath) {
+  let stamp = null;
+  let bundle = null;
+  return function current() {
+    if (!fs.existsSync(bundlePath)) return null;
+    const stat = fs.statSync(bundlePath);
+    const nextStamp = `${stat.mtimeMs}:${stat.size}`;
+    if (nextStamp !== stamp) {
+      bundle = loadBundle(bundlePath);
+      stamp = nextStamp;
+    }
+    return bundle;
+  };
+}
+
+module.exports = { loadBundle, createBundleCache };
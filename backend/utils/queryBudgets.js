@@ -0,0 +1,63 @@
+const fs = require('fs');
+const path = require('path');
+
+// Per-lesson query budgets written by tools/build-query-budgets.py.
+// node-sqlite3 has no progress handler, so only the deadline applies here;
+// the pooled query engine (tools/query-engine.py) also enforces the
+// instruction budget.
+const BUDGETS_PATH = path.resolve(__dirname, '../lesson-data', 'query-budgets.json');
+const BUDGETS_VERSION = 1;
+const DEFAULT_BUDGET = { instructions: 5000000, deadline_ms: 1000 };
+
+let cached = { stamp: null, budgets: null };
+
+function loadBudgets() {
+  let stamp = 'missing';
+  if (fs.existsSync(BUDGETS_PATH)) {
+    const stat = fs.statSync(BUDGETS_PATH);
+    stamp = `${stat.mtimeMs}:${stat.size}`;
+  }
+  if (cached.stamp === stamp) return cached.budgets;
+
+  let budgets = null;
+  try {
+    const parsed = JSON.parse(fs.readFileSync(BUDGETS_PATH, 'utf8'));
+    if (parsed.version === BUDGETS_VERSION) budgets = parsed;
+  } catch (err) {
+    budgets = null;
+  }
+  cached = { stamp, budgets };
+  return budgets;
+}
+
+// { instructions, deadlineMs } for one lesson.
+function getQueryBudget(lessonId) {
+  const budgets = loadBudgets();
+  const entry = (budgets && (budgets.lessons[lessonId] || budgets.default)) || DEFAULT_BUDGET;
+  return { instructions: entry.instructions, deadlineMs: entry.deadline_ms };
+}
+
+class QueryTimeoutError extends Error {
+  constructor(deadlineMs) {
+    super(`Query stopped: it ran longer than ${deadlineMs} ms`);
+    this.name = 'QueryTimeoutError';
+    this.type = 'QueryTimeout';
+  }
+}
+
+// Interrupt whatever `db` is running once the deadline passes. Returns a
+// function that cancels the timer and maps SQLITE_INTERRUPT to QueryTimeoutError.
+function armDeadline(db, deadlineMs) {
+  let fired = false;
+  const timer = setTimeout(() => {
+    fired = true;
+    db.interrupt();
+  }, deadlineMs);
+  return (err) => {
+    clearTimeout(timer);
+    if (err && fired && err.code === 'SQLITE_INTERRUPT') return new QueryTimeoutError(deadlineMs);
+    return err;
+  };
+}
+
+module.exports = { getQueryBudget, armDeadline, QueryTimeoutError };
@@ -0,0 +1,103 @@
+const http = require('http');
+
+// Client for the pooled query engine started with tools/query-engine.py.
+// Opt-in: set QUERY_ENGINE_URL (e.g. http://127.0.0.1:8765) or
+// QUERY_ENGINE_SOCKET (path of its Unix socket). When neither is set, or the
+// engine can't be reached, callers fall back to opening the lesson DB directly.
+const ENGINE_URL = process.env.QUERY_ENGINE_URL;
+const ENGINE_SOCKET = process.env.QUERY_ENGINE_SOCKET;
+const MAX_ROWS = parseInt(process.env.QUERY_ENGINE_MAX_ROWS || '10000', 10);
+
+function isEnabled() {
+  return Boolean(ENGINE_URL || ENGINE_SOCKET);
+}
+
+function post(pathname, payload) {
+  const body = JSON.stringify(payload);
+  const target = ENGINE_SOCKET
+    ? { socketPath: ENGINE_SOCKET }
+    : (({ hostname, port }) => ({ hostname, port }))(new URL(ENGINE_URL));
+
+  return new Promise((resolve, reject) => {
+    const req = http.request({
+      ...target,
+      path: pathname,
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(body) }
+    }, (res) => {
+      const chunks = [];
+      res.on('data', chunk => chunks.push(chunk));
+      res.on('end', () => {
+        try {
+          resolve({ status: res.statusCode, body: JSON.parse(Buffer.concat(chunks).toString('utf8')) });
+        } catch (err) {
+          reject(err);
+        }
+      });
+    });
+    req.on('error', reject);
+    req.end(body);
+  });
+}
+
+// Rows come back as arrays; turn them into objects like sqlite3's db.all().
+function toObjects(columns, rows) {
+  return rows.map(row => {
+    const obj = {};
+    columns.forEach((col, i) => { obj[col] = row[i]; });
+    return obj;
+  });
+}
+
+// Response body on success, null when the engine is unreachable or doesn't
+// know the lesson (use the local DB instead). Throws the engine's error for
+// bad SQL, a stopped query or overload.
+async function call(pathname, payload) {
+  let response;
+  try {
+    response = await post(pathname, payload);
+  } catch (err) {
+    return null;
+  }
+
+  const { status, body } = response;
+  if (status === 200) return body;
+  if (status === 404) return null;
+  const error = new Error(status === 429 ? 'Server is busy, please try again in a moment' : body.error);
+  error.type = body.type;
+  throw error;
+}
+
+// Resolves to row objects, or null (see call()). The column names ride along
+// as `rows.columns`, so compareQuery() can grade an empty result too.
+async function executeQuery(lessonId, sql) {
+  const body = await call('/execute', { lessonId, sql, maxRows: MAX_ROWS });
+  if (!body) return null;
+  if (body.truncated) {
+    throw new Error(`Query returned more than ${MAX_ROWS} rows`);
+  }
+  const rows = toObjects(body.columns, body.rows);
+  rows.columns = body.columns;
+  return rows;
+}
+
+// Multiset comparison of a result the caller already has (row objects, e.g.
+// from executeQuery or db.all) against the reference `solution`. Only the
+// solution runs, streamed by the engine: { equal, reason, missing, extra,
+// missing_count, extra_count, columns, sample, ... } where `sample` holds
+// the first rows of the reference result, or null (see call()).
+// `options` is the exercise's optional `compare` object (rowOrder,
+// columnOrder, tolerance, maxDiff).
+async function compareQuery(lessonId, rows, solution, options = {}) {
+  const columns = rows.columns || (rows.length ? Object.keys(rows[0]) : null);
+  return call('/compare', {
+    lessonId,
+    solution,
+    options,
+    columns,
+    // BLOBs travel as hex, the same way /execute returns them
+    rows: rows.map(row => columns.map(col => (Buffer.isBuffer(row[col]) ? row[col].toString('hex') : row[col])))
+  });
+}
+
+module.exports = { isEnabled, executeQuery, compareQuery, toObjects };
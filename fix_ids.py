@@ -1,29 +1,14 @@
-import json
+# Superseded by tools/normalize-ids.py, which applies the practice, quiz,
+# challenge and step id rules in one idempotent pass and only rewrites files
+# whose bytes actually change. Kept so existing habits/scripts still work;
+# like the original script, it only rewrites practice and challenge step ids.
+import runpy
+import sys
 from pathlib import Path
 
-LESSON_DIR = Path("lesson-content")
+NORMALIZER = Path(__file__).resolve().parent / "tools" / "normalize-ids.py"
 
-for file in LESSON_DIR.glob("*.json"):
-    with open(file, "r") as f:
-        lesson = json.load(f)
-
-    lesson_id = lesson.get("id")
-    if not lesson_id:
-        print(f"❌ Skipping {file.name} (missing id)")
-        continue
-
-    # Fix practice IDs
-    for i, p in enumerate(lesson.get("practice", []), start=1):
-        p["id"] = f"{lesson_id}_practice{i}"
-
-    # Fix challenge step IDs
-    for challenge in lesson.get("challenges", []):
-        challenge_id = challenge.get("id", "ch")
-        for i, step in enumerate(challenge.get("steps", []), start=1):
-            step["stepId"] = f"{lesson_id}_{challenge_id}_step{i}"
-
-    # Save updated file
-    with open(file, "w") as f:
-        json.dump(lesson, f, indent=2)
-
-    print(f"✅ Updated IDs in {file.name}")
+if __name__ == "__main__":
+    sys.path.insert(0, str(NORMALIZER.parent))
+    sys.argv = [str(NORMALIZER), "--write", "--only", "practice", "--only", "steps", *sys.argv[1:]]
+    runpy.run_path(str(NORMALIZER), run_name="__main__")
@@ -1,6 +1,9 @@
 from pathlib import Path
 import json
-import sqlite3
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+from lesson_build import build_lessons
 
 # Define directories
 lesson_content_dir = Path("lesson-content")
@@ -114,32 +117,33 @@ FROM
 }
 
 # --- Script to generate files ---
-def create_lesson_files(lesson_data):
-    # Write JSON file
-    json_path = lesson_content_dir / f"lesson_{lesson_data['id']}.json"
-    with open(json_path, "w") as f:
-        json.dump(lesson_data, f, indent=4)
-    print(f"✅ Successfully created: {json_path.name}")
+def create_lesson_files(lessons, jobs=1):
+    """Write the JSON and build the SQLite DB for one lesson or a list of lessons.
+
+    With jobs > 1 (or 0 for one per core) the DBs are built in a process pool;
+    a lesson that fails to build is reported and does not stop the others.
+    """
+    if isinstance(lessons, dict):
+        lessons = [lessons]
 
-    # Create SQLite DB
-    db_path = lesson_data_dir / f"lesson_{lesson_data['id']}.db"
-    if db_path.exists():
-        db_path.unlink()
+    # Write JSON files
+    for lesson_data in lessons:
+        json_path = lesson_content_dir / f"lesson_{lesson_data['id']}.json"
+        with open(json_path, "w") as f:
+            json.dump(lesson_data, f, indent=4)
+        print(f"✅ Successfully created: {json_path.name}")
 
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
-        for table in lesson_data["schema"]["tables"]:
-            col_defs = [f"{col['name']} {col['type']} {col.get('constraints', '')}".strip() for col in table["columns"]]
-            cursor.execute(f"CREATE TABLE {table['name']} ({', '.join(col_defs)});")
-        
-        for table_name, rows in lesson_data["sample_data"].items():
-            if rows:
-                keys = rows[0].keys()
-                placeholders = ", ".join(["?"] * len(keys))
-                sql = f"INSERT INTO {table_name} ({', '.join(keys)}) VALUES ({placeholders})"
-                data_to_insert = [tuple(row.get(k) for k in keys) for row in rows]
-                cursor.executemany(sql, data_to_insert)
-    print(f"✅ Successfully created: {db_path.name}")
+    # Create SQLite DBs
+    tasks = [(lesson_data, lesson_data_dir / f"lesson_{lesson_data['id']}.db") for lesson_data in lessons]
+    results = list(build_lessons(tasks, jobs=jobs))
+    for result in results:
+        db_name = Path(result["db"]).name
+        if result["ok"]:
+            print(f"✅ Successfully created: {db_name} ({result['seconds'] * 1000:.1f} ms)")
+        else:
+            print(f"❌ Failed to create: {db_name} ({result['error']})")
+    return results
 
-# Create the files for our new lesson
-create_lesson_files(lesson)
+if __name__ == "__main__":
+    # Create the files for our new lesson
+    create_lesson_files(lesson)
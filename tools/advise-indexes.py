@@ -0,0 +1,122 @@
+import argparse
+import json
+from pathlib import Path
+
+from expected_results import expected_path_for, refresh_lesson
+from id_normalizer import detect_format, render, write_atomic
+from index_advisor import advise_lesson
+from lesson_build import (
+    LESSON_CONTENT_DIR,
+    LESSON_DATA_DIR,
+    build_lessons,
+    db_path_for,
+    lesson_data_hash,
+    lesson_files,
+    load_lesson,
+    load_manifest,
+    save_manifest,
+    source_stamp,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Propose covering indexes from the query plans of each lesson's own SQL")
+    parser.add_argument("--content-dir", type=Path, default=LESSON_CONTENT_DIR)
+    parser.add_argument("--data-dir", type=Path, default=LESSON_DATA_DIR)
+    parser.add_argument("--lesson", action="append", default=[], help="only advise this lesson id (repeatable)")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="timed runs per query (default: 5)")
+    parser.add_argument("--apply", action="store_true",
+                        help="add the proposed indexes to each lesson's schema.indexes and rebuild its DB")
+    parser.add_argument("--json", type=Path, help="write the full report to this file")
+    return parser.parse_args()
+
+
+def print_report(report):
+    lesson_id = report["lesson"]
+    if report["status"] == "skipped":
+        print(f"⏭️ {lesson_id}: opted out (indexAdvisor: false)")
+        return
+    if report["status"] == "error":
+        print(f"❌ {lesson_id}: {report['error']}")
+        return
+    if not report["proposals"]:
+        scans = f", {len(report['scans'])} scan(s) no index would help" if report["scans"] else ""
+        print(f"✅ {lesson_id}: nothing to add{scans}")
+        return
+    before = sum(t["before_ms"] for t in report["timings"])
+    after = sum(t["after_ms"] for t in report["timings"])
+    print(f"💡 {lesson_id}: {len(report['proposals'])} index(es), "
+          f"{before:.3f} ms -> {after:.3f} ms over {len(report['timings'])} queries")
+    for index in report["proposals"]:
+        print(f"   + {index['table']} ({', '.join(index['columns'])})")
+    for timing in report["timings"]:
+        if timing["after_ms"] != timing["before_ms"]:
+            print(f"     {timing['query_id']:<32} {timing['before_ms']:8.3f} -> {timing['after_ms']:8.3f} ms")
+
+
+def apply_advice(path, lesson, proposals):
+    """Append the proposals to the lesson file's schema.indexes, keeping its formatting."""
+    fmt = detect_format(path.read_bytes())
+    lesson.setdefault("schema", {}).setdefault("indexes", []).extend(proposals)
+    write_atomic(path, render(lesson, fmt))
+
+
+def rebuild(applied, data_dir):
+    """
+    Rebuild the DBs of the lessons that got new indexes, record them in the build
+    manifest and refresh their expected-results sidecars (keyed on the DB hash).
+    """
+    manifest = load_manifest(data_dir)
+    tasks = [(lesson, db_path_for(lesson["id"], data_dir)) for _, lesson in applied]
+    sources = {lesson["id"]: path for path, lesson in applied}
+    for result in build_lessons(tasks):
+        lesson_id = result["id"]
+        if not result["ok"]:
+            print(f"❌ Failed: lesson_{lesson_id}.db ({result['error']})")
+            continue
+        lesson = next(lesson for _, lesson in applied if lesson["id"] == lesson_id)
+        manifest["lessons"][lesson_id] = {"source": sources[lesson_id].name, "db": Path(result["db"]).name,
+                                          "hash": lesson_data_hash(lesson), "sha256": result["sha256"],
+                                          **source_stamp(sources[lesson_id])}
+        print(f"🔨 Rebuilt: lesson_{lesson_id}.db with indexes and ANALYZE statistics")
+        _, status, failed = refresh_lesson(lesson, data_dir)
+        if status == "updated":
+            note = f" ⚠️ {failed} solution(s) failed" if failed else ""
+            print(f"✅ Wrote: {expected_path_for(lesson_id, data_dir).name}{note}")
+    save_manifest(manifest, data_dir)
+
+
+def main():
+    args = parse_args()
+    reports, applied = [], []
+    for path in lesson_files(args.content_dir):
+        lesson = load_lesson(path)
+        if args.lesson and lesson.get("id") not in args.lesson:
+            continue
+        report = advise_lesson(lesson, args.data_dir, args.runs)
+        reports.append(report)
+        print_report(report)
+        if args.apply and report["proposals"]:
+            apply_advice(path, lesson, report["proposals"])
+            applied.append((path, lesson))
+
+    if applied:
+        rebuild(applied, args.data_dir)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n📝 Full report: {args.json}")
+
+    proposed = sum(len(r["proposals"]) for r in reports)
+    before = sum(t["before_ms"] for r in reports for t in r["timings"])
+    after = sum(t["after_ms"] for r in reports for t in r["timings"])
+    skipped = sum(1 for r in reports if r["status"] == "skipped")
+    print(f"\n📊 {len(reports)} lessons, {proposed} index(es) proposed"
+          f"{' and applied' if args.apply and proposed else ''}, {skipped} opted out; "
+          f"all queries {before:.3f} ms -> {after:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,75 @@
-import sqlite3, json
+import argparse
 from pathlib import Path
 
-# Always reference project root
-ROOT_DIR = Path(__file__).resolve().parent.parent
-LESSON_CONTENT_DIR = ROOT_DIR / "lesson-content"
-LESSON_DATA_DIR = ROOT_DIR / "lesson-data"
-LESSON_DATA_DIR.mkdir(parents=True, exist_ok=True)
-
-for file in LESSON_CONTENT_DIR.glob("*.json"):
-    with open(file) as f:
-        lesson = json.load(f)
-
-    lesson_id = lesson["id"]
-    db_path = LESSON_DATA_DIR / f"lesson_{lesson_id}.db"
-
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
-
-        # Create schema
-        for table in lesson.get("schema", {}).get("tables", []):
-            col_defs = []
-            for col in table["columns"]:
-                col_def = f"{col['name']} {col['type']}"
-                if "constraints" in col:
-                    col_def += f" {col['constraints']}"
-                col_defs.append(col_def)
-            create_sql = f"CREATE TABLE {table['name']} ({', '.join(col_defs)})"
-            cursor.execute(create_sql)
-
-        # Insert sample data
-        for table_name, rows in lesson.get("sample_data", {}).items():
-            if not rows:
-                continue
-            columns = rows[0].keys()
-            insert_sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(['?']*len(columns))})"
-            values = [tuple(row[col] for col in columns) for row in rows]
-            cursor.executemany(insert_sql, values)
-
-    print(f"✅ Created: lesson_{lesson_id}.db")
+from lesson_build import (
+    LESSON_CONTENT_DIR,
+    LESSON_DATA_DIR,
+    build_lessons,
+    db_path_for,
+    load_manifest,
+    plan_build,
+    save_manifest,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build lesson-data/*.db from lesson-content/*.json")
+    parser.add_argument("--content-dir", type=Path, default=LESSON_CONTENT_DIR)
+    parser.add_argument("--data-dir", type=Path, default=LESSON_DATA_DIR)
+    parser.add_argument("--force", action="store_true", help="rebuild every lesson, ignoring the manifest")
+    parser.add_argument("--no-prune", action="store_true", help="keep DBs that no longer have a lesson")
+    parser.add_argument("--no-dedupe", action="store_true",
+                        help="build every lesson's DB even if another lesson has the same data")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="build lessons in parallel with N worker processes (0 = one per core)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    args.data_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = load_manifest(args.data_dir)
+    plan = plan_build(args.content_dir, args.data_dir, manifest, force=args.force)
+
+    for path, message in plan["errors"]:
+        print(f"❌ Skipping {path.name}: {message}")
+
+    tasks = [(lesson, db_path_for(lesson["id"], args.data_dir)) for lesson, _, _ in plan["build"]]
+    built, linked, failed = [], [], []
+    for result in build_lessons(tasks, jobs=args.jobs, existing=plan["reusable"], dedupe=not args.no_dedupe):
+        lesson_id = result["id"]
+        if result["ok"]:
+            plan["entries"][lesson_id]["sha256"] = result["sha256"]
+        if result["ok"] and result["linked"]:
+            linked.append(result)
+            print(f"🔗 Linked: lesson_{lesson_id}.db -> {Path(result['linked']).name} (same data)")
+        elif result["ok"]:
+            built.append(result)
+            print(f"✅ Created: lesson_{lesson_id}.db ({result['seconds'] * 1000:.1f} ms)")
+        else:
+            # Drop the entry so the next run retries this lesson.
+            failed.append(result)
+            plan["entries"].pop(lesson_id, None)
+            print(f"❌ Failed: lesson_{lesson_id}.db ({result['error']})")
+
+    if not args.no_prune:
+        for db_file in plan["orphans"]:
+            db_file.unlink()
+            print(f"🗑️ Pruned: {db_file.name}")
+
+    manifest["lessons"] = plan["entries"]
+    save_manifest(manifest, args.data_dir)
+
+    print(f"\n📦 {len(built)} rebuilt, {len(linked)} linked, {len(failed)} failed, {len(plan['unchanged'])} unchanged, "
+          f"{0 if args.no_prune else len(plan['orphans'])} pruned, {len(plan['errors'])} failed to load")
+    if built:
+        slowest = max(built, key=lambda r: r["seconds"])
+        print(f"⏱️ Build time {sum(r['seconds'] for r in built):.3f}s total, "
+              f"slowest lesson_{slowest['id']}.db ({slowest['seconds']:.3f}s)")
+    if failed or plan["errors"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
+import argparse
 import json
 from pathlib import Path
 
+from lesson_profiling import add_profile_arguments, profiling
+from lesson_schema import errors as schema_errors
+
 CONTENT_DIR = Path("lesson-content")
 FIXED_DIR = Path("lesson-content-fixed")
-FIXED_DIR.mkdir(exist_ok=True)
 
 def fix_quiz(quiz):
     fixed = []
@@ -31,7 +34,10 @@ def fix_practice(practice):
         if not isinstance(p, dict):
             p = {}
         p.setdefault("id", f"practice{i+1}")
-        p.setdefault("challenge", f"Practice question {i+1}")
+        p.setdefault("title", f"Practice {i+1}")
+        # `challenge` is the legacy name of the prompt
+        if "description" not in p:
+            p["description"] = p.pop("challenge", f"Practice question {i+1}")
         p.setdefault("solution", "SELECT 1;")
         p.setdefault("hint", "Try a simple query.")
         fixed.append(p)
@@ -79,16 +85,7 @@ def fix_schema(schema):
             col.setdefault("constraints", "")
     return schema
 
-print("🔧 Auto-fixing lesson JSON files...\n")
-
-for file in CONTENT_DIR.glob("lesson_*.json"):
-    with open(file, "r", encoding="utf-8") as f:
-        try:
-            data = json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"❌ Invalid JSON in {file.name}: {e}")
-            continue
-
+def fix_lesson(data):
     data.setdefault("quiz", [])
     data.setdefault("practice", [])
     data.setdefault("examples", [])
@@ -101,12 +98,49 @@ for file in CONTENT_DIR.glob("lesson_*.json"):
     data["examples"] = fix_examples(data["examples"])
     data["challenges"] = fix_challenges(data["challenges"])
     data["schema"] = fix_schema(data["schema"])
+    return data
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fill in missing lesson fields and save the results to a separate folder")
+    parser.add_argument("--content-dir", type=Path, default=CONTENT_DIR)
+    parser.add_argument("--output-dir", type=Path, default=FIXED_DIR)
+    add_profile_arguments(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    args.output_dir.mkdir(exist_ok=True)
+    print("🔧 Auto-fixing lesson JSON files...\n")
+
+    with profiling(args.profile, "auto-fix-lessons", args.profile_out) as profiler:
+        for file in args.content_dir.glob("lesson_*.json"):
+            with profiler.phase(file.name, "read"):
+                raw = file.read_text(encoding="utf-8")
+            try:
+                with profiler.phase(file.name, "parse"):
+                    data = json.loads(raw)
+            except json.JSONDecodeError as e:
+                print(f"❌ Invalid JSON in {file.name}: {e}")
+                continue
+
+            with profiler.phase(file.name, "transform"):
+                data = fix_lesson(data)
+
+            # Save to fixed folder
+            with profiler.phase(file.name, "write"):
+                fixed_path = args.output_dir / file.name
+                with open(fixed_path, "w", encoding="utf-8") as out:
+                    json.dump(data, out, indent=2)
 
-    # Save to fixed folder
-    fixed_path = FIXED_DIR / file.name
-    with open(fixed_path, "w", encoding="utf-8") as out:
-        json.dump(data, out, indent=2)
+            problems = schema_errors(data)
+            if problems:
+                print(f"⚠️ Fixed: {file.name}, still invalid:")
+                for problem in problems:
+                    print(f"   - {problem}")
+            else:
+                print(f"✅ Fixed: {file.name}")
 
-    print(f"✅ Fixed: {file.name}")
+    print(f"\n🎉 All lesson files processed and saved to {args.output_dir}/")
 
-print("\n🎉 All lesson files processed and saved to lesson-content-fixed/")
+if __name__ == "__main__":
+    main()
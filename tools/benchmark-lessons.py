@@ -0,0 +1,75 @@
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from lesson_benchmark import (ALL_STEPS, BASELINE_PATH, DEFAULT_SCALES, DEFAULT_THRESHOLD, compare_to_baseline,
+                              load_baseline, machine_info, run_scale, save_baseline)
+from lesson_build import LESSON_CONTENT_DIR
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the lesson tools on the corpus and on synthetic 10x/100x copies of it")
+    parser.add_argument("--content-dir", type=Path, default=LESSON_CONTENT_DIR)
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)),
+                        help="comma-separated corpus multiples (default: 1,10,100)")
+    parser.add_argument("--steps", default=",".join(ALL_STEPS),
+                        help=f"comma-separated steps (available: {', '.join(ALL_STEPS)})")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="runs per step, median is kept (default: 3)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"fail when a step is this much slower than baseline (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--json", type=Path, help="also write this run's results to a file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    steps = [s.strip() for s in args.steps.split(",") if s.strip()]
+    unknown = [s for s in steps if s not in ALL_STEPS]
+    if unknown:
+        raise SystemExit(f"Unknown step(s): {', '.join(unknown)}")
+
+    def progress(metric, seconds, lessons):
+        print(f"⏱️  {metric:<28} {seconds:9.3f}s  ({lessons} lessons)")
+
+    results = {}
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f"lesson-bench-{scale}x-") as workdir:
+            results.update(run_scale(workdir, scale, steps, args.repeat, args.content_dir, progress))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"machine": machine_info(), "metrics": results}, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\n⚠️ No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    if baseline.get("machine") != machine_info():
+        print(f"\n⚠️ Baseline was recorded on a different machine: {baseline.get('machine')}")
+
+    rows = compare_to_baseline(results, baseline, args.threshold)
+    print()
+    for row in rows:
+        mark = "❌" if row["regressed"] else "✅"
+        print(f"{mark} {row['metric']:<28} {row['baseline']:9.3f}s -> {row['current']:9.3f}s "
+              f"({row['change']:+.0%})")
+    regressed = [row for row in rows if row["regressed"]]
+    if regressed:
+        print(f"\n❌ {len(regressed)} step(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"\n🎉 No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
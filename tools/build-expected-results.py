@@ -0,0 +1,54 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from expected_results import expected_path_for, refresh_lesson
+from lesson_build import LESSON_CONTENT_DIR, LESSON_DATA_DIR, lesson_files, load_lesson
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run every exercise solution once and store its expected-result fingerprint")
+    parser.add_argument("--content-dir", type=Path, default=LESSON_CONTENT_DIR)
+    parser.add_argument("--data-dir", type=Path, default=LESSON_DATA_DIR)
+    parser.add_argument("--force", action="store_true", help="recompute even if the sidecar is current")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="process lessons with N worker processes (0 = one per core)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    lessons = [load_lesson(path) for path in lesson_files(args.content_dir)]
+
+    jobs = args.jobs or os.cpu_count() or 1
+    if jobs == 1:
+        results = [refresh_lesson(lesson, args.data_dir, args.force) for lesson in lessons]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(refresh_lesson, lessons,
+                                    [args.data_dir] * len(lessons), [args.force] * len(lessons)))
+
+    counts = {"updated": 0, "unchanged": 0, "missing-db": 0}
+    for lesson_id, status, errors in results:
+        counts[status] += 1
+        if status == "missing-db":
+            print(f"❌ lesson_{lesson_id}.db not found, run auto-create-lesson-dbs.py first")
+        elif status == "updated":
+            note = f" ⚠️ {errors} solution(s) failed" if errors else ""
+            print(f"✅ Wrote: {expected_path_for(lesson_id, args.data_dir).name}{note}")
+
+    # Sidecars for lessons that no longer exist.
+    current = {lesson["id"] for lesson in lessons}
+    for sidecar in Path(args.data_dir).glob("lesson_*.expected.json"):
+        if sidecar.name[len("lesson_"):-len(".expected.json")] not in current:
+            sidecar.unlink()
+            print(f"🗑️ Pruned: {sidecar.name}")
+
+    print(f"\n📦 {counts['updated']} updated, {counts['unchanged']} unchanged, "
+          f"{counts['missing-db']} missing a DB")
+
+
+if __name__ == "__main__":
+    main()
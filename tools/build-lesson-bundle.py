@@ -0,0 +1,42 @@
+import argparse
+import time
+from pathlib import Path
+
+from lesson_build import LESSON_CONTENT_DIR, LESSON_DATA_DIR, lesson_files, load_lesson
+from lesson_bundle import LessonBundle, compile_bundle, default_bundle_path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compile lesson-content/*.json into a single indexed bundle")
+    parser.add_argument("--content-dir", type=Path, default=LESSON_CONTENT_DIR)
+    parser.add_argument("--output", type=Path, default=default_bundle_path(LESSON_DATA_DIR))
+    parser.add_argument("--check", action="store_true",
+                        help="read every lesson back from the bundle and compare it with its source")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+    header = compile_bundle(args.content_dir, args.output)
+    elapsed = time.perf_counter() - started
+
+    source_bytes = sum(path.stat().st_size for path in lesson_files(args.content_dir))
+    bundle_bytes = args.output.stat().st_size
+    print(f"✅ Wrote {args.output.name}: {len(header['order'])} lessons, "
+          f"{bundle_bytes / 1024:.0f} KB (sources {source_bytes / 1024:.0f} KB) in {elapsed * 1000:.0f} ms")
+    print(f"🔖 Version: {header['version']}")
+
+    if args.check:
+        bundle = LessonBundle(args.output)
+        mismatched = [path.name for path in lesson_files(args.content_dir)
+                      if (lesson := load_lesson(path)) != bundle.get(lesson["id"])]
+        if mismatched:
+            for name in mismatched:
+                print(f"❌ {name} does not round-trip through the bundle")
+            raise SystemExit(1)
+        print("🎉 Every lesson round-trips through the bundle")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import time
+from pathlib import Path
+
+from lesson_build import LESSON_CONTENT_DIR, LESSON_DATA_DIR
+from lesson_catalog import (SEARCH_SECTIONS, connect, default_catalog_path, lessons_by_category, optimize_search,
+                            refresh_catalog, search)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the indexed lesson catalog (lesson-data/catalog.db)")
+    parser.add_argument("--content-dir", type=Path, default=LESSON_CONTENT_DIR)
+    parser.add_argument("--output", type=Path, default=default_catalog_path(LESSON_DATA_DIR))
+    parser.add_argument("--list", action="store_true", help="print the catalog grouped by category")
+    parser.add_argument("--search", metavar="TEXT", help="search the lesson text and print the best matches")
+    parser.add_argument("--section", choices=SEARCH_SECTIONS, help="only search this section (with --search)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+    conn = connect(args.output)
+    try:
+        updated, removed = refresh_catalog(conn, args.content_dir)
+        # Leave the file untouched when nothing changed, so a no-op build doesn't dirty the committed catalog.db.
+        if updated or removed:
+            optimize_search(conn)
+            conn.execute("ANALYZE")
+            conn.commit()
+            conn.execute("VACUUM")  # drop the pages the old search segments used
+        elapsed = time.perf_counter() - started
+
+        for lesson_id in removed:
+            print(f"🗑️ Removed: {lesson_id}")
+        total = conn.execute("SELECT COUNT(*) FROM lessons").fetchone()[0]
+        print(f"✅ {args.output.name}: {total} lessons, {len(updated)} updated, {len(removed)} removed "
+              f"in {elapsed * 1000:.0f} ms ({args.output.stat().st_size / 1024:.0f} KB)")
+
+        if args.list:
+            for category, lessons in lessons_by_category(conn).items():
+                print(f"\n📚 {category}")
+                for lesson in lessons:
+                    print(f"   {lesson['id']} ({lesson['difficulty']}, {lesson['estimated_time']})")
+
+        if args.search:
+            hits = search(conn, args.search, args.section)
+            print(f"\n🔎 {len(hits)} match(es) for {args.search!r}")
+            for hit in hits:
+                where = f"{hit['lesson_id']} · {hit['section']}" + (f" · {hit['item_id']}" if hit["item_id"] else "")
+                print(f"   {where}: {hit['title']}")
+                print(f"      {' '.join(hit['snippet'].split())}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+from pathlib import Path
+
+from lesson_build import LESSON_CONTENT_DIR, LESSON_DATA_DIR, lesson_files, load_lesson
+from query_governor import (BUDGETS_VERSION, DEFAULT_BUDGET, DEFAULT_HEADROOM, default_budgets_path, derive_budget,
+                            measure_lesson, save_budgets)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Derive per-lesson query budgets from the measured cost of each lesson's reference solutions")
+    parser.add_argument("--content-dir", type=Path, default=LESSON_CONTENT_DIR)
+    parser.add_argument("--data-dir", type=Path, default=LESSON_DATA_DIR)
+    parser.add_argument("-o", "--output", type=Path, help="budgets file (default: <data-dir>/query-budgets.json)")
+    parser.add_argument("--headroom", type=float, default=DEFAULT_HEADROOM,
+                        help=f"budget = worst reference cost x this (default: {DEFAULT_HEADROOM})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = args.output or default_budgets_path(args.data_dir)
+    budgets = {"version": BUDGETS_VERSION, "default": dict(DEFAULT_BUDGET), "headroom": args.headroom, "lessons": {}}
+
+    for path in lesson_files(args.content_dir):
+        lesson = load_lesson(path)
+        measured = measure_lesson(lesson, args.data_dir)
+        override = lesson.get("queryBudget")
+        if not measured and not override:
+            continue
+        budget = derive_budget(measured, args.headroom, override)
+        budgets["lessons"][lesson["id"]] = {**budget, "measured": measured}
+        source = "pinned" if override else f"{measured['instructions']:,} instr / {measured['ms']:.2f} ms measured"
+        print(f"📏 {lesson['id']}: {budget['instructions']:,} instructions, {budget['deadline_ms']:g} ms ({source})")
+
+    save_budgets(budgets, output)
+    print(f"\n✅ Budgets for {len(budgets['lessons'])} lessons written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import json
+import sys
+
+from expected_results import CANONICAL_VECTORS_PATH, canonical_value
+
+PARSE = {
+    "float": float,
+    "int": int,
+    "text": str,
+    "null": lambda value: None,
+    "blob": bytes.fromhex,
+}
+
+
+def main():
+    """Check canonical_value() against the vectors the Node backend is checked against too."""
+    with open(CANONICAL_VECTORS_PATH, "r", encoding="utf-8") as f:
+        cases = json.load(f)["cases"]
+
+    failed = 0
+    for case in cases:
+        actual = canonical_value(PARSE[case["type"]](case["value"]))
+        if actual != case["canonical"]:
+            failed += 1
+            print(f"❌ {case['type']} {case['value']}: expected {case['canonical']}, got {actual}")
+
+    print(f"\n❌ {failed} of {len(cases)} case(s) failed" if failed else f"✅ {len(cases)} cases match")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
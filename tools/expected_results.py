@@ -0,0 +1,190 @@
+"""
+Precomputed expected results for every exercise.
+
+For each lesson, every `practice` solution and challenge `step` solution is
+run once against lesson_<id>.db and summarised in a sidecar file
+lesson-data/lesson_<id>.expected.json:
+
+{
+  "version": 2,
+  "lesson": "<id>",
+  "db_sha256": "<hash of the DB file the results were computed from>",
+  "solutions_sha256": "<hash of every exercise id + solution>",
+  "exercises": {
+    "<exercise id>": {"kind": "practice", "status": "ok", "type": "rows",
+                      "columns": [...], "row_count": 3, "fingerprint": "<hex>"},
+    "<exercise id>": {"kind": "step", "status": "ok", "type": "statement", "changes": 1},
+    "<exercise id>": {"kind": "step", "status": "error", "error": "..."}
+  }
+}
+
+The fingerprint ignores row order and column order (like areResultsEqual in
+services/validationService.js) but, unlike a Set, keeps duplicate rows. The
+artifact is only trusted while db_sha256 matches the DB on disk.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from decimal import Decimal
+from pathlib import Path
+
+from lesson_build import LESSON_DATA_DIR, db_path_for, file_sha256
+from lesson_queries import has_statement, iter_exercises, run_query
+
+ARTIFACT_VERSION = 2
+_MOD = 1 << 256
+# Integers beyond this reach Node as (rounded) doubles.
+_MAX_SAFE_INTEGER = (1 << 53) - 1
+# Cases canonical_value() and its Node twin must both reproduce.
+CANONICAL_VECTORS_PATH = Path(__file__).resolve().parent.parent / "backend" / "services" / "canonical-values.json"
+
+
+def expected_path_for(lesson_id, data_dir=LESSON_DATA_DIR):
+    return Path(data_dir) / f"lesson_{lesson_id}.expected.json"
+
+
+def solutions_hash(lesson):
+    canonical = json.dumps(list(iter_exercises(lesson)), separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def canonical_float(value):
+    """
+    The shortest digits that round-trip `value`, in exponent form without a
+    "+" (1e-7, 1.5e0, 1.23456e2). Python's repr and JS's toExponential()
+    pick the same digits but write them differently (1e-07 / 1e-7,
+    1e+16 / 10000000000000000), so both sides normalize to this.
+    """
+    return format(Decimal(repr(value)), "e").replace("e+", "e")
+
+
+def canonical_value(value):
+    """
+    Type-tagged text for one cell. Integral floats collapse onto ints because
+    the Node driver hands both back as the same JS number, and ints too large
+    for a double to hold exactly are rounded the way Node reads them. Must
+    match canonicalValue() in backend/services/expectedResults.js; both are
+    checked against backend/services/canonical-values.json.
+    """
+    if value is None:
+        return "n"
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int) and abs(value) > _MAX_SAFE_INTEGER:
+        value = float(value)
+    if isinstance(value, float):
+        if value.is_integer():
+            return f"i:{int(value)}"
+        return f"f:{canonical_float(value)}"
+    if isinstance(value, int):
+        return f"i:{value}"
+    if isinstance(value, bytes):
+        return f"b:{value.hex()}"
+    return f"s:{value}"
+
+
+def row_digest(columns, row):
+    """Hash of one row, independent of column order."""
+    cells = sorted(zip(columns, row), key=lambda cell: cell[0])
+    text = "\x1f".join(f"{name}\x1e{canonical_value(value)}" for name, value in cells)
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def fingerprint_rows(columns, rows):
+    """
+    Order-insensitive multiset fingerprint of a result set.
+
+    Row digests are summed modulo 2**256, so rows can be streamed straight from
+    a cursor without sorting or holding the result. Returns (fingerprint, row_count).
+    """
+    total = 0
+    count = 0
+    for row in rows:
+        total = (total + int.from_bytes(row_digest(columns, row), "big")) % _MOD
+        count += 1
+    return f"{total:064x}", count
+
+
+def expected_for_solution(db_path, solution):
+    """Run one reference solution and summarise its result."""
+    if not has_statement(solution):
+        return {"status": "error", "error": "solution has no SQL statement"}
+    try:
+        with run_query(db_path, solution) as (columns, rows):
+            if columns is None:
+                return {"status": "ok", "type": "statement", "changes": rows}
+            fingerprint, row_count = fingerprint_rows(columns, rows)
+            return {"status": "ok", "type": "rows", "columns": columns,
+                    "row_count": row_count, "fingerprint": fingerprint}
+    except (sqlite3.Error, ValueError) as e:
+        return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+
+
+def compute_expected(lesson, data_dir=LESSON_DATA_DIR):
+    """Build the full sidecar document for one lesson."""
+    db_path = db_path_for(lesson["id"], data_dir)
+    exercises = {}
+    for kind, exercise_id, solution in iter_exercises(lesson):
+        exercises[exercise_id] = {"kind": kind, **expected_for_solution(db_path, solution)}
+    return {
+        "version": ARTIFACT_VERSION,
+        "lesson": lesson["id"],
+        "db_sha256": file_sha256(db_path),
+        "solutions_sha256": solutions_hash(lesson),
+        "exercises": exercises,
+    }
+
+
+def load_expected(lesson_id, data_dir=LESSON_DATA_DIR, db_sha256=None):
+    """
+    Load a lesson's sidecar, or None if it is missing or stale.
+
+    Pass `db_sha256` when the caller already knows the DB hash; otherwise it is
+    computed from the DB file.
+    """
+    path = expected_path_for(lesson_id, data_dir)
+    db_path = db_path_for(lesson_id, data_dir)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not db_path.exists() or artifact.get("version") != ARTIFACT_VERSION:
+        return None
+    if db_sha256 is None:
+        db_sha256 = file_sha256(db_path)
+    if artifact.get("db_sha256") != db_sha256:
+        return None
+    return artifact
+
+
+def is_current(lesson, data_dir=LESSON_DATA_DIR):
+    artifact = load_expected(lesson["id"], data_dir)
+    return artifact is not None and artifact.get("solutions_sha256") == solutions_hash(lesson)
+
+
+def write_expected(artifact, data_dir=LESSON_DATA_DIR):
+    path = expected_path_for(artifact["lesson"], data_dir)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+def refresh_lesson(lesson, data_dir=LESSON_DATA_DIR, force=False):
+    """
+    Recompute one lesson's sidecar if its DB or solutions changed.
+    Returns (lesson_id, "updated" | "unchanged" | "missing-db", failed_solutions).
+    """
+    if not db_path_for(lesson["id"], data_dir).exists():
+        return lesson["id"], "missing-db", 0
+    if not force and is_current(lesson, data_dir):
+        return lesson["id"], "unchanged", 0
+    artifact = compute_expected(lesson, data_dir)
+    write_expected(artifact, data_dir)
+    errors = sum(1 for entry in artifact["exercises"].values() if entry["status"] == "error")
+    return lesson["id"], "updated", errors
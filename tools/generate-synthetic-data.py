@@ -0,0 +1,64 @@
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from lesson_build import LESSON_CONTENT_DIR, LESSON_DATA_DIR, build_lesson_db, lesson_files, load_lesson
+from synthetic_data import find_foreign_keys, grow_lesson
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Build a lesson DB whose tables are grown to a target row count with synthetic data")
+    parser.add_argument("lesson", help="lesson id, e.g. window-functions")
+    parser.add_argument("-n", "--rows", type=int, default=100_000, help="target rows per table (default: 100000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed; same seed, same database (default: 0)")
+    parser.add_argument("--content-dir", type=Path, default=LESSON_CONTENT_DIR)
+    parser.add_argument("-o", "--output", type=Path,
+                        help="output DB (default: lesson-data/synthetic/lesson_<id>.<rows>.db, "
+                             "never the DB the backend serves)")
+    return parser.parse_args()
+
+
+def find_lesson(content_dir, lesson_id):
+    for path in lesson_files(content_dir):
+        lesson = load_lesson(path)
+        if lesson.get("id") == lesson_id:
+            return lesson
+    return None
+
+
+def main():
+    args = parse_args()
+    lesson = find_lesson(args.content_dir, args.lesson)
+    if lesson is None:
+        print(f"❌ No lesson with id '{args.lesson}' in {args.content_dir}")
+        sys.exit(1)
+    if not lesson.get("schema", {}).get("tables"):
+        print(f"❌ Lesson '{args.lesson}' declares no tables to grow")
+        sys.exit(1)
+
+    output = args.output or LESSON_DATA_DIR / "synthetic" / f"lesson_{args.lesson}.{args.rows}.db"
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    fks = find_foreign_keys(lesson["schema"], lesson.get("sample_data", {}))
+    for (child, column), (parent, parent_column) in sorted(fks.items()):
+        print(f"🔗 {child}.{column} -> {parent}.{parent_column}")
+
+    started = time.perf_counter()
+    build_lesson_db(lesson, output, row_sources=grow_lesson(lesson, args.rows, args.seed))
+    elapsed = time.perf_counter() - started
+
+    conn = sqlite3.connect(output)
+    try:
+        for table in lesson["schema"]["tables"]:
+            (count,) = conn.execute(f"SELECT COUNT(*) FROM {table['name']}").fetchone()
+            print(f"📦 {table['name']}: {count:,} rows")
+    finally:
+        conn.close()
+    print(f"✅ {output} ({output.stat().st_size / 1e6:.1f} MB) in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ from pathlib import Path
 import json
 import sqlite3
 
+from lesson_schema import errors as schema_errors
+
 # Define the lesson JSON structure
 lesson = {
     "id": "sql-datatypes",
@@ -70,13 +72,15 @@ lesson = {
     "practice": [
         {
             "id": "practice1",
-            "challenge": "Get all usernames and their creation date.",
+            "title": "Specific Columns",
+            "description": "Get all usernames and their creation date.",
             "solution": "SELECT username, created_at FROM users;",
             "hint": "Select two specific columns."
         },
         {
             "id": "practice2",
-            "challenge": "Get all users whose age is greater than 25.",
+            "title": "Filter by Age",
+            "description": "Get all users whose age is greater than 25.",
             "solution": "SELECT * FROM users WHERE age > 25;",
             "hint": "Use a WHERE clause with the age column."
         }
@@ -122,6 +126,11 @@ lesson = {
     ]
 }
 
+# Refuse to write a lesson the validators would reject
+problems = schema_errors(lesson)
+if problems:
+    raise SystemExit("❌ Generated lesson is invalid:\n  " + "\n  ".join(problems))
+
 # Create folders
 lesson_dir = Path("/mnt/data/lesson-content")
 db_dir = Path("/mnt/data/lesson-data")
@@ -0,0 +1,195 @@
+"""
+One idempotent pass that gives every exercise, quiz and challenge id its
+canonical form. It replaces the overlapping rules of fix_ids.py,
+fix_practice_ids.py and automatically-prefix.py.
+
+The canonical forms are the ones the shipped lessons already use, because
+these ids are the exercise keys of /api/validate, of saved user progress and
+of the *.expected.json sidecars; a first run over the current corpus moves
+nothing:
+
+  practice[i].id                 -> practice_<i>             (1-based, as generated)
+  quiz[i].id                     -> <prefix>_q<i>            (1-based; <prefix> is the one
+                                                              the lesson's quiz ids already
+                                                              share, else the lesson id)
+  challenges[c].id               -> kept; a lesson-id prefix repeated by
+                                    automatically-prefix.py collapses to one,
+                                    and a missing id becomes <lesson id>_ch<c>
+  challenges[c].steps[s].stepId  -> <challenge id>_step<s>   (1-based; the
+                                    <lesson id>_<challenge id>_step<s> form
+                                    fix_ids.py wrote is kept as is)
+
+Each rule belongs to one KIND ("practice", "quiz", "challenges", "steps") so
+the legacy scripts can stay limited to the ids they used to rewrite.
+
+Running it on its own output changes nothing. The new document is built in
+memory and written (atomically, keeping the file's indent and encoding
+style) only when its bytes differ from what is on disk.
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Below this many files a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 200
+
+KINDS = ("practice", "quiz", "challenges", "steps")
+
+_QUIZ_ID_RE = re.compile(r"^(.+)_q\d+$")
+
+
+def _strip_prefix(value, prefix):
+    while value.startswith(prefix):
+        value = value[len(prefix):]
+    return value
+
+
+def canonical_challenge_id(lesson_id, challenge_id, index):
+    prefix = f"{lesson_id}_"
+    challenge_id = str(challenge_id or "")
+    name = _strip_prefix(challenge_id, prefix)
+    if not name:
+        return f"{prefix}ch{index}"
+    return prefix + name if challenge_id.startswith(prefix) else name
+
+
+def quiz_prefix(lesson_id, quiz):
+    """The prefix a lesson's quiz ids share (e.g. "altertable"), else the lesson id."""
+    prefixes = {m.group(1) for item in quiz if isinstance(item, dict)
+                if (m := _QUIZ_ID_RE.match(str(item.get("id") or "")))}
+    if len(prefixes) != 1:
+        return lesson_id
+    prefix = prefixes.pop()
+    return lesson_id if prefix.startswith(f"{lesson_id}_") else prefix
+
+
+def canonical_step_id(lesson_id, challenge_id, step_id, index):
+    canonical = f"{challenge_id}_step{index}"
+    if step_id == f"{lesson_id}_{canonical}":
+        return step_id
+    return canonical
+
+
+def normalize_lesson_ids(lesson, kinds=KINDS):
+    """
+    Rewrite the ids of the given kinds in place; returns a list of moves:
+      {"path": "quiz[2].id", "old": ..., "new": ...}
+    """
+    lesson_id = lesson.get("id")
+    if not lesson_id:
+        raise ValueError("lesson missing 'id'")
+    moves = []
+
+    def assign(item, key, new, path):
+        old = item.get(key)
+        if old != new:
+            item[key] = new
+            moves.append({"path": path, "old": old, "new": new})
+
+    if "practice" in kinds:
+        for i, item in enumerate(lesson.get("practice", []) or [], start=1):
+            if isinstance(item, dict):
+                assign(item, "id", f"practice_{i}", f"practice[{i - 1}].id")
+
+    if "quiz" in kinds:
+        quiz = lesson.get("quiz", []) or []
+        prefix = quiz_prefix(lesson_id, quiz)
+        for i, item in enumerate(quiz, start=1):
+            if isinstance(item, dict):
+                assign(item, "id", f"{prefix}_q{i}", f"quiz[{i - 1}].id")
+
+    for c, challenge in enumerate(lesson.get("challenges", []) or [], start=1):
+        if not isinstance(challenge, dict):
+            continue
+        if "challenges" in kinds:
+            assign(challenge, "id", canonical_challenge_id(lesson_id, challenge.get("id"), c),
+                   f"challenges[{c - 1}].id")
+        if "steps" not in kinds:
+            continue
+        challenge_id = challenge.get("id") or f"{lesson_id}_ch{c}"
+        for s, step in enumerate(challenge.get("steps", []) or [], start=1):
+            if isinstance(step, dict):
+                assign(step, "stepId", canonical_step_id(lesson_id, challenge_id, step.get("stepId"), s),
+                       f"challenges[{c - 1}].steps[{s - 1}].stepId")
+
+    return moves
+
+
+def detect_format(raw):
+    """json.dumps settings that reproduce a file's existing style."""
+    text = raw.decode("utf-8")
+    indent = 2
+    for line in text.splitlines()[1:]:
+        stripped = line.lstrip(" ")
+        if stripped and len(stripped) != len(line):
+            indent = len(line) - len(stripped)
+            break
+    return {
+        "indent": indent,
+        "ensure_ascii": all(b < 0x80 for b in raw),
+        "trailing_newline": text.endswith("\n"),
+    }
+
+
+def render(lesson, fmt):
+    text = json.dumps(lesson, indent=fmt["indent"], ensure_ascii=fmt["ensure_ascii"])
+    if fmt["trailing_newline"]:
+        text += "\n"
+    return text.encode("utf-8")
+
+
+def write_atomic(path, data):
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.chmod(tmp_path, path.stat().st_mode & 0o777)
+    os.replace(tmp_path, path)
+
+
+def normalize_file(path, write=False, kinds=KINDS):
+    """
+    Normalize one lesson file. Returns
+      {"file", "lesson", "moves", "changed", "written", "error"}
+    where `changed` means the rendered bytes differ from the file on disk.
+    """
+    path = Path(path)
+    result = {"file": path.name, "lesson": None, "moves": [], "changed": False, "written": False, "error": None}
+    try:
+        raw = path.read_bytes()
+        lesson = json.loads(raw)
+        result["lesson"] = lesson.get("id")
+        result["moves"] = normalize_lesson_ids(lesson, kinds)
+    except (json.JSONDecodeError, UnicodeDecodeError, ValueError, AttributeError) as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    if not result["moves"]:
+        # Nothing moved: leave the file (and its formatting) alone.
+        return result
+
+    new_raw = render(lesson, detect_format(raw))
+    result["changed"] = new_raw != raw
+    if write and result["changed"]:
+        write_atomic(path, new_raw)
+        result["written"] = True
+    return result
+
+
+def _normalize_chunk(paths, write, kinds):
+    return [normalize_file(path, write, kinds) for path in paths]
+
+
+def normalize_corpus(paths, write=False, jobs=0, kinds=KINDS):
+    paths = list(paths)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) < PARALLEL_THRESHOLD:
+        results = _normalize_chunk(paths, write, kinds)
+    else:
+        chunks = [paths[i::jobs] for i in range(jobs)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = [r for chunk in pool.map(_normalize_chunk, chunks, [write] * jobs, [kinds] * jobs) for r in chunk]
+    return sorted(results, key=lambda r: r["file"])
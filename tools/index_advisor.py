@@ -0,0 +1,229 @@
+"""
+Index advice for a lesson, derived from the plans of its own SQL.
+
+Every query a lesson ships (solutions, starterQuery, examples) is run through
+EXPLAIN QUERY PLAN against the lesson DB. For each full table scan
+("SCAN <table>") the columns the query filters or joins that table on become
+a candidate index: equality columns first, then one range column, then the
+other columns the query reads from the table so the index covers it. A
+candidate is only kept if, created on a scratch copy and ANALYZEd, it makes
+SQLite's planner stop scanning that table; the narrower key-only index is
+tried when the covering one doesn't help.
+
+Proposals use the `schema.indexes` format that lesson_build creates indexes
+from, and build_lesson_db runs ANALYZE on any lesson that has indexes, so
+applying advice is just adding them to the lesson and rebuilding.
+
+Lessons that teach the unindexed case opt out with
+  "indexAdvisor": false
+"""
+
+import re
+import sqlite3
+import statistics
+import time
+
+from lesson_build import LESSON_DATA_DIR, db_path_for, index_statements
+from lesson_queries import has_statement, iter_lesson_queries, memory_copy
+from query_profiler import query_plan
+
+MAX_INDEX_COLUMNS = 6
+
+_SCAN_RE = re.compile(r"^SCAN (\w+)$")
+_CLAUSE_RE = re.compile(r"\b(WHERE|ON|GROUP\s+BY|ORDER\s+BY|HAVING|LIMIT|JOIN|UNION|EXCEPT|INTERSECT|SELECT|FROM)\b",
+                        re.IGNORECASE)
+_SOURCE_RE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_LEFT_RE = re.compile(r"(?:(\w+)\.)?(\w+)\s*(==|=|<>|!=|<=|>=|<|>|\bIN\b|\bIS\b|\bLIKE\b|\bBETWEEN\b)",
+                      re.IGNORECASE)
+_RIGHT_RE = re.compile(r"(?:==|=|<=|>=|<|>)\s*(?:(\w+)\.)?(\w+)")
+_REF_RE = re.compile(r"(?:(\w+)\.)?(\w+|\*)")
+_EQUALITY_OPS = {"=", "==", "IN", "IS"}
+_KEYWORDS = {
+    "WHERE", "ON", "USING", "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "OUTER", "CROSS", "NATURAL",
+    "GROUP", "ORDER", "HAVING", "LIMIT", "UNION", "EXCEPT", "INTERSECT", "WINDOW", "SET", "VALUES",
+}
+
+
+def opted_out(lesson):
+    return lesson.get("indexAdvisor") is False
+
+
+def scanned_tables(conn, sql):
+    """Names (or aliases) that the plan of `sql` reads with a full table scan."""
+    return [m.group(1) for line in query_plan(conn, sql) if (m := _SCAN_RE.match(line.strip()))]
+
+
+def table_aliases(sql, tables):
+    """{alias or name: table} for the lesson tables named in FROM/JOIN clauses."""
+    aliases = {name: name for name in tables}
+    for table, alias in _SOURCE_RE.findall(sql):
+        if table in tables and alias and alias.upper() not in _KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def predicates(sql):
+    """The text of every WHERE and ON clause in `sql`."""
+    parts = _CLAUSE_RE.split(sql)
+    return [text for keyword, text in zip(parts[1::2], parts[2::2]) if keyword.upper() in ("WHERE", "ON")]
+
+
+def _refers_to(qualifier, column, table, columns, aliases):
+    if column not in columns[table]:
+        return False
+    return not qualifier or aliases.get(qualifier) == table
+
+
+def candidate_columns(sql, table, columns, aliases):
+    """
+    (key, covering) column lists for `table` in `sql`, or None if the query
+    doesn't filter or join on it. `covering` is None when the query reads
+    every column (SELECT *).
+    """
+    equality, ranges = [], []
+    for clause in predicates(sql):
+        for qualifier, column, op in _LEFT_RE.findall(clause):
+            if _refers_to(qualifier, column, table, columns, aliases):
+                (equality if op.upper() in _EQUALITY_OPS else ranges).append(column)
+        for qualifier, column in _RIGHT_RE.findall(clause):
+            if _refers_to(qualifier, column, table, columns, aliases):
+                equality.append(column)
+
+    key = list(dict.fromkeys(equality))
+    key += [column for column in dict.fromkeys(ranges) if column not in key][:1]
+    if not key:
+        return None
+
+    used, star = [], False
+    for qualifier, column in _REF_RE.findall(sql):
+        if column == "*" and (not qualifier or aliases.get(qualifier) == table):
+            star = True
+        elif _refers_to(qualifier, column, table, columns, aliases) and column not in key:
+            used.append(column)
+    covering = key + list(dict.fromkeys(used))
+    if star or len(covering) > MAX_INDEX_COLUMNS or covering == key:
+        covering = None
+    return key[:MAX_INDEX_COLUMNS], covering
+
+
+def _helps(conn, sql, alias, index):
+    """Does the planner SEARCH `alias` through `index` instead of scanning it?"""
+    conn.execute("BEGIN")
+    try:
+        for statement in index_statements({"indexes": [index]}):
+            conn.execute(statement)
+        conn.execute("ANALYZE")
+        return any(line.strip().startswith(f"SEARCH {alias} USING ") for line in query_plan(conn, sql))
+    finally:
+        conn.execute("ROLLBACK")
+
+
+def _prune(proposals):
+    """Drop an index whose columns are a prefix of another one on the same table."""
+    kept = []
+    for index in sorted(proposals, key=lambda i: -len(i["columns"])):
+        if not any(other["table"] == index["table"] and other["columns"][:len(index["columns"])] == index["columns"]
+                   for other in kept):
+            kept.append(index)
+    return sorted(kept, key=lambda i: (i["table"], i["columns"]))
+
+
+def _table_columns(conn):
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    return {table: {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')} for table in tables}
+
+
+def _median_ms(conn, sql, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        cursor = conn.execute(sql)
+        cursor.fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _read_queries(conn, lesson):
+    """(query_id, sql) for the lesson's queries that run and only read."""
+    queries = []
+    conn.execute("PRAGMA query_only = ON")
+    try:
+        for _, query_id, sql in iter_lesson_queries(lesson):
+            if not has_statement(sql):
+                continue
+            try:
+                conn.execute(sql).fetchall()
+            except (sqlite3.Error, ValueError):
+                continue  # writes, several statements or broken SQL
+            queries.append((query_id, sql))
+    finally:
+        conn.execute("PRAGMA query_only = OFF")
+    return queries
+
+
+def advise_lesson(lesson, data_dir=LESSON_DATA_DIR, runs=5):
+    """
+    Advice for one lesson:
+      {"lesson", "status": "ok" | "skipped" | "error", "error",
+       "scans": [{"query_id", "table"}], "proposals": [index, ...],
+       "timings": [{"query_id", "before_ms", "after_ms"}]}
+    Timings are medians of `runs` runs of every read-only query, before and
+    after the proposed indexes (plus ANALYZE) are added to a scratch copy.
+    """
+    report = {"lesson": lesson.get("id"), "status": "ok", "error": None,
+              "scans": [], "proposals": [], "timings": []}
+    if opted_out(lesson):
+        report["status"] = "skipped"
+        return report
+    db_path = db_path_for(lesson["id"], data_dir)
+    if not db_path.exists():
+        report.update(status="error", error="lesson DB not found")
+        return report
+
+    before = memory_copy(db_path)
+    before.isolation_level = None
+    try:
+        columns = _table_columns(before)
+        queries = _read_queries(before, lesson)
+        existing = lesson.get("schema", {}).get("indexes", [])
+        proposals = []
+        for query_id, sql in queries:
+            aliases = table_aliases(sql, columns)
+            for alias in scanned_tables(before, sql):
+                table = aliases.get(alias)
+                if table is None:
+                    continue  # a CTE or subquery, not a lesson table
+                report["scans"].append({"query_id": query_id, "table": table})
+                candidate = candidate_columns(sql, table, columns, aliases)
+                if candidate is None:
+                    continue
+                key, covering = candidate
+                for index_columns in filter(None, (covering, key)):
+                    index = {"table": table, "columns": index_columns}
+                    if _helps(before, sql, alias, index):
+                        proposals.append(index)
+                        break
+        report["proposals"] = [index for index in _prune(proposals)
+                               if not any(e["table"] == index["table"]
+                                          and e["columns"][:len(index["columns"])] == index["columns"]
+                                          for e in existing)]
+
+        after = memory_copy(db_path)
+        try:
+            for statement in index_statements({"indexes": report["proposals"]}):
+                after.execute(statement)
+            if report["proposals"]:
+                after.execute("ANALYZE")
+            after.commit()
+            for query_id, sql in queries:
+                report["timings"].append({"query_id": query_id,
+                                          "before_ms": _median_ms(before, sql, runs),
+                                          "after_ms": _median_ms(after, sql, runs)})
+        finally:
+            after.close()
+    except sqlite3.Error as e:
+        report.update(status="error", error=f"{type(e).__name__}: {e}")
+    finally:
+        before.close()
+    return report
@@ -0,0 +1,169 @@
+"""
+Benchmarks for the lesson toolchain, at the real corpus size and at
+synthetic multiples of it.
+
+A scaled corpus repeats every lesson `scale` times under new ids
+(<id>-x2, <id>-x3, ...), so 100x is 100 copies of the real content mix.
+Each step runs the actual command line tool as a subprocess against that
+corpus, so the numbers include interpreter start-up and imports, exactly as
+someone running the tool would see them. JSON load is timed in-process.
+
+Results are a flat {"<step>@<scale>x": seconds} map (median of the repeats)
+that can be saved as a baseline and compared against later runs.
+"""
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from lesson_build import LESSON_CONTENT_DIR, ROOT_DIR, lesson_files, load_lesson
+
+TOOLS_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = TOOLS_DIR / "benchmark-baseline.json"
+BASELINE_VERSION = 1
+
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_THRESHOLD = 0.25
+# Differences smaller than this are timer noise, whatever the percentage.
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def make_corpus(content_dir, dest, scale):
+    """Write `scale` copies of every lesson into dest/ under distinct ids."""
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for path in lesson_files(content_dir):
+        raw = path.read_bytes()
+        shutil.copyfile(path, dest / path.name)
+        count += 1
+        if scale == 1:
+            continue
+        lesson = json.loads(raw)
+        lesson_id = lesson["id"]
+        for copy in range(2, scale + 1):
+            lesson["id"] = f"{lesson_id}-x{copy}"
+            with open(dest / f"lesson_{lesson['id']}.json", "w", encoding="utf-8") as f:
+                json.dump(lesson, f, indent=2, ensure_ascii=False)
+            count += 1
+    return count
+
+
+def _tool(name):
+    path = TOOLS_DIR / name
+    return path if path.exists() else ROOT_DIR / name
+
+
+# step name -> function(workdir) returning the argv to time and its cwd.
+# workdir holds lesson-content/ (the scaled corpus) and lesson-data/.
+STEPS = {
+    "build_dbs": lambda w: ([_tool("auto-create-lesson-dbs.py"), "--content-dir", w / "lesson-content",
+                             "--data-dir", w / "lesson-data", "--force", "-j", "1"], w),
+    "validate_lessons": lambda w: ([_tool("validate-lessons.py"), "--content-dir", w / "lesson-content",
+                                    "--json", "-j", "1"], w),
+    "validate_quiz": lambda w: ([_tool("validate-quiz-structure.py"), "--content-dir", w / "lesson-content",
+                                 "--json", "-j", "1"], w),
+    "schema_check": lambda w: ([_tool("schema-check.py"), "--content-dir", w / "lesson-content",
+                                "--json", "-j", "1"], w),
+    "normalize_ids": lambda w: ([_tool("normalize-ids.py"), "--content-dir", w / "lesson-content",
+                                 "--json", "-j", "1"], w),
+    # auto-fix-lessons.py reads ./lesson-content and writes ./lesson-content-fixed
+    "auto_fix": lambda w: ([_tool("auto-fix-lessons.py")], w),
+    # Executes every solution query against the freshly built DBs.
+    "run_solutions": lambda w: ([_tool("build-expected-results.py"), "--content-dir", w / "lesson-content",
+                                 "--data-dir", w / "lesson-data", "--force", "-j", "1"], w),
+}
+# Steps that need the DBs from build_dbs.
+NEEDS_DBS = {"run_solutions"}
+ALL_STEPS = ("json_load", *STEPS)
+
+
+def time_json_load(content_dir):
+    started = time.perf_counter()
+    for path in lesson_files(content_dir):
+        load_lesson(path)
+    return time.perf_counter() - started
+
+
+def time_command(argv, cwd):
+    """Wall time of one run; raises if the tool crashed (exit codes 0/1 are results)."""
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, *map(str, argv)], cwd=cwd,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - started
+    if proc.returncode not in (0, 1):
+        raise RuntimeError(f"{Path(argv[0]).name} exited with {proc.returncode}: {proc.stderr.strip()[-500:]}")
+    return elapsed
+
+
+def run_scale(workdir, scale, steps, repeat=3, content_dir=LESSON_CONTENT_DIR, progress=None):
+    """Benchmark the given steps on one scaled corpus; returns {metric: seconds}."""
+    workdir = Path(workdir)
+    corpus = workdir / "lesson-content"
+    (workdir / "lesson-data").mkdir(parents=True, exist_ok=True)
+    lessons = make_corpus(content_dir, corpus, scale)
+
+    results = {}
+    order = sorted(steps, key=lambda s: s != "build_dbs")  # DBs first, later steps use them
+    if any(s in NEEDS_DBS for s in order) and "build_dbs" not in order:
+        time_command(*STEPS["build_dbs"](workdir))
+    for step in order:
+        if step == "json_load":
+            samples = [time_json_load(corpus) for _ in range(repeat)]
+        else:
+            argv, cwd = STEPS[step](workdir)
+            samples = [time_command(argv, cwd) for _ in range(repeat)]
+        metric = f"{step}@{scale}x"
+        results[metric] = round(statistics.median(samples), 4)
+        if progress:
+            progress(metric, results[metric], lessons)
+    return results
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return None
+    return baseline if baseline.get("version") == BASELINE_VERSION else None
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    baseline = {"version": BASELINE_VERSION, "machine": machine_info(), "metrics": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return baseline
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    One row per metric present in both:
+    {"metric", "baseline", "current", "change", "regressed"}
+    where change is relative (0.3 = 30% slower).
+    """
+    rows = []
+    for metric, current in sorted(results.items()):
+        before = baseline["metrics"].get(metric)
+        if before is None:
+            continue
+        change = (current - before) / before if before else 0.0
+        regressed = change > threshold and current - before > MIN_REGRESSION_SECONDS
+        rows.append({"metric": metric, "baseline": before, "current": current,
+                     "change": round(change, 4), "regressed": regressed})
+    return rows
@@ -0,0 +1,522 @@
+"""
+Shared helpers for building the per-lesson SQLite databases.
+
+The lesson tools all work on the same two folders:
+  backend/lesson-content/*.json   -> lesson definitions
+  backend/lesson-data/lesson_<id>.db -> database the backend opens for that lesson
+
+A small build manifest (lesson-data/.build-manifest.json) remembers a hash of
+each lesson's `schema` + `sample_data`, so rebuilds only touch lessons whose
+data actually changed. The manifest is committed alongside the DBs, so it only
+holds content hashes; the source files' mtime/size, which let a rebuild skip
+parsing unchanged lessons, are machine-specific and live in an untracked
+lesson-data/.build-stamps.json next to it.
+
+A lesson may also ask for a bigger dataset than it ships, e.g. for the
+performance lessons:
+  "synthetic": {"rows": 100000, "seed": 1}
+Its tables are then grown with synthetic_data.grow_lesson() while building.
+
+Many lessons ship exactly the same dataset (the same employees/departments
+tables and rows). The same hash identifies them: build_lessons() builds each
+distinct dataset once and hardlinks the other lessons' DBs to it, so build
+time and disk use follow the number of distinct datasets. Every lesson still
+gets its own self-contained lesson_<id>.db. Linked DBs are only ever replaced
+(atomically, with a new inode), never modified in place.
+
+Every DB is finalized before it is published (finalize_db): a page size that
+suits its size, WITHOUT ROWID for tables keyed by a natural (non-integer)
+primary key, and a VACUUM so pages are packed and in order. Its SHA-256 is
+recorded in the manifest; a DB whose bytes match that digest is known to be
+a finished build that is only ever replaced by rename, so the backend can
+open it with immutable=1 (no locking or change detection) and mmap reads.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from lesson_schema import errors as schema_errors
+from synthetic_data import grow_lesson
+
+# Always reference project root
+ROOT_DIR = Path(__file__).resolve().parent.parent
+LESSON_CONTENT_DIR = ROOT_DIR / "backend" / "lesson-content"
+LESSON_DATA_DIR = ROOT_DIR / "backend" / "lesson-data"
+
+MANIFEST_NAME = ".build-manifest.json"
+STAMPS_NAME = ".build-stamps.json"  # local stat cache, not committed
+STAMP_FIELDS = ("mtime_ns", "size")
+
+# Bump when the way a DB is built changes, so every lesson gets rebuilt once.
+BUILD_VERSION = 2
+
+# Stamped into finalized DBs (PRAGMA application_id), "SQLF".
+APPLICATION_ID = 0x53514C46
+
+# Page size by bytes of live data: tiny lesson DBs waste most of a 4 KiB page
+# per table, big synthetic ones want fewer, wider B-tree levels.
+PAGE_SIZES = ((64 << 10, 1024), (16 << 20, 4096))
+LARGE_PAGE_SIZE = 16384
+
+
+def load_lesson(path):
+    """Read and parse a single lesson JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def lesson_files(content_dir=LESSON_CONTENT_DIR):
+    """All lesson JSON files, in a stable order."""
+    return sorted(Path(content_dir).glob("*.json"))
+
+
+def db_path_for(lesson_id, data_dir=LESSON_DATA_DIR):
+    return Path(data_dir) / f"lesson_{lesson_id}.db"
+
+
+def lesson_data_hash(lesson):
+    """Hash of the parts of a lesson that end up in its database."""
+    payload = {
+        "schema": lesson.get("schema", {}),
+        "sample_data": lesson.get("sample_data", {}),
+    }
+    if lesson.get("synthetic"):
+        payload["synthetic"] = lesson["synthetic"]
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def column_definition(col):
+    col_def = f"{col['name']} {col['type']}"
+    if col.get("constraints"):
+        col_def += f" {col['constraints']}"
+    return col_def
+
+
+def create_schema(cursor, schema, without_rowid=()):
+    for table in schema.get("tables", []):
+        col_defs = [column_definition(col) for col in table["columns"]]
+        options = " WITHOUT ROWID" if table["name"] in without_rowid else ""
+        cursor.execute(f"CREATE TABLE {table['name']} ({', '.join(col_defs)}){options}")
+
+
+def natural_key_tables(lesson):
+    """
+    Tables that can be stored WITHOUT ROWID: one PRIMARY KEY column that is
+    not an INTEGER rowid alias, no AUTOINCREMENT, and no NULL keys in the
+    sample rows (WITHOUT ROWID enforces NOT NULL on the key). Lessons that
+    mention rowid anywhere keep ordinary tables.
+    """
+    if not lesson.get("schema") or "rowid" in json.dumps(lesson).lower():
+        return set()
+    sample_data = lesson.get("sample_data", {})
+    tables = set()
+    for table in lesson["schema"].get("tables", []):
+        keys = [col for col in table["columns"] if "PRIMARY KEY" in (col.get("constraints") or "").upper()]
+        if len(keys) != 1:
+            continue
+        key = keys[0]
+        if key["type"].strip().upper() == "INTEGER" or "AUTOINCREMENT" in key["constraints"].upper():
+            continue
+        if any(row.get(key["name"]) is None for row in sample_data.get(table["name"], [])):
+            continue
+        tables.add(table["name"])
+    return tables
+
+
+def insert_rows(cursor, table_name, columns, rows):
+    """Stream an iterable of value tuples into one table."""
+    placeholders = ", ".join(["?"] * len(columns))
+    insert_sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+    cursor.executemany(insert_sql, rows)
+
+
+def insert_sample_data(cursor, sample_data):
+    for table_name, rows in sample_data.items():
+        if not rows:
+            continue
+        columns = list(rows[0].keys())
+        insert_rows(cursor, table_name, columns, (tuple(row.get(col) for col in columns) for row in rows))
+
+
+def row_sources_for(lesson):
+    """The lesson's `synthetic` settings as grow_lesson() row sources, or None."""
+    settings = lesson.get("synthetic")
+    if not settings:
+        return None
+    return grow_lesson(lesson, int(settings["rows"]), settings.get("seed", 0))
+
+
+def index_statements(schema):
+    """
+    CREATE INDEX statements for the optional `schema.indexes` list, e.g.
+      {"table": "orders", "columns": ["customer_id", "order_date"], "unique": false}
+    """
+    statements = []
+    for index in schema.get("indexes", []):
+        columns = index["columns"]
+        name = index.get("name") or f"idx_{index['table']}_{'_'.join(columns)}"
+        unique = "UNIQUE " if index.get("unique") else ""
+        statements.append(f"CREATE {unique}INDEX {name} ON {index['table']} ({', '.join(columns)})")
+    return statements
+
+
+def page_size_for(used_bytes):
+    for limit, page_size in PAGE_SIZES:
+        if used_bytes < limit:
+            return page_size
+    return LARGE_PAGE_SIZE
+
+
+def finalize_db(conn):
+    """
+    Repack a freshly loaded DB for read-only serving: pick the page size,
+    stamp APPLICATION_ID and VACUUM. Must run outside a transaction.
+    """
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    conn.execute(f"PRAGMA page_size = {page_size_for((page_count - free_pages) * page_size)}")
+    conn.execute(f"PRAGMA application_id = {APPLICATION_ID}")
+    conn.execute("VACUUM")
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fsync_path(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # directories can't be fsynced on every platform
+    finally:
+        os.close(fd)
+
+
+def build_lesson_db(lesson, db_path, row_sources=None):
+    """
+    (Re)create the database for one lesson from its schema and sample data.
+
+    `row_sources` ({table: (columns, rows_iterable)}, see synthetic_data)
+    replaces sample_data as the source of rows; rows are consumed lazily.
+
+    The DB is bulk-loaded into a temp file next to the target: one transaction,
+    no rollback journal, no syncs, indexes created after the rows are in, then
+    finalize_db(). Only the finished file is fsynced and atomically renamed
+    over `db_path`, so the backend never sees a half-built database even if
+    the build crashes.
+    """
+    db_path = Path(db_path)
+    schema = lesson.get("schema", {})
+    if row_sources is None:
+        row_sources = row_sources_for(lesson)
+    fd, tmp_name = tempfile.mkstemp(dir=db_path.parent, prefix=f".{db_path.name}.", suffix=".tmp")
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+
+    try:
+        conn = sqlite3.connect(tmp_path, isolation_level=None)
+        try:
+            # Safe to relax durability: a crash just leaves a temp file behind.
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+            conn.execute("PRAGMA cache_size = -65536")  # 64 MiB
+
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            create_schema(cursor, schema, natural_key_tables(lesson))
+            if row_sources is None:
+                insert_sample_data(cursor, lesson.get("sample_data", {}))
+            else:
+                for table_name, (columns, rows) in row_sources.items():
+                    insert_rows(cursor, table_name, columns, rows)
+            for statement in index_statements(schema):
+                cursor.execute(statement)
+            if schema.get("indexes"):
+                cursor.execute("ANALYZE")  # sqlite_stat1, so the planner knows what the indexes buy
+            cursor.execute("COMMIT")
+            finalize_db(conn)
+        finally:
+            conn.close()
+
+        _fsync_path(tmp_path)
+        # mkstemp creates 0600 files; keep the mode the live DB already had.
+        os.chmod(tmp_path, db_path.stat().st_mode & 0o777 if db_path.exists() else 0o644)
+        os.replace(tmp_path, db_path)
+        _fsync_path(db_path.parent)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return db_path
+
+
+def link_lesson_db(source, db_path):
+    """
+    Make `db_path` a hardlink to `source`, an already built DB with the same
+    dataset (a copy if the filesystem can't link). Atomic like build_lesson_db.
+    """
+    source, db_path = Path(source), Path(db_path)
+    if db_path.exists() and os.path.samefile(source, db_path):
+        return db_path
+    tmp_path = db_path.with_name(f".{db_path.name}.{os.getpid()}.link.tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, db_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return db_path
+
+
+def _timed_build(lesson, db_path):
+    """Worker entry point: never raises, so one bad lesson can't stop the rest."""
+    started = time.perf_counter()
+    result = {"id": lesson.get("id"), "db": str(db_path), "ok": True, "error": None, "linked": None, "sha256": None}
+    problems = schema_errors(lesson, ["schema"])
+    if problems:
+        result.update(ok=False, error="invalid schema: " + "; ".join(problems[:5]),
+                      seconds=time.perf_counter() - started)
+        return result
+    try:
+        build_lesson_db(lesson, db_path)
+        result["sha256"] = file_sha256(db_path)
+    except Exception as e:
+        result["ok"] = False
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def _timed_link(lesson, db_path, source):
+    started = time.perf_counter()
+    result = {"id": lesson.get("id"), "db": str(db_path), "ok": True, "error": None, "linked": str(source),
+              "sha256": None}
+    try:
+        link_lesson_db(source, db_path)
+        result["sha256"] = file_sha256(db_path)
+    except OSError as e:
+        result["ok"] = False
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def _group_by_dataset(tasks, existing):
+    """
+    Split tasks into the ones to build (one per distinct dataset) and
+    (lesson, db_path, source) links to an identical DB.
+    """
+    groups = {}
+    for lesson, db_path in tasks:
+        groups.setdefault(lesson_data_hash(lesson), []).append((lesson, db_path))
+    builds, links = [], []
+    for data_hash, members in groups.items():
+        source = existing.get(data_hash)
+        if source is None or not Path(source).exists():
+            builds.append(members[0])
+            source, members = members[0][1], members[1:]
+        links.extend((lesson, db_path, source) for lesson, db_path in members)
+    return builds, links
+
+
+def build_lessons(tasks, jobs=1, existing=None, dedupe=True):
+    """
+    Build many lesson DBs, yielding one result dict per lesson as it finishes.
+
+    `tasks` is an iterable of (lesson, db_path). With jobs > 1 the lessons are
+    fanned out over a process pool; jobs=0 or None means one worker per core.
+    Each result has id, db, ok, error, seconds, linked and sha256 (the
+    digest of the finished DB, for its manifest entry).
+
+    With `dedupe`, lessons with the same dataset (lesson_data_hash) are built
+    once and the rest are hardlinked to that DB; `existing` ({data_hash:
+    db_path}, see plan_build) names up-to-date DBs that can be linked to
+    without building anything. `linked` is the source DB for those results.
+    """
+    tasks = list(tasks)
+    if dedupe:
+        builds, links = _group_by_dataset(tasks, existing or {})
+    else:
+        builds, links = tasks, []
+    if not jobs:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(builds)) or 1
+
+    failed = set()
+    if jobs == 1:
+        for lesson, db_path in builds:
+            result = _timed_build(lesson, db_path)
+            if not result["ok"]:
+                failed.add(str(db_path))
+            yield result
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(_timed_build, lesson, db_path): (lesson, db_path) for lesson, db_path in builds}
+            for future in as_completed(futures):
+                lesson, db_path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. killed, or the lesson couldn't be pickled).
+                    result = {"id": lesson.get("id"), "db": str(db_path), "ok": False,
+                              "error": f"{type(e).__name__}: {e}", "seconds": 0.0, "linked": None, "sha256": None}
+                if not result["ok"]:
+                    failed.add(str(db_path))
+                yield result
+
+    for lesson, db_path, source in links:
+        if str(source) in failed:
+            yield {"id": lesson.get("id"), "db": str(db_path), "ok": False, "seconds": 0.0, "linked": str(source),
+                   "sha256": None, "error": f"{Path(source).name} has the same data and failed to build"}
+        else:
+            yield _timed_link(lesson, db_path, source)
+
+
+# === Build manifest ===
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_json(path, data):
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def load_manifest(data_dir=LESSON_DATA_DIR):
+    """The build manifest, with this machine's source stamps merged into its entries."""
+    manifest = _read_json(Path(data_dir) / MANIFEST_NAME)
+    if not isinstance(manifest, dict) or manifest.get("version") != BUILD_VERSION:
+        # Missing, unreadable or built by an older builder: treat every lesson as stale.
+        return {"version": BUILD_VERSION, "lessons": {}}
+    manifest.setdefault("lessons", {})
+
+    stamps = _read_json(Path(data_dir) / STAMPS_NAME)
+    if isinstance(stamps, dict):
+        for entry in manifest["lessons"].values():
+            entry.update(stamps.get(entry.get("source"), {}))
+    return manifest
+
+
+def save_manifest(manifest, data_dir=LESSON_DATA_DIR):
+    """Write the content hashes to the manifest and the source stamps to the local stamp file."""
+    lessons, stamps = {}, {}
+    for lesson_id, entry in manifest.get("lessons", {}).items():
+        lessons[lesson_id] = {key: value for key, value in entry.items() if key not in STAMP_FIELDS}
+        stamp = {key: entry[key] for key in STAMP_FIELDS if key in entry}
+        if stamp:
+            stamps[entry["source"]] = stamp
+    _write_json(Path(data_dir) / MANIFEST_NAME, {**manifest, "lessons": lessons})
+    _write_json(Path(data_dir) / STAMPS_NAME, stamps)
+
+
+def source_stamp(path):
+    st = os.stat(path)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def plan_build(content_dir=LESSON_CONTENT_DIR, data_dir=LESSON_DATA_DIR, manifest=None, force=False):
+    """
+    Work out what needs doing without touching any database.
+
+    Returns a dict with:
+      build     -> list of (lesson, source_path, data_hash) that must be (re)built
+      unchanged -> list of lesson ids whose DB is already up to date
+      orphans   -> lesson_*.db paths with no matching lesson, plus stale build temp files
+      errors    -> list of (source_path, message) for unreadable lessons
+      entries   -> manifest entries for every current lesson, keyed by id
+      reusable  -> {data_hash: db_path} of unchanged DBs a rebuilt lesson with
+                   the same dataset can be linked to (see build_lessons)
+    """
+    if manifest is None:
+        manifest = load_manifest(data_dir)
+    known = manifest.get("lessons", {})
+    by_source = {entry.get("source"): (lesson_id, entry) for lesson_id, entry in known.items()}
+
+    plan = {"build": [], "unchanged": [], "orphans": [], "errors": [], "entries": {}, "reusable": {}}
+
+    for path in lesson_files(content_dir):
+        stamp = source_stamp(path)
+
+        # Fast path: the file is byte-for-byte where we left it, skip parsing.
+        cached = by_source.get(path.name)
+        if not force and cached:
+            lesson_id, entry = cached
+            if (entry.get("mtime_ns"), entry.get("size")) == (stamp["mtime_ns"], stamp["size"]) \
+                    and db_path_for(lesson_id, data_dir).exists():
+                plan["unchanged"].append(lesson_id)
+                plan["entries"][lesson_id] = entry
+                continue
+
+        try:
+            lesson = load_lesson(path)
+            lesson_id = lesson["id"]
+        except (json.JSONDecodeError, KeyError, UnicodeDecodeError) as e:
+            plan["errors"].append((path, str(e)))
+            continue
+
+        data_hash = lesson_data_hash(lesson)
+        entry = {"source": path.name, "db": db_path_for(lesson_id, data_dir).name, "hash": data_hash, **stamp}
+        plan["entries"][lesson_id] = entry
+
+        previous = known.get(lesson_id)
+        up_to_date = (
+            not force
+            and previous is not None
+            and previous.get("hash") == data_hash
+            and db_path_for(lesson_id, data_dir).exists()
+        )
+        if up_to_date:
+            # Only the file's stamp moved (touch, checkout, theory-only edit):
+            # the DB is the same one, so keep its digest for the immutable open.
+            if previous.get("sha256"):
+                entry["sha256"] = previous["sha256"]
+            plan["unchanged"].append(lesson_id)
+        else:
+            plan["build"].append((lesson, path, data_hash))
+
+    for lesson_id in plan["unchanged"]:
+        data_hash = plan["entries"][lesson_id].get("hash")
+        if data_hash:
+            plan["reusable"].setdefault(data_hash, db_path_for(lesson_id, data_dir))
+
+    wanted = {entry["db"] for entry in plan["entries"].values()}
+    # Lessons that failed to parse keep their old DB until they are fixed.
+    for path, _ in plan["errors"]:
+        cached = by_source.get(path.name)
+        if cached:
+            wanted.add(cached[1].get("db"))
+            plan["entries"][cached[0]] = cached[1]
+
+    for db_file in sorted(Path(data_dir).glob("lesson_*.db")):
+        if db_file.name not in wanted:
+            plan["orphans"].append(db_file)
+    # Temp files left behind by a build that was killed mid-load.
+    plan["orphans"].extend(sorted(Path(data_dir).glob(".lesson_*.db.*.tmp")))
+
+    return plan
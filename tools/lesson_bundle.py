@@ -0,0 +1,171 @@
+"""
+Compiled lesson bundle: every lesson-content/*.json in one file.
+
+Layout (all integers little-endian):
+
+    b"SQLFLB01"                  8-byte magic
+    uint32 header_length
+    header                       UTF-8 JSON, see below
+    data                         strings block, then one block per lesson
+
+header = {
+  "format": 1,
+  "version": "<sha256 of every source file name + bytes>",
+  "strings": [offset, length],          # JSON array of shared strings
+  "lessons": {"<id>": [offset, length], ...},
+  "order": ["<id>", ...]                 # source file order
+}
+
+Offsets are relative to the start of the data section. Each lesson block is
+compact JSON in which any string that occurs more than once in the corpus is
+replaced by {"$s": <index into the strings block>}. A single lesson can be
+read by slicing its block and resolving those references, without parsing
+any other lesson.
+"""
+
+import hashlib
+import json
+import os
+import struct
+from collections import Counter
+from pathlib import Path
+
+from lesson_build import LESSON_CONTENT_DIR, LESSON_DATA_DIR, lesson_files
+
+MAGIC = b"SQLFLB01"
+FORMAT = 1
+BUNDLE_NAME = "lessons.bundle"
+REF_KEY = "$s"
+
+# Strings shorter than this cost more as a reference than inline.
+MIN_SHARED_LENGTH = 8
+
+
+def default_bundle_path(data_dir=LESSON_DATA_DIR):
+    return Path(data_dir) / BUNDLE_NAME
+
+
+def _walk_strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _walk_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _walk_strings(item)
+
+
+def _encode(value, index):
+    if isinstance(value, str):
+        ref = index.get(value)
+        return {REF_KEY: ref} if ref is not None else value
+    if isinstance(value, dict):
+        if len(value) == 1 and REF_KEY in value:
+            raise ValueError(f"lesson content can't contain a bare {{{REF_KEY!r}: ...}} object")
+        return {key: _encode(item, index) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_encode(item, index) for item in value]
+    return value
+
+
+def _decode(value, strings):
+    if isinstance(value, dict):
+        if len(value) == 1 and REF_KEY in value:
+            return strings[value[REF_KEY]]
+        return {key: _decode(item, strings) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item, strings) for item in value]
+    return value
+
+
+def _compact(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def compile_bundle(content_dir=LESSON_CONTENT_DIR, output=None):
+    """Compile every lesson into one bundle file; returns the header dict."""
+    output = Path(output) if output else default_bundle_path()
+    version = hashlib.sha256()
+    lessons = []
+    for path in lesson_files(content_dir):
+        raw = path.read_bytes()
+        version.update(path.name.encode("utf-8") + b"\0" + raw + b"\0")
+        lessons.append(json.loads(raw))
+
+    counts = Counter(s for lesson in lessons for s in _walk_strings(lesson) if len(s) >= MIN_SHARED_LENGTH)
+    shared = sorted(s for s, n in counts.items() if n > 1)
+    index = {s: i for i, s in enumerate(shared)}
+
+    blocks = [_compact(shared)]
+    header = {"format": FORMAT, "version": version.hexdigest(), "lessons": {}, "order": []}
+    offset = len(blocks[0])
+    header["strings"] = [0, offset]
+    for lesson in lessons:
+        block = _compact(_encode(lesson, index))
+        header["lessons"][lesson["id"]] = [offset, len(block)]
+        header["order"].append(lesson["id"])
+        blocks.append(block)
+        offset += len(block)
+
+    header_bytes = _compact(header)
+    tmp_path = output.with_name(f".{output.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp_path, output)
+    return header
+
+
+class LessonBundle:
+    """
+    Reader for a compiled bundle. Only the header is parsed up front; the
+    strings block is parsed on first use and each lesson on request.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else default_bundle_path()
+        with open(self.path, "rb") as f:
+            self._data = f.read()
+        if self._data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a lesson bundle")
+        (header_length,) = struct.unpack_from("<I", self._data, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(self._data[start:start + header_length])
+        if self.header.get("format") != FORMAT:
+            raise ValueError(f"Unsupported bundle format: {self.header.get('format')}")
+        self._base = start + header_length
+        self._strings = None
+
+    @property
+    def version(self):
+        return self.header["version"]
+
+    def ids(self):
+        return list(self.header["order"])
+
+    def __contains__(self, lesson_id):
+        return lesson_id in self.header["lessons"]
+
+    def _slice(self, span):
+        offset, length = span
+        return self._data[self._base + offset:self._base + offset + length]
+
+    @property
+    def strings(self):
+        if self._strings is None:
+            self._strings = json.loads(self._slice(self.header["strings"]))
+        return self._strings
+
+    def get(self, lesson_id):
+        """One lesson as a dict, or None if the bundle doesn't have it."""
+        span = self.header["lessons"].get(lesson_id)
+        if span is None:
+            return None
+        return _decode(json.loads(self._slice(span)), self.strings)
+
+    def all(self):
+        return [self.get(lesson_id) for lesson_id in self.header["order"]]
@@ -0,0 +1,324 @@
+"""
+Small indexed SQLite catalog of the lesson corpus (lesson-data/catalog.db).
+
+Listing and filtering lessons only needs ids, titles and a few labels, not
+the full theory/quiz/sample_data bodies. The catalog keeps just that:
+
+  lessons(id, title, category, difficulty, estimated_time, position, source, content_hash)
+  exercises(lesson_id, exercise_id, title, position)            -- practice items
+  quiz_items(lesson_id, quiz_id, type, question, position)
+  challenge_steps(lesson_id, challenge_id, challenge_title, step_id, position)
+  search        FTS5 index of the lesson text: one row per lesson for its
+                theory, one per example, quiz item and practice exercise
+
+Rows are refreshed per lesson by content hash, so rebuilding after an edit
+only rewrites the lessons that changed, search rows included.
+
+search() ranks matches with BM25 (titles weigh more than body text) and
+returns a highlighted snippet per hit, plus the lesson id and the
+exercise/quiz id (or examples[i]) the hit belongs to.
+"""
+
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+
+from lesson_build import LESSON_CONTENT_DIR, LESSON_DATA_DIR, lesson_files, load_lesson
+
+CATALOG_NAME = "catalog.db"
+
+# Bump when the catalog layout changes; older catalogs are refilled on connect.
+CATALOG_VERSION = 2
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS lessons (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    category TEXT,
+    difficulty TEXT,
+    estimated_time TEXT,
+    position INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lessons_category ON lessons (category, position);
+CREATE INDEX IF NOT EXISTS idx_lessons_difficulty ON lessons (difficulty, position);
+
+CREATE TABLE IF NOT EXISTS exercises (
+    lesson_id TEXT NOT NULL,
+    exercise_id TEXT NOT NULL,
+    title TEXT,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (lesson_id, exercise_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS quiz_items (
+    lesson_id TEXT NOT NULL,
+    quiz_id TEXT NOT NULL,
+    type TEXT,
+    question TEXT,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (lesson_id, quiz_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_quiz_items_type ON quiz_items (type);
+
+CREATE TABLE IF NOT EXISTS challenge_steps (
+    lesson_id TEXT NOT NULL,
+    challenge_id TEXT NOT NULL,
+    challenge_title TEXT,
+    step_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (lesson_id, step_id)
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5(
+    lesson_id UNINDEXED,
+    section UNINDEXED,
+    item_id UNINDEXED,
+    title,
+    body,
+    tokenize = 'porter unicode61'
+);
+"""
+
+DETAIL_TABLES = ("exercises", "quiz_items", "challenge_steps", "search")
+
+SEARCH_SECTIONS = ("theory", "example", "quiz", "practice")
+# bm25() weights, one per search column: a hit in a title counts 5x.
+SEARCH_WEIGHTS = (0.0, 0.0, 0.0, 5.0, 1.0)
+SNIPPET_TOKENS = 16
+
+
+def default_catalog_path(data_dir=LESSON_DATA_DIR):
+    return Path(data_dir) / CATALOG_NAME
+
+
+def connect(path=None):
+    conn = sqlite3.connect(path or default_catalog_path())
+    conn.executescript(SCHEMA_SQL)
+    if conn.execute("PRAGMA user_version").fetchone()[0] != CATALOG_VERSION:
+        # Forget every content hash so the next refresh rewrites all lessons.
+        with conn:
+            conn.execute("DELETE FROM lessons")
+            for table in DETAIL_TABLES:
+                conn.execute(f"DELETE FROM {table}")
+            conn.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+    return conn
+
+
+def remove_lesson(conn, lesson_id):
+    conn.execute("DELETE FROM lessons WHERE id = ?", (lesson_id,))
+    for table in DETAIL_TABLES:
+        conn.execute(f"DELETE FROM {table} WHERE lesson_id = ?", (lesson_id,))
+
+
+def upsert_lesson(conn, lesson, source, content_hash, position):
+    """Replace every catalog row of one lesson."""
+    lesson_id = lesson["id"]
+    remove_lesson(conn, lesson_id)
+    conn.execute(
+        "INSERT INTO lessons (id, title, category, difficulty, estimated_time, position, source, content_hash) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (lesson_id, lesson.get("title", lesson_id), lesson.get("category"), lesson.get("difficulty"),
+         lesson.get("estimatedTime"), position, source, content_hash),
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO exercises (lesson_id, exercise_id, title, position) VALUES (?, ?, ?, ?)",
+        [(lesson_id, p["id"], p.get("title"), i)
+         for i, p in enumerate(lesson.get("practice", []) or []) if isinstance(p, dict) and "id" in p],
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO quiz_items (lesson_id, quiz_id, type, question, position) VALUES (?, ?, ?, ?, ?)",
+        [(lesson_id, q["id"], q.get("type"), q.get("question"), i)
+         for i, q in enumerate(lesson.get("quiz", []) or []) if isinstance(q, dict) and "id" in q],
+    )
+    steps = []
+    for challenge in lesson.get("challenges", []) or []:
+        if not isinstance(challenge, dict):
+            continue
+        for step in challenge.get("steps", []) or []:
+            if isinstance(step, dict) and "stepId" in step:
+                steps.append((lesson_id, challenge.get("id"), challenge.get("title"), step["stepId"], len(steps)))
+    conn.executemany(
+        "INSERT OR IGNORE INTO challenge_steps (lesson_id, challenge_id, challenge_title, step_id, position) "
+        "VALUES (?, ?, ?, ?, ?)",
+        steps,
+    )
+    conn.executemany("INSERT INTO search (lesson_id, section, item_id, title, body) VALUES (?, ?, ?, ?, ?)",
+                     search_rows(lesson))
+
+
+def _text(value, skip=("type", "src", "id")):
+    """Every string inside a JSON value, joined with newlines."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return "\n".join(filter(None, (_text(v, skip) for k, v in value.items() if k not in skip)))
+    if isinstance(value, list):
+        return "\n".join(filter(None, (_text(v, skip) for v in value)))
+    return ""
+
+
+def search_rows(lesson):
+    """(lesson_id, section, item_id, title, body) rows for the search index."""
+    lesson_id = lesson["id"]
+    rows = []
+    theory = _text(lesson.get("theory", []))
+    if theory:
+        rows.append((lesson_id, "theory", None, lesson.get("title", lesson_id), theory))
+    for i, example in enumerate(lesson.get("examples", []) or []):
+        if isinstance(example, dict):
+            rows.append((lesson_id, "example", f"examples[{i}]", example.get("title") or example.get("description", ""),
+                         _text([example.get("query"), example.get("explanation")])))
+    for item in lesson.get("quiz", []) or []:
+        if isinstance(item, dict) and "id" in item:
+            rows.append((lesson_id, "quiz", item["id"], item.get("question", ""),
+                         _text([item.get("options"), item.get("explanation")])))
+    for item in lesson.get("practice", []) or []:
+        if isinstance(item, dict) and "id" in item:
+            rows.append((lesson_id, "practice", item["id"], item.get("title", ""),
+                         _text([item.get("description"), item.get("hint")])))
+    return rows
+
+
+def file_hash(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def refresh_catalog(conn, content_dir=LESSON_CONTENT_DIR):
+    """
+    Bring the catalog in line with lesson-content in one transaction.
+    Returns (updated_ids, removed_ids).
+    """
+    known = {row[0]: row[1:] for row in conn.execute("SELECT source, id, content_hash, position FROM lessons")}
+    updated, seen = [], set()
+    with conn:
+        for position, path in enumerate(lesson_files(content_dir)):
+            digest = file_hash(path)
+            previous = known.get(path.name)
+            if previous and previous[1] == digest:
+                seen.add(previous[0])
+                if previous[2] != position:
+                    conn.execute("UPDATE lessons SET position = ? WHERE id = ?", (position, previous[0]))
+                    updated.append(previous[0])
+                continue
+            lesson = load_lesson(path)
+            upsert_lesson(conn, lesson, path.name, digest, position)
+            seen.add(lesson["id"])
+            updated.append(lesson["id"])
+
+        removed = [lesson_id for lesson_id, in conn.execute("SELECT id FROM lessons") if lesson_id not in seen]
+        for lesson_id in removed:
+            remove_lesson(conn, lesson_id)
+    return updated, removed
+
+
+def refresh_lesson(conn, path, lesson, content_dir=LESSON_CONTENT_DIR):
+    """
+    Bring one lesson's rows in line with its file after an edit, without
+    rescanning the corpus. Returns True if its rows were rewritten.
+    """
+    path = Path(path)
+    digest = file_hash(path)
+    previous = conn.execute("SELECT id, content_hash FROM lessons WHERE source = ?", (path.name,)).fetchone()
+    if previous == (lesson["id"], digest):
+        return False
+    names = [p.name for p in lesson_files(content_dir)]
+    position = names.index(path.name) if path.name in names else len(names)
+    with conn:
+        if previous and previous[0] != lesson["id"]:
+            remove_lesson(conn, previous[0])  # the lesson was renamed
+        upsert_lesson(conn, lesson, path.name, digest, position)
+        if previous is None:
+            reorder(conn, names)
+    return True
+
+
+def optimize_search(conn):
+    """Merge the search index's b-tree segments (left behind by incremental updates) into one."""
+    with conn:
+        conn.execute("INSERT INTO search (search) VALUES ('optimize')")
+
+
+def remove_source(conn, source_name):
+    """Drop the lesson stored from `source_name`; returns its id or None."""
+    row = conn.execute("SELECT id FROM lessons WHERE source = ?", (source_name,)).fetchone()
+    if row is None:
+        return None
+    with conn:
+        remove_lesson(conn, row[0])
+    return row[0]
+
+
+def reorder(conn, names):
+    """Reset positions to the order of the given source file names."""
+    conn.executemany("UPDATE lessons SET position = ? WHERE source = ?",
+                     [(position, name) for position, name in enumerate(names)])
+
+
+# === Queries ===
+
+LESSON_COLUMNS = "id, title, category, difficulty, estimated_time"
+
+
+def list_lessons(conn, category=None, difficulty=None):
+    sql = f"SELECT {LESSON_COLUMNS} FROM lessons"
+    clauses, params = [], []
+    if category is not None:
+        clauses.append("category = ?")
+        params.append(category)
+    if difficulty is not None:
+        clauses.append("difficulty = ?")
+        params.append(difficulty)
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY position"
+    columns = [c.strip() for c in LESSON_COLUMNS.split(",")]
+    return [dict(zip(columns, row)) for row in conn.execute(sql, params)]
+
+
+def lessons_by_category(conn):
+    """Same shape as groupLessonsByCategory(), built from the catalog."""
+    grouped = {}
+    for lesson in list_lessons(conn):
+        grouped.setdefault(lesson["category"], []).append(lesson)
+    return grouped
+
+
+def match_query(text):
+    """
+    FTS5 MATCH expression for free text typed by a user: every word must
+    match, the last one as a prefix (search-as-you-type). None if there are
+    no words.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search(conn, text, section=None, limit=20):
+    """
+    Best matches for `text`, best first:
+    [{"lesson_id", "lesson_title", "section", "item_id", "title", "snippet", "score"}]
+    """
+    expression = match_query(text)
+    if expression is None:
+        return []
+    weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+    sql = (
+        "SELECT s.lesson_id, l.title, s.section, s.item_id, s.title, "
+        f"snippet(search, 4, '[', ']', '…', {SNIPPET_TOKENS}), bm25(search, {weights}) AS score "
+        "FROM search s LEFT JOIN lessons l ON l.id = s.lesson_id WHERE search MATCH ?"
+    )
+    params = [expression]
+    if section is not None:
+        sql += " AND s.section = ?"
+        params.append(section)
+    sql += " ORDER BY score LIMIT ?"
+    params.append(limit)
+    columns = ("lesson_id", "lesson_title", "section", "item_id", "title", "snippet", "score")
+    return [dict(zip(columns, row)) for row in conn.execute(sql, params)]
@@ -0,0 +1,135 @@
+"""
+Shared --profile support for the lesson tools.
+
+With --profile a tool reports:
+  * per-lesson wall time of each phase it went through (read, parse,
+    transform, write), plus totals per phase and the slowest lessons
+  * a cProfile dump of the whole run (open it with `python -m pstats` or
+    snakeviz) and its top functions by cumulative time
+  * the tracemalloc peak of Python allocations
+
+Tools wrap their work in
+
+    with profiling(args.profile, "validate-lessons", args.profile_out) as profiler:
+        ...
+        with profiler.phase(lesson_name, "parse"):
+            lesson = json.loads(raw)
+
+Without --profile `profiler` is NULL_PROFILER, whose phase() is a shared
+no-op context, so the hooks cost nothing in normal runs. Tools that fan work
+out over a process pool run in-process while profiling, so every phase is
+measured in the process being profiled.
+"""
+
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+PHASES = ("read", "parse", "transform", "write")
+_NULL_CONTEXT = nullcontext()
+
+
+class Profiler:
+    """Per-lesson phase timings for one run."""
+
+    enabled = True
+
+    def __init__(self):
+        self.timings = {}  # lesson -> {phase: seconds}
+
+    @contextmanager
+    def phase(self, lesson, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            phases = self.timings.setdefault(str(lesson), {})
+            phases[name] = phases.get(name, 0.0) + time.perf_counter() - started
+
+    def totals(self):
+        totals = {}
+        for phases in self.timings.values():
+            for name, seconds in phases.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+
+class _NullProfiler:
+    enabled = False
+    timings = {}
+
+    def phase(self, lesson, name):
+        return _NULL_CONTEXT
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def add_profile_arguments(parser):
+    parser.add_argument("--profile", action="store_true",
+                        help="report per-lesson phase timings, a cProfile dump and peak memory")
+    parser.add_argument("--profile-out", type=Path,
+                        help="where to write the cProfile dump (default: ./<tool>.prof)")
+
+
+def _ordered_phases(totals):
+    return [p for p in PHASES if p in totals] + sorted(p for p in totals if p not in PHASES)
+
+
+def print_report(profiler, stats, peak_bytes, dump_path, wall, top=10, out=None):
+    out = out or sys.stderr
+    totals = profiler.totals()
+    phases = _ordered_phases(totals)
+
+    print(f"\n📊 Profile ({len(profiler.timings)} lessons, {wall:.3f}s wall)", file=out)
+    for name in phases:
+        print(f"   {name:<10} {totals[name] * 1000:10.1f} ms total", file=out)
+
+    slowest = sorted(profiler.timings.items(), key=lambda item: sum(item[1].values()), reverse=True)[:top]
+    if slowest:
+        print(f"\n🐢 Slowest lessons (ms: {', '.join(phases)})", file=out)
+        for lesson, lesson_phases in slowest:
+            cells = " ".join(f"{lesson_phases.get(p, 0.0) * 1000:8.2f}" for p in phases)
+            print(f"   {cells}  {lesson}", file=out)
+
+    print(f"\n🧠 Peak traced memory: {peak_bytes / 1e6:.1f} MB", file=out)
+
+    text = io.StringIO()
+    stats.stream = text
+    stats.sort_stats("cumulative").print_stats(top)
+    lines = [line for line in text.getvalue().splitlines() if line.strip()]
+    print(f"\n🔥 Top functions by cumulative time (full dump: {dump_path})", file=out)
+    for line in lines[-(top + 1):]:
+        print(f"   {line}", file=out)
+
+
+@contextmanager
+def profiling(enabled, tool_name, dump_path=None):
+    """
+    Profile the block when `enabled`; yields the Profiler (or NULL_PROFILER)
+    and prints the report when the block finishes, even if it fails or exits.
+    """
+    if not enabled:
+        yield NULL_PROFILER
+        return
+
+    profiler = Profiler()
+    dump_path = Path(dump_path) if dump_path else Path.cwd() / f"{tool_name}.prof"
+    tracemalloc.start()
+    profile = cProfile.Profile()
+    started = time.perf_counter()
+    profile.enable()
+    try:
+        yield profiler
+    finally:
+        profile.disable()
+        wall = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        profile.dump_stats(dump_path)
+        print_report(profiler, pstats.Stats(profile), peak, dump_path, wall)
@@ -0,0 +1,101 @@
+"""
+Helpers for running a lesson's own SQL (solutions, examples, starter queries)
+against its lesson-data DB, the same way the backend does.
+"""
+
+import re
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def iter_exercises(lesson):
+    """
+    Yield (kind, exercise_id, solution) for every gradable item in a lesson:
+    each `practice` entry and each challenge `step`. These are the ids the
+    frontend sends to /api/validate.
+    """
+    for item in lesson.get("practice", []) or []:
+        if isinstance(item, dict) and "id" in item:
+            yield "practice", item["id"], item.get("solution", "")
+    for challenge in lesson.get("challenges", []) or []:
+        if not isinstance(challenge, dict):
+            continue
+        for step in challenge.get("steps", []) or []:
+            if isinstance(step, dict) and "stepId" in step:
+                yield "step", step["stepId"], step.get("solution", "")
+
+
+def iter_lesson_queries(lesson):
+    """
+    Yield (kind, query_id, sql) for every piece of SQL a lesson ships:
+    exercise solutions, the starter query and each example query.
+    """
+    yield from iter_exercises(lesson)
+    if lesson.get("starterQuery"):
+        yield "starter", "starterQuery", lesson["starterQuery"]
+    for i, example in enumerate(lesson.get("examples", []) or []):
+        if isinstance(example, dict) and example.get("query"):
+            yield "example", f"examples[{i}]", example["query"]
+
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+
+def has_statement(sql):
+    """False for SQL that is empty or only comments (placeholder solutions)."""
+    return bool(_COMMENT_RE.sub("", sql or "").strip(" \t\r\n;"))
+
+
+def open_readonly(db_path):
+    """Read-only connection, like getLessonDB(lessonId) on the backend."""
+    conn = sqlite3.connect(f"file:{Path(db_path).resolve()}?mode=ro", uri=True)
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def memory_copy(db_path):
+    """Writable in-memory copy of a lesson DB, like getTempLessonDB(lessonId)."""
+    source = open_readonly(db_path)
+    try:
+        conn = sqlite3.connect(":memory:")
+        source.backup(conn)
+    finally:
+        source.close()
+    return conn
+
+
+def is_write_error(error):
+    message = str(error).lower()
+    return "readonly database" in message or "read-only" in message
+
+
+@contextmanager
+def run_query(db_path, sql):
+    """
+    Run one statement against a lesson DB.
+
+    Yields (columns, rows): for a query `rows` is the live cursor so results can
+    be streamed; for a statement with no result set `columns` is None and
+    `rows` is the number of rows it changed.
+
+    Statements run on a read-only connection first; anything that writes is
+    retried on an in-memory copy so the shipped DB is never modified.
+    """
+    conn = open_readonly(db_path)
+    try:
+        try:
+            cursor = conn.execute(sql)
+        except sqlite3.OperationalError as e:
+            if not is_write_error(e):
+                raise
+            conn.close()
+            conn = memory_copy(db_path)
+            cursor = conn.execute(sql)
+
+        if cursor.description is None:
+            yield None, cursor.rowcount
+        else:
+            yield [col[0] for col in cursor.description], cursor
+    finally:
+        conn.close()
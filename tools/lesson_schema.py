@@ -0,0 +1,417 @@
+"""
+The lesson format, declared once, and a compiler that turns it into plain
+Python validation functions.
+
+LESSON_SCHEMA describes a lesson JSON document as nested nodes:
+
+  "type"      "object", "array", "string", "integer", "number", "boolean",
+              "any" (default) or a tuple of these
+  "rule"      rule set the node's checks report under (inherited by children)
+  "required"  the key must be present; "missing": "warning" downgrades that
+  "nonEmpty"  "", [] and {} are errors
+  "alias"     legacy key accepted (with a warning) when the key is missing
+  "enum"      allowed values
+  "unique"    namespace the value must be unique in across the lesson
+              (reported under the "ids" rule)
+  "fields"    object keys -> nodes;  "items": array element node;
+  "values"    node for every value of an object used as a map
+  "switch"    {"field": "type", "cases": {"mcq": {"required": [...],
+              "memberOf": {"answer": "options"}}}}: extra checks per value
+              of a discriminator field
+
+compile_validator() walks the schema once and emits the source of one
+function per rule-set selection: straight-line `type(v) is str` tests,
+`dict.get` with a sentinel and `for` loops over arrays, with paths and
+messages only formatted when a check fails. A lesson is traversed once and
+every problem in it is reported. validator_for() caches the compiled
+functions, so each process compiles a selection once.
+
+Issues have the same shape as in lesson_validation:
+  {"rule": "quiz", "path": "quiz[3]", "severity": "error", "message": ...}
+"""
+
+from functools import lru_cache
+
+QUIZ_TYPES = ("mcq", "truefalse", "fill")
+DIFFICULTIES = ("Beginner", "Intermediate", "Advanced")
+
+# Optional per-exercise options for result comparison (see result_compare.py).
+COMPARE_OPTIONS = {
+    "type": "object",
+    "fields": {
+        "rowOrder": {"type": "boolean"},
+        "columnOrder": {"type": "boolean"},
+        "tolerance": {"type": "number"},
+        "maxDiff": {"type": "integer"},
+    },
+}
+
+QUIZ_ITEM = {
+    "type": "object",
+    "fields": {
+        "id": {"type": "string", "required": True, "nonEmpty": True, "unique": "quiz"},
+        "type": {"type": "string", "required": True, "enum": QUIZ_TYPES},
+        "question": {"type": "string", "required": True, "nonEmpty": True},
+        "options": {"type": "array", "items": {"type": "string"}},
+        "answer": {"type": ("string", "boolean"), "required": True},
+        "explanation": {"type": "string"},
+    },
+    "switch": {
+        "field": "type",
+        "cases": {"mcq": {"required": ["options"], "memberOf": {"answer": "options"}}},
+    },
+}
+
+# Practice exercises are {id, title, description, solution, ...}, as written
+# by the lesson generator and used throughout lesson-content. Older files
+# call the prompt `challenge`; that is still accepted, with a warning.
+PRACTICE_ITEM = {
+    "type": "object",
+    "fields": {
+        "id": {"type": "string", "required": True, "nonEmpty": True, "unique": "exercise"},
+        "title": {"type": "string", "required": True, "nonEmpty": True},
+        "description": {"type": "string", "required": True, "nonEmpty": True, "alias": "challenge"},
+        "starterCode": {"type": "string"},
+        "solution": {"type": "string", "required": True, "nonEmpty": True},
+        "hint": {"type": "string"},
+        "expectedOutput": {},
+        "compare": COMPARE_OPTIONS,
+    },
+}
+
+EXAMPLE_ITEM = {
+    "type": "object",
+    "fields": {
+        "query": {"type": "string", "required": True},
+        "description": {"type": "string", "required": True},
+        "explanation": {"type": "string", "required": True},
+    },
+}
+
+CHALLENGE_ITEM = {
+    "type": "object",
+    "fields": {
+        "id": {"type": "string", "required": True, "nonEmpty": True},
+        "title": {"type": "string", "required": True},
+        "steps": {
+            "type": "array",
+            "required": True,
+            "items": {
+                "type": "object",
+                "fields": {
+                    "stepId": {"type": "string", "required": True, "nonEmpty": True, "unique": "exercise"},
+                    "description": {"type": "string", "required": True},
+                    "solution": {"type": "string", "required": True, "nonEmpty": True},
+                    "compare": COMPARE_OPTIONS,
+                },
+            },
+        },
+    },
+}
+
+TABLE = {
+    "type": "object",
+    "fields": {
+        "name": {"type": "string", "required": True, "nonEmpty": True},
+        "columns": {
+            "type": "array",
+            "required": True,
+            "items": {
+                "type": "object",
+                "fields": {
+                    "name": {"type": "string", "required": True, "nonEmpty": True},
+                    "type": {"type": "string", "required": True, "nonEmpty": True},
+                    "constraints": {"type": "string"},
+                },
+            },
+        },
+    },
+}
+
+INDEX = {
+    "type": "object",
+    "fields": {
+        "table": {"type": "string", "required": True, "nonEmpty": True},
+        "columns": {"type": "array", "required": True, "nonEmpty": True, "items": {"type": "string"}},
+        "name": {"type": "string"},
+        "unique": {"type": "boolean"},
+    },
+}
+
+LESSON_SCHEMA = {
+    "type": "object",
+    "rule": "lesson",
+    "fields": {
+        "id": {"type": "string", "required": True, "nonEmpty": True, "rule": "ids"},
+        "title": {"type": "string", "required": True, "nonEmpty": True},
+        "category": {"type": "string"},
+        "difficulty": {"type": "string", "enum": DIFFICULTIES},
+        "estimatedTime": {"type": "string"},
+        "starterQuery": {"type": "string"},
+        "theory": {
+            "type": "array",
+            "items": {"type": "object", "fields": {"type": {"type": "string", "required": True}}},
+        },
+        "content": {"type": "object"},
+        "synthetic": {
+            "type": "object",
+            "fields": {"rows": {"type": "integer", "required": True}, "seed": {"type": "integer"}},
+        },
+        "queryBudget": {
+            "type": "object",
+            "fields": {"instructions": {"type": "integer"}, "deadlineMs": {"type": "integer"}},
+        },
+        # false for lessons that teach the unindexed case (see index_advisor.py).
+        "indexAdvisor": {"type": "boolean"},
+        # Conceptual lessons (e.g. sql-fundamentals) have no database.
+        "schema": {
+            "type": "object",
+            "rule": "schema",
+            "required": True,
+            "missing": "warning",
+            "fields": {
+                "tables": {"type": "array", "required": True, "items": TABLE},
+                "indexes": {"type": "array", "items": INDEX},
+            },
+        },
+        "sample_data": {
+            "type": "object",
+            "rule": "schema",
+            "values": {"type": "array", "items": {"type": "object"}},
+        },
+        "quiz": {"type": "array", "rule": "quiz", "items": QUIZ_ITEM},
+        "practice": {"type": "array", "rule": "practice", "items": PRACTICE_ITEM},
+        "examples": {"type": "array", "rule": "examples", "items": EXAMPLE_ITEM},
+        "challenges": {"type": "array", "rule": "challenges", "items": CHALLENGE_ITEM},
+    },
+}
+
+RULE_SETS = ("lesson", "schema", "quiz", "practice", "examples", "challenges", "ids")
+
+_TYPES = {
+    "object": "dict",
+    "array": "list",
+    "string": "str",
+    "integer": "int",
+    "number": ("int", "float"),
+    "boolean": "bool",
+}
+_JSON_NAMES = {dict: "object", list: "array", str: "string", int: "integer",
+               float: "number", bool: "boolean", type(None): "null"}
+_MISSING = object()
+
+
+def _json_type(value):
+    return _JSON_NAMES.get(type(value), type(value).__name__)
+
+
+def _lit(text):
+    """Escape static text for use inside a generated f-string."""
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("{", "{{").replace("}", "}}")
+
+
+def _indent(lines, depth=1):
+    pad = "    " * depth
+    return [pad + line for line in lines]
+
+
+class _Compiler:
+    def __init__(self, rules):
+        self.rules = frozenset(rules)
+        self.constants = {}
+        self.namespaces = []
+        self.counter = 0
+
+    def var(self, prefix="v"):
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def constant(self, value):
+        name = f"_C{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def issue(self, rule, path, severity, message):
+        """A line appending one issue; `path` and `message` are f-string bodies."""
+        return (f'append({{"rule": "{rule}", "path": f"{path}", '
+                f'"severity": "{severity}", "message": f"{message}"}})')
+
+    def reported(self, rule, path, severity, message):
+        return [self.issue(rule, path, severity, message)] if rule in self.rules else ["pass"]
+
+    # --- nodes ---
+
+    def value(self, node, var, path, owner, rule):
+        """Checks for a value that is present; [] when nothing selected needs it."""
+        rule = node.get("rule", rule)
+        report = rule in self.rules
+        body = []
+
+        if "enum" in node and report:
+            allowed = self.constant(frozenset(node["enum"]))
+            choices = _lit(", ".join(map(str, node["enum"])))
+            body += [f"if {var} not in {allowed}:",
+                     *_indent([self.issue(rule, path, "error", f"must be one of {choices} (got {{{var}!r}})")])]
+        if "unique" in node and "ids" in self.rules:
+            namespace = node["unique"]
+            if namespace not in self.namespaces:
+                self.namespaces.append(namespace)
+            seen, previous = f"seen_{namespace}", self.var("prev")
+            body += [f"{previous} = {seen}.get({var})",
+                     f"if {previous} is None:",
+                     f'    {seen}[{var}] = f"{owner}"',
+                     "else:",
+                     *_indent([self.issue("ids", owner, "error",
+                                          f"duplicate {namespace} id '{{{var}}}' (also at {{{previous}}})")])]
+        if "fields" in node:
+            body += self.fields(node, var, path, rule)
+        if "switch" in node:
+            body += self.switch(node["switch"], var, path, rule)
+        if "items" in node:
+            item, index = self.var("item"), self.var("i")
+            checks = self.value(node["items"], item, f"{path}[{{{index}}}]", f"{path}[{{{index}}}]", rule)
+            if checks:
+                body += [f"for {index}, {item} in enumerate({var}):", *_indent(checks)]
+        if "values" in node:
+            item, key = self.var("item"), self.var("k")
+            checks = self.value(node["values"], item, f"{path}.{{{key}}}", f"{path}.{{{key}}}", rule)
+            if checks:
+                body += [f"for {key}, {item} in {var}.items():", *_indent(checks)]
+
+        test = self.type_test(node.get("type", "any"), var)
+        non_empty = node.get("nonEmpty") and report
+        lines = []
+        if test and (report or body):
+            expected = _lit(" or ".join(self.type_names(node["type"])))
+            lines += [f"if {test}:",
+                      *_indent(self.reported(rule, path, "error", f"expected {expected}, got {{_json_type({var})}}"))]
+            if non_empty:
+                lines += [f"elif not {var}:", *_indent([self.issue(rule, path, "error", "must not be empty")])]
+            if body:
+                lines += ["else:", *_indent(body)]
+        elif non_empty:
+            lines += [f"if not {var}:", *_indent([self.issue(rule, path, "error", "must not be empty")])]
+            if body:
+                lines += ["else:", *_indent(body)]
+        else:
+            lines += body
+        return lines
+
+    def fields(self, node, var, path, rule):
+        lines = []
+        for name, field in node["fields"].items():
+            field_rule = field.get("rule", rule)
+            field_path = f"{path}.{_lit(name)}" if path else _lit(name)
+            value = self.var()
+            checks = self.value(field, value, field_path, path, rule)
+            required = field.get("required") and field_rule in self.rules
+            alias = field.get("alias")
+            if not checks and not required and not (alias and field_rule in self.rules):
+                continue
+
+            missing = (self.reported(field_rule, path, field.get("missing", "error"), f"missing '{_lit(name)}'")
+                       if required else ["pass"])
+            lines.append(f"{value} = {var}.get({name!r}, _MISSING)")
+            if alias:
+                legacy = self.reported(field_rule, path, "warning",
+                                       f"uses legacy '{_lit(alias)}'; rename it to '{_lit(name)}'")
+                lines += [f"if {value} is _MISSING:",
+                          *_indent([f"{value} = {var}.get({alias!r}, _MISSING)",
+                                    f"if {value} is _MISSING:", *_indent(missing),
+                                    "else:", *_indent(legacy)])]
+                if checks:
+                    lines += [f"if {value} is not _MISSING:", *_indent(checks)]
+            elif missing != ["pass"]:
+                lines += [f"if {value} is _MISSING:", *_indent(missing)]
+                if checks:
+                    lines += ["else:", *_indent(checks)]
+            else:
+                lines += [f"if {value} is not _MISSING:", *_indent(checks)]
+        return lines
+
+    def switch(self, spec, var, path, rule):
+        if rule not in self.rules:
+            return []
+        key = self.var("case")
+        lines = [f"{key} = {var}.get({spec['field']!r})"]
+        for n, (case, checks) in enumerate(spec["cases"].items()):
+            body = []
+            when = f"(required when {_lit(spec['field'])} is {_lit(repr(case))})"
+            for name in checks.get("required", ()):
+                body += [f"if {name!r} not in {var}:",
+                         *_indent([self.issue(rule, path, "error", f"missing '{_lit(name)}' {when}")])]
+            for name, container in checks.get("memberOf", {}).items():
+                member, pool = self.var(), self.var()
+                body += [f"{member} = {var}.get({name!r}, _MISSING)",
+                         f"{pool} = {var}.get({container!r})",
+                         f"if {member} is not _MISSING and type({pool}) is list and {member} not in {pool}:",
+                         *_indent([self.issue(rule, path, "error",
+                                              f"'{_lit(name)}' is not one of its '{_lit(container)}'")])]
+            lines += [f"{'if' if n == 0 else 'elif'} {key} == {case!r}:", *_indent(body or ["pass"])]
+        return lines
+
+    @staticmethod
+    def type_names(types):
+        return [types] if isinstance(types, str) else list(types)
+
+    def type_test(self, types, var):
+        names = [] if types == "any" else self.type_names(types)
+        python = []
+        for name in names:
+            mapped = _TYPES[name]
+            python += [mapped] if isinstance(mapped, str) else list(mapped)
+        if not python:
+            return None
+        if len(python) == 1:
+            return f"type({var}) is not {python[0]}"
+        return f"type({var}) not in ({', '.join(python)})"
+
+    def compile(self, schema):
+        # The root is known to be an object (checked in the head below).
+        body = self.fields(schema, "lesson", "", schema.get("rule", "lesson"))
+        head = ["def validate(lesson):",
+                "    issues = []",
+                "    append = issues.append",
+                *[f"    seen_{namespace} = {{}}" for namespace in self.namespaces],
+                "    if type(lesson) is not dict:",
+                '        append({"rule": "json", "path": "", "severity": "error", '
+                '"message": "lesson is not a JSON object"})',
+                "        return issues"]
+        source = "\n".join(head + _indent(body) + ["    return issues", ""])
+        namespace = {"_MISSING": _MISSING, "_json_type": _json_type, **self.constants}
+        exec(compile(source, "<lesson schema>", "exec"), namespace)
+        validate = namespace["validate"]
+        validate.source = source
+        return validate
+
+
+def compile_validator(schema=LESSON_SCHEMA, rules=RULE_SETS):
+    """
+    Compile `schema` into validate(lesson) -> [issue, ...] checking only the
+    given rule sets. The generated source is on the function's `source`.
+    """
+    unknown = set(rules) - set(RULE_SETS)
+    if unknown:
+        raise ValueError(f"Unknown rule set(s): {', '.join(sorted(unknown))}")
+    return _Compiler(rules).compile(schema)
+
+
+@lru_cache(maxsize=None)
+def _cached_validator(rules):
+    return compile_validator(LESSON_SCHEMA, rules)
+
+
+def validator_for(rules=None):
+    """The compiled LESSON_SCHEMA validator for a rule selection (default: all)."""
+    return _cached_validator(frozenset(rules or RULE_SETS))
+
+
+def validate_lesson(lesson, rules=None):
+    """All issues in one parsed lesson, in document order."""
+    return validator_for(rules)(lesson)
+
+
+def errors(lesson, rules=None):
+    """Just the error messages, formatted "path: message", for tools that refuse bad lessons."""
+    return [f"{issue['path'] or issue['rule']}: {issue['message']}"
+            for issue in validate_lesson(lesson, rules) if issue["severity"] == "error"]
@@ -0,0 +1,141 @@
+"""
+Single-pass validation engine for lesson-content/*.json.
+
+Every lesson file is read and parsed once, then checked in one traversal by
+the validator compiled from the lesson format declared in lesson_schema.py.
+The standalone scripts (validate-lessons.py, validate-quiz-structure.py,
+tools/schema-check.py) are thin front ends that pick which rule sets to
+report.
+
+An issue is a dict:
+  {"file": ..., "lesson": ..., "rule": "quiz", "path": "quiz[3]",
+   "severity": "error" | "warning", "message": ...}
+"""
+
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from lesson_build import LESSON_CONTENT_DIR, lesson_files
+from lesson_profiling import NULL_PROFILER, add_profile_arguments, profiling
+from lesson_schema import RULE_SETS, validate_lesson
+
+# Below this many files a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 200
+
+
+# === Engine ===
+
+def validate_file(path, rules=None, profiler=NULL_PROFILER):
+    """Parse one file once and return {"file", "lesson", "issues"}."""
+    path = Path(path)
+    report = {"file": path.name, "lesson": None, "issues": []}
+    try:
+        with profiler.phase(path.name, "read"):
+            raw = path.read_bytes()
+        with profiler.phase(path.name, "parse"):
+            lesson = json.loads(raw.decode("utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        report["issues"].append({"rule": "json", "path": "", "severity": "error",
+                                 "message": f"Invalid JSON: {e}"})
+        return report
+    if isinstance(lesson, dict):
+        report["lesson"] = lesson.get("id")
+    with profiler.phase(path.name, "transform"):
+        report["issues"] = validate_lesson(lesson, rules)
+    return report
+
+
+def _validate_chunk(paths, rules, profiler=NULL_PROFILER):
+    return [validate_file(path, rules, profiler) for path in paths]
+
+
+def validate_corpus(content_dir=LESSON_CONTENT_DIR, rules=None, jobs=0, paths=None, profiler=NULL_PROFILER):
+    """
+    Validate every lesson file, returning one report per file (sorted by name).
+
+    Files are split into chunks across a process pool when there are enough
+    of them to pay for it; jobs=0 means one worker per core. A profiling run
+    stays in-process.
+    """
+    paths = list(paths) if paths is not None else lesson_files(content_dir)
+    jobs = jobs or os.cpu_count() or 1
+
+    if profiler.enabled:
+        reports = _validate_chunk(paths, rules, profiler)
+    elif jobs == 1 or len(paths) < PARALLEL_THRESHOLD:
+        reports = _validate_chunk(paths, rules)
+    else:
+        chunks = [paths[i::jobs] for i in range(jobs)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            reports = [r for chunk in pool.map(_validate_chunk, chunks, [rules] * jobs) for r in chunk]
+
+    reports.sort(key=lambda r: r["file"])
+    if rules is None or "ids" in rules:
+        _check_duplicate_lessons(reports)
+    return reports
+
+
+def _check_duplicate_lessons(reports):
+    owners = {}
+    for report in reports:
+        lesson_id = report["lesson"]
+        if lesson_id is None:
+            continue
+        if lesson_id in owners:
+            report["issues"].append({"rule": "ids", "path": "id", "severity": "error",
+                                     "message": f"lesson id '{lesson_id}' is also used by {owners[lesson_id]}"})
+        else:
+            owners[lesson_id] = report["file"]
+
+
+def summarize(reports):
+    issues = [{"file": r["file"], "lesson": r["lesson"], **issue} for r in reports for issue in r["issues"]]
+    return {
+        "files": len(reports),
+        "errors": sum(1 for i in issues if i["severity"] == "error"),
+        "warnings": sum(1 for i in issues if i["severity"] == "warning"),
+        "issues": issues,
+    }
+
+
+# === Shared CLI front end ===
+
+def add_arguments(parser, default_rules=None):
+    parser.add_argument("--content-dir", type=Path, default=LESSON_CONTENT_DIR)
+    parser.add_argument("--rules", default=",".join(default_rules or RULE_SETS),
+                        help=f"comma-separated rule sets to run (available: {', '.join(RULE_SETS)})")
+    parser.add_argument("--json", action="store_true", help="print a machine-readable JSON report")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="worker processes for large corpora (0 = one per core)")
+    parser.add_argument("--strict", action="store_true", help="treat warnings as errors")
+    add_profile_arguments(parser)
+
+
+def run_cli(args, title):
+    """Validate, print a report and return the process exit code."""
+    rules = [name.strip() for name in args.rules.split(",") if name.strip()]
+    unknown = [name for name in rules if name not in RULE_SETS]
+    if unknown:
+        raise SystemExit(f"Unknown rule set(s): {', '.join(unknown)}")
+
+    tool_name = Path(sys.argv[0]).stem
+    with profiling(args.profile, tool_name, args.profile_out) as profiler:
+        summary = summarize(validate_corpus(args.content_dir, rules, args.jobs, profiler=profiler))
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"🔍 {title}\n")
+        for issue in summary["issues"]:
+            icon = "❌" if issue["severity"] == "error" else "⚠️"
+            print(f"{icon} {issue['file']} → {issue['path'] or issue['rule']}: {issue['message']}")
+        print(f"\n✅ Checked {summary['files']} file(s): "
+              f"{summary['errors']} error(s), {summary['warnings']} warning(s).")
+        if summary["errors"] == 0:
+            print("🎉 All lessons are valid!")
+
+    failed = summary["errors"] or (args.strict and summary["warnings"])
+    return 1 if failed else 0
@@ -0,0 +1,209 @@
+"""
+Watch lesson-content and keep everything derived from a lesson current as
+it is edited.
+
+The directory is polled (a stat per file, no extra dependency) every
+`interval` seconds. A lesson is handled once it has been quiet for
+`debounce` seconds, so an editor's write-rename-touch sequence is one save.
+For each touched lesson file only:
+
+  parse     read and parse the JSON
+  validate  the compiled lesson schema (lesson_schema.py), plus a check
+            that no other lesson already uses its id
+  db        rebuild lesson_<id>.db if its schema/sample data changed
+            (same hash as the build manifest, which is kept up to date)
+  expected  refresh lesson_<id>.expected.json if the DB or solutions changed
+  catalog   rewrite the lesson's rows in catalog.db
+
+A lesson with errors stops after validation (or a failed DB build) and its
+existing DB and artifacts are left alone, so the running backend keeps
+working while the file is half-edited. Deleting a lesson file removes its
+DB, sidecar, manifest entry and catalog rows.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import lesson_catalog
+from expected_results import expected_path_for, refresh_lesson
+from lesson_build import (
+    LESSON_CONTENT_DIR,
+    LESSON_DATA_DIR,
+    build_lesson_db,
+    db_path_for,
+    file_sha256,
+    lesson_data_hash,
+    load_manifest,
+    save_manifest,
+    source_stamp,
+)
+from lesson_schema import validator_for
+
+DEFAULT_INTERVAL = 0.25
+DEFAULT_DEBOUNCE = 0.3
+
+
+def scan(content_dir):
+    """{file name: (mtime_ns, size)} for every lesson file."""
+    stamps = {}
+    with os.scandir(content_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and not entry.name.startswith(".") and entry.is_file():
+                st = entry.stat()
+                stamps[entry.name] = (st.st_mtime_ns, st.st_size)
+    return stamps
+
+
+def diff(before, after):
+    """(touched, removed) file names between two scans."""
+    touched = sorted(name for name, stamp in after.items() if before.get(name) != stamp)
+    removed = sorted(name for name in before if name not in after)
+    return touched, removed
+
+
+class LessonWatcher:
+    def __init__(self, content_dir=LESSON_CONTENT_DIR, data_dir=LESSON_DATA_DIR, catalog_path=None, rules=None):
+        self.content_dir = Path(content_dir)
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.validate = validator_for(rules)
+        self.manifest = load_manifest(self.data_dir)
+        self.catalog = lesson_catalog.connect(catalog_path or lesson_catalog.default_catalog_path(self.data_dir))
+
+    def close(self):
+        self.catalog.close()
+
+    def _lesson_for_source(self, name):
+        for lesson_id, entry in self.manifest["lessons"].items():
+            if entry.get("source") == name:
+                return lesson_id
+        return None
+
+    def _drop_artifacts(self, lesson_id):
+        db_path_for(lesson_id, self.data_dir).unlink(missing_ok=True)
+        expected_path_for(lesson_id, self.data_dir).unlink(missing_ok=True)
+        self.manifest["lessons"].pop(lesson_id, None)
+
+    def process(self, name):
+        """
+        Handle one saved lesson file. Returns a report:
+        {"file", "lesson", "status": "ok" | "invalid" | "gone", "issues", "steps": {step: seconds}, "actions"}
+        "gone" means the file vanished before it could be read (a save via
+        rename, a checkout); the watcher treats that as a deletion.
+        """
+        path = self.content_dir / name
+        report = {"file": name, "lesson": None, "status": "invalid", "issues": [], "steps": {}, "actions": []}
+        steps = report["steps"]
+
+        started = time.perf_counter()
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            report["status"] = "gone"
+            return report
+        except OSError as e:
+            report["issues"].append({"rule": "read", "path": "", "severity": "error",
+                                     "message": f"{type(e).__name__}: {e}"})
+            return report
+        try:
+            lesson = json.loads(raw.decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            report["issues"].append({"rule": "json", "path": "", "severity": "error", "message": f"Invalid JSON: {e}"})
+            return report
+        steps["parse"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        report["issues"] = self.validate(lesson)
+        lesson_id = lesson.get("id") if isinstance(lesson, dict) else None
+        report["lesson"] = lesson_id
+        if isinstance(lesson_id, str) and lesson_id:
+            owner = self.catalog.execute("SELECT source FROM lessons WHERE id = ? AND source != ?",
+                                         (lesson_id, name)).fetchone()
+            if owner:
+                report["issues"].append({"rule": "ids", "path": "id", "severity": "error",
+                                         "message": f"lesson id '{lesson_id}' is also used by {owner[0]}"})
+        steps["validate"] = time.perf_counter() - started
+        if any(issue["severity"] == "error" for issue in report["issues"]):
+            return report
+
+        started = time.perf_counter()
+        previous_id = self._lesson_for_source(name)
+        if previous_id is not None and previous_id != lesson_id:
+            self._drop_artifacts(previous_id)
+            report["actions"].append(f"removed {previous_id} artifacts")
+        db_path = db_path_for(lesson_id, self.data_dir)
+        data_hash = lesson_data_hash(lesson)
+        entry = self.manifest["lessons"].get(lesson_id)
+        digest = entry.get("sha256") if entry else None
+        if entry is None or entry.get("hash") != data_hash or not db_path.exists():
+            try:
+                build_lesson_db(lesson, db_path)
+                digest = file_sha256(db_path)
+            except Exception as e:
+                # e.g. sample rows that break a constraint; the old DB is still in place
+                report["issues"].append({"rule": "build", "path": "sample_data", "severity": "error",
+                                         "message": f"{type(e).__name__}: {e}"})
+                steps["db"] = time.perf_counter() - started
+                return report
+            report["actions"].append("db rebuilt")
+        self.manifest["lessons"][lesson_id] = {"source": name, "db": db_path.name, "hash": data_hash,
+                                               "sha256": digest, **source_stamp(path)}
+        save_manifest(self.manifest, self.data_dir)
+        steps["db"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        _, status, failed = refresh_lesson(lesson, self.data_dir)
+        if status == "updated":
+            report["actions"].append(f"expected results updated ({failed} failed)" if failed
+                                     else "expected results updated")
+        steps["expected"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if lesson_catalog.refresh_lesson(self.catalog, path, lesson, self.content_dir):
+            report["actions"].append("catalog updated")
+        steps["catalog"] = time.perf_counter() - started
+
+        report["status"] = "ok"
+        return report
+
+    def remove(self, name):
+        """Handle a deleted lesson file; returns the id it held, if known."""
+        lesson_id = self._lesson_for_source(name)
+        if lesson_id is not None:
+            self._drop_artifacts(lesson_id)
+            save_manifest(self.manifest, self.data_dir)
+        catalog_id = lesson_catalog.remove_source(self.catalog, name)
+        return lesson_id or catalog_id
+
+    def watch(self, on_report, on_remove=None, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE, stop=None):
+        """
+        Poll until `stop()` returns true (or forever), calling on_report(report)
+        for every processed save and on_remove(name, lesson_id) for deletions.
+        """
+        state = scan(self.content_dir)
+        pending = {}
+        while not (stop and stop()):
+            time.sleep(interval)
+            current = scan(self.content_dir)
+            touched, removed = diff(state, current)
+            state = current
+            now = time.monotonic()
+            for name in touched + removed:
+                pending[name] = now
+            for name in sorted(n for n, changed in pending.items() if now - changed >= debounce):
+                del pending[name]
+                if name in state:
+                    report = self.process(name)
+                    if report["status"] != "gone":
+                        on_report(report)
+                        continue
+                    # Vanished between the scan and the read: forget its stamp so
+                    # the next poll sees it as touched if it is back (save via rename).
+                    del state[name]
+                    if (self.content_dir / name).exists():
+                        continue
+                lesson_id = self.remove(name)
+                if on_remove:
+                    on_remove(name, lesson_id)
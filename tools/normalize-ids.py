@@ -0,0 +1,51 @@
+import argparse
+import json
+from pathlib import Path
+
+from id_normalizer import KINDS, normalize_corpus
+from lesson_build import LESSON_CONTENT_DIR, lesson_files
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Give every practice, quiz and challenge id its canonical form (idempotent)")
+    parser.add_argument("--content-dir", type=Path, default=LESSON_CONTENT_DIR)
+    parser.add_argument("--write", action="store_true",
+                        help="write changed files (default: only report which ids would move)")
+    parser.add_argument("--only", action="append", choices=KINDS, default=[],
+                        help="only normalize ids of this kind (repeatable; default: all)")
+    parser.add_argument("--json", action="store_true", help="print the moves as JSON")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="worker processes for large corpora (0 = one per core)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = normalize_corpus(lesson_files(args.content_dir), write=args.write, jobs=args.jobs,
+                                kinds=tuple(args.only) or KINDS)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            if result["error"]:
+                print(f"❌ {result['file']}: {result['error']}")
+            for move in result["moves"]:
+                print(f"🔀 {result['file']} → {move['path']}: {move['old']} → {move['new']}")
+            if result["written"]:
+                print(f"✅ Updated IDs in {result['file']}")
+
+    moved = sum(len(r["moves"]) for r in results)
+    changed = [r for r in results if r["changed"]]
+    written = [r for r in results if r["written"]]
+    if not args.json:
+        verb = "rewritten" if args.write else "would be rewritten (dry run, pass --write)"
+        print(f"\n🎉 {moved} id(s) moved; {len(written) if args.write else len(changed)} of "
+              f"{len(results)} file(s) {verb}.")
+    if any(r["error"] for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
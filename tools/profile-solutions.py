@@ -0,0 +1,91 @@
+import argparse
+import json
+from pathlib import Path
+
+from lesson_build import LESSON_CONTENT_DIR, LESSON_DATA_DIR, lesson_files, load_lesson
+from query_profiler import profile_lesson
+
+DEFAULT_BUDGET_MS = 50.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Profile every solution, starterQuery and example query against its lesson DB")
+    parser.add_argument("--content-dir", type=Path, default=LESSON_CONTENT_DIR)
+    parser.add_argument("--data-dir", type=Path, default=LESSON_DATA_DIR)
+    parser.add_argument("--lesson", action="append", default=[], help="only profile this lesson id (repeatable)")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="runs per query (default: 5)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"default p95 budget per query in ms (default: {DEFAULT_BUDGET_MS:g})")
+    parser.add_argument("--budgets", type=Path,
+                        help='JSON file of per-lesson budgets, e.g. {"default": 50, "window-functions": 120}')
+    parser.add_argument("--lesson-budget", action="append", default=[], metavar="ID=MS",
+                        help="override the budget for one lesson (repeatable)")
+    parser.add_argument("--json", type=Path, help="write the full report (incl. query plans) to this file")
+    parser.add_argument("--show-plans", action="store_true", help="print the query plan of flagged queries")
+    return parser.parse_args()
+
+
+def load_budgets(args):
+    budgets = {}
+    default = args.budget_ms
+    if args.budgets:
+        with open(args.budgets, "r", encoding="utf-8") as f:
+            budgets = {k: float(v) for k, v in json.load(f).items()}
+        default = budgets.pop("default", default)
+    for item in args.lesson_budget:
+        lesson_id, _, ms = item.partition("=")
+        budgets[lesson_id] = float(ms)
+    return default, budgets
+
+
+def main():
+    args = parse_args()
+    default_budget, budgets = load_budgets(args)
+
+    results = []
+    for path in lesson_files(args.content_dir):
+        lesson = load_lesson(path)
+        if args.lesson and lesson["id"] not in args.lesson:
+            continue
+        budget = budgets.get(lesson["id"], default_budget)
+        for entry in profile_lesson(lesson, args.data_dir, args.runs):
+            entry["budget_ms"] = budget
+            entry["over_budget"] = entry.get("p95_ms") is not None and entry["p95_ms"] > budget
+            results.append(entry)
+
+    print(f"🔍 Profiled {len(results)} queries ({args.runs} runs each)\n")
+    flagged = [r for r in results if r["over_budget"]]
+    errors = [r for r in results if r["status"] == "error"]
+    placeholders = [r for r in results if r["status"] == "skipped"]
+
+    for r in sorted(results, key=lambda r: r.get("p95_ms") or 0, reverse=True)[:10]:
+        if r.get("p95_ms") is None:
+            continue
+        mark = "🐢" if r["over_budget"] else "  "
+        print(f"{mark} {r['p95_ms']:8.3f} ms p95 {r['p50_ms']:8.3f} ms p50 {str(r['rows']):>7} rows  "
+              f"{r['lesson']} / {r['query_id']}")
+
+    for r in flagged:
+        print(f"\n❌ {r['lesson']} / {r['query_id']}: p95 {r['p95_ms']:.3f} ms > budget {r['budget_ms']:g} ms")
+        if args.show_plans:
+            for line in r["plan"]:
+                print(f"     {line}")
+
+    for r in errors:
+        print(f"\n❌ {r['lesson']} / {r['query_id']}: {r['error']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📄 Full report: {args.json}")
+
+    ok = len(results) - len(flagged) - len(errors) - len(placeholders)
+    print(f"\n{'❌' if flagged or errors else '✅'} {ok} within budget, {len(flagged)} over budget, "
+          f"{len(errors)} failed to run, {len(placeholders)} placeholder(s) with no SQL")
+    if flagged or errors:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
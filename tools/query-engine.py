@@ -0,0 +1,58 @@
+import argparse
+import signal
+from pathlib import Path
+
+from lesson_build import LESSON_DATA_DIR
+from query_engine import QueryEngine, make_server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve lesson DB queries from pooled, read-only connections")
+    parser.add_argument("--data-dir", type=Path, default=LESSON_DATA_DIR)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", type=Path, help="listen on this Unix socket instead of host:port")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="query worker threads (default: 4)")
+    parser.add_argument("--max-pending", type=int, default=64,
+                        help="queued + running queries before new ones get 429 (default: 64)")
+    parser.add_argument("--per-lesson", type=int, default=16,
+                        help="queued + running queries allowed per lesson (default: 16)")
+    parser.add_argument("--pool-size", type=int, help="connections kept open per lesson (default: --workers)")
+    parser.add_argument("--budgets", type=Path, help="query budgets file (default: <data-dir>/query-budgets.json)")
+    parser.add_argument("--no-warm", action="store_true", help="open connections lazily instead of at startup")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    return parser.parse_args()
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main():
+    args = parse_args()
+    engine = QueryEngine(args.data_dir, workers=args.workers, max_pending=args.max_pending,
+                         per_lesson=args.per_lesson, pool_size=args.pool_size, budgets=args.budgets)
+    if not args.no_warm:
+        engine.warm()
+    stats = engine.stats()
+    print(f"🔌 {stats['open_connections']} connections open to {stats['lessons']} lesson DBs")
+
+    server = make_server(engine, args.host, args.port, args.socket, args.verbose)
+    where = args.socket or f"http://{args.host}:{args.port}"
+    print(f"🚀 Query engine listening on {where} ({args.workers} workers)")
+
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        engine.close()
+        if args.socket:
+            args.socket.unlink(missing_ok=True)
+        print("👋 Query engine stopped")
+
+
+if __name__ == "__main__":
+    main()
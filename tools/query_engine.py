@@ -0,0 +1,525 @@
+"""
+Pooled execution engine for lesson databases.
+
+The backend opens (and closes) a fresh sqlite3 handle for every /api/execute
+and /api/validate request; under a classroom burst that open cost dominates
+the tail latency. The engine keeps connections open instead:
+
+  LessonPool   read-only, immutable connections to one lesson-data DB,
+               reopened automatically when the DB file is rebuilt
+  QueryEngine  a bounded worker pool in front of the lesson pools, with
+               admission control: a global cap on queued + running queries
+               and a smaller cap per lesson, so one busy lesson can't starve
+               the rest. Over the cap a query is rejected (EngineBusy) at
+               once rather than queued without bound. Each query runs under
+               its lesson's instruction/deadline budget (query_governor).
+  make_server  a small JSON-over-HTTP front end on a TCP port or a Unix
+               socket, for the Node backend and load tests
+
+Tooling can use QueryEngine in-process: execute() returns the same dict the
+HTTP front end sends, and connection() lends out a pooled connection.
+
+HTTP API:
+  POST /execute  {"lessonId": "...", "sql": "...", "maxRows": 1000}
+     200 {"success": true, "columns": [...], "rows": [[...], ...], "truncated": false, "ms": 0.42}
+  POST /compare  {"lessonId": "...", "sql": "...", "solution": "...", "options": {"rowOrder": true, ...}}
+                 or, to grade a result the caller already has instead of running it again,
+                 {"lessonId": "...", "columns": [...] | null, "rows": [[...], ...], "solution": "...", ...}
+     200 {"success": true, "equal": false, "reason": "...", "missing": [...], "extra": [...], ...,
+          "columns": [...], "sample": [[...], ...]}
+         (see result_compare.compare_results; `sample` is the first SAMPLE_ROWS
+         rows of the reference result, collected while it is streamed)
+     422 {"success": false, "error": "...", "type": "QueryError"}   (bad SQL, writes)
+     422 InstructionBudgetExceeded, 408 QueryTimeout                 (governor stopped it)
+     404 unknown lesson, 429 engine busy (with Retry-After), 400 bad request
+  GET /health, GET /stats
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn
+
+from lesson_build import LESSON_DATA_DIR, db_path_for
+from query_governor import QueryLimitExceeded, budget_for, default_budgets_path, governed, load_budgets
+from result_compare import compare_results
+
+DEFAULT_MAX_ROWS = 1000
+# Reference rows returned by /compare for the "expected output" view.
+SAMPLE_ROWS = 50
+# Lesson DBs are read through a memory map of up to this many bytes.
+MMAP_SIZE = 256 << 20
+
+
+class EngineError(Exception):
+    """Base class for errors the engine reports to its callers."""
+
+    status = 500
+
+
+class LessonNotFound(EngineError):
+    status = 404
+
+
+class EngineBusy(EngineError):
+    status = 429
+
+
+class BadRequest(EngineError):
+    """The request itself is malformed (wrong option types, ragged rows, ...)."""
+
+    status = 400
+
+
+class QueryError(EngineError):
+    """The SQL itself failed (syntax error, unknown table, attempted write, ...)."""
+
+    status = 422
+
+
+def open_immutable(db_path):
+    """
+    Read-only connection that tells SQLite the file never changes, so it skips
+    locking and change detection. Lesson DBs are only ever replaced by rename,
+    which LessonPool notices and handles by reopening.
+    """
+    conn = sqlite3.connect(f"file:{Path(db_path).resolve()}?mode=ro&immutable=1", uri=True,
+                           check_same_thread=False)
+    conn.execute("PRAGMA query_only = ON")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    return conn
+
+
+def _file_stamp(path):
+    st = os.stat(path)
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class LessonPool:
+    """Up to `size` open connections to one lesson DB."""
+
+    def __init__(self, db_path, size=4):
+        self.db_path = Path(db_path)
+        self.size = size
+        # (generation, conn) pairs, most recently used last; guarded by _cond,
+        # which is notified whenever a connection (or a free slot) comes back.
+        self._idle = []
+        self._cond = threading.Condition()
+        self._open = 0
+        self._stamp = _file_stamp(self.db_path)
+        self._generation = 0
+
+    def _check_stamp(self):
+        stamp = _file_stamp(self.db_path)
+        if stamp != self._stamp:
+            # The DB was rebuilt: retire every connection to the old file.
+            self._stamp = stamp
+            self._generation += 1
+            self._drain()
+
+    def _drain(self):
+        while self._idle:
+            _, conn = self._idle.pop()
+            conn.close()
+            self._open -= 1
+
+    def warm(self):
+        """Open every connection up front so the first burst doesn't pay for it."""
+        with self._cond:
+            while self._open < self.size:
+                self._idle.append((self._generation, open_immutable(self.db_path)))
+                self._open += 1
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                self._check_stamp()
+                if self._idle:
+                    return self._idle.pop()
+                if self._open < self.size:
+                    self._open += 1
+                    generation = self._generation
+                    break
+                self._cond.wait()
+        try:
+            return generation, open_immutable(self.db_path)
+        except BaseException:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, generation, conn):
+        with self._cond:
+            if generation == self._generation:
+                self._idle.append((generation, conn))
+                conn = None
+            else:
+                # A connection to a rebuilt DB: close it, which frees a slot
+                # for a waiter to open one to the new file.
+                self._open -= 1
+            self._cond.notify()
+        if conn is not None:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        generation, conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(generation, conn)
+
+    def close(self):
+        with self._cond:
+            self._drain()
+
+    @property
+    def open_connections(self):
+        return self._open
+
+
+def _json_value(value):
+    return value.hex() if isinstance(value, bytes) else value
+
+
+_OPTION_TYPES = {"rowOrder": bool, "columnOrder": bool, "tolerance": (int, float), "maxDiff": int}
+
+
+def _check_compare_input(options, actual):
+    """Raise BadRequest unless `options` and `actual` have the shapes compare_results expects."""
+    if not isinstance(options, dict):
+        raise BadRequest("options must be an object")
+    for key, value in options.items():
+        expected = _OPTION_TYPES.get(key)
+        if expected is None:
+            raise BadRequest(f"unknown compare option {key!r}")
+        if value is None:
+            continue
+        if isinstance(value, bool) and expected is not bool or not isinstance(value, expected):
+            raise BadRequest(f"compare option {key!r} has the wrong type")
+        if key in ("tolerance", "maxDiff") and (value < 0 or value != value):
+            raise BadRequest(f"compare option {key!r} must not be negative")
+    if actual is None:
+        return
+    columns, rows = actual
+    if not isinstance(rows, list) or not (columns is None or isinstance(columns, list)):
+        raise BadRequest("rows must be an array and columns an array or null")
+    if columns is None:
+        if rows:
+            raise BadRequest("columns are required for a non-empty result")
+        return
+    if not all(isinstance(name, str) for name in columns):
+        raise BadRequest("columns must be strings")
+    for row in rows:
+        if not isinstance(row, list) or len(row) != len(columns):
+            raise BadRequest(f"every row must be an array of {len(columns)} value(s)")
+        if not all(value is None or isinstance(value, (str, int, float)) for value in row):
+            raise BadRequest("row values must be strings, numbers or null")
+
+
+def _sampled(rows, sample, limit):
+    """Yield `rows`, keeping the first `limit` of them (as JSON values) in `sample`."""
+    for row in rows:
+        if len(sample) < limit:
+            sample.append([_json_value(v) for v in row])
+        yield row
+
+
+class QueryEngine:
+    """
+    Run read-only SQL against lesson DBs on a bounded pool of worker threads
+    (sqlite3 releases the GIL while a statement runs).
+
+    workers      worker threads executing queries
+    max_pending  queued + running queries across all lessons before EngineBusy
+    per_lesson   queued + running queries for one lesson before EngineBusy
+    pool_size    open connections kept per lesson
+    budgets      query budgets file (default: <data_dir>/query-budgets.json)
+    """
+
+    def __init__(self, data_dir=LESSON_DATA_DIR, workers=4, max_pending=64, per_lesson=16, pool_size=None,
+                 budgets=None):
+        self.data_dir = Path(data_dir)
+        self.budgets = load_budgets(budgets or default_budgets_path(self.data_dir))
+        self.workers = workers
+        self.max_pending = max_pending
+        self.per_lesson = per_lesson
+        self.pool_size = pool_size or workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query")
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._pending_by_lesson = {}
+        self._counters = {"executed": 0, "failed": 0, "rejected": 0, "stopped": 0}
+
+    # --- pools ---
+
+    def pool(self, lesson_id):
+        with self._lock:
+            pool = self._pools.get(lesson_id)
+            if pool is None:
+                db_path = db_path_for(lesson_id, self.data_dir)
+                if "/" in lesson_id or "\\" in lesson_id or not db_path.is_file():
+                    raise LessonNotFound(f"Database not found: lesson_{lesson_id}.db")
+                pool = self._pools[lesson_id] = LessonPool(db_path, self.pool_size)
+            return pool
+
+    def warm(self):
+        """Open the connection pools of every lesson DB in the data dir."""
+        for db_path in sorted(self.data_dir.glob("lesson_*.db")):
+            if db_path.stat().st_size:
+                self.pool(db_path.stem[len("lesson_"):]).warm()
+
+    @contextmanager
+    def connection(self, lesson_id):
+        with self.pool(lesson_id).connection() as conn:
+            yield conn
+
+    # --- admission ---
+
+    def _admit(self, lesson_id):
+        with self._lock:
+            lesson_pending = self._pending_by_lesson.get(lesson_id, 0)
+            if self._pending >= self.max_pending:
+                self._counters["rejected"] += 1
+                raise EngineBusy(f"engine busy ({self._pending} queries pending)")
+            if lesson_pending >= self.per_lesson:
+                self._counters["rejected"] += 1
+                raise EngineBusy(f"too many queries pending for lesson '{lesson_id}'")
+            self._pending += 1
+            self._pending_by_lesson[lesson_id] = lesson_pending + 1
+
+    def _finish(self, lesson_id):
+        with self._lock:
+            self._pending -= 1
+            left = self._pending_by_lesson[lesson_id] - 1
+            if left:
+                self._pending_by_lesson[lesson_id] = left
+            else:
+                del self._pending_by_lesson[lesson_id]
+
+    def _submit(self, lesson_id, task, *args):
+        pool = self.pool(lesson_id)
+        self._admit(lesson_id)
+        try:
+            future = self._executor.submit(self._governed, task, pool, budget_for(self.budgets, lesson_id), *args)
+        except BaseException:
+            self._finish(lesson_id)
+            raise
+        future.add_done_callback(lambda _: self._finish(lesson_id))
+        return future
+
+    def submit(self, lesson_id, sql, max_rows=DEFAULT_MAX_ROWS):
+        """Queue one query; returns a Future. Raises EngineBusy/LessonNotFound right away."""
+        return self._submit(lesson_id, self._run, sql, max_rows)
+
+    def execute(self, lesson_id, sql, max_rows=DEFAULT_MAX_ROWS):
+        return self.submit(lesson_id, sql, max_rows).result()
+
+    def compare(self, lesson_id, sql, solution, options=None, actual=None):
+        """
+        Grade `sql` against the reference `solution` (see result_compare). With
+        `actual`, the (columns, rows) the caller already fetched for the query,
+        only the reference is run; columns may be None for an empty result.
+        Malformed options or rows raise BadRequest.
+        """
+        _check_compare_input(options or {}, actual)
+        return self._submit(lesson_id, self._compare, sql, solution, options, actual).result()
+
+    def _governed(self, task, pool, budget, *args):
+        started = time.perf_counter()
+        with pool.connection() as conn:
+            try:
+                with governed(conn, budget):
+                    result = task(conn, *args)
+            except QueryLimitExceeded:
+                with self._lock:
+                    self._counters["stopped"] += 1
+                raise
+            except (sqlite3.Error, ValueError) as e:
+                with self._lock:
+                    self._counters["failed"] += 1
+                raise QueryError(str(e)) from e
+        with self._lock:
+            self._counters["executed"] += 1
+        return {"success": True, **result, "ms": round((time.perf_counter() - started) * 1000, 3)}
+
+    @staticmethod
+    def _run(conn, sql, max_rows):
+        cursor = conn.execute(sql)
+        if cursor.description is None:
+            columns, rows = [], []
+        else:
+            columns = [col[0] for col in cursor.description]
+            rows = cursor.fetchmany(max_rows + 1)
+        return {
+            "columns": columns,
+            "rows": [[_json_value(v) for v in row] for row in rows[:max_rows]],
+            "truncated": len(rows) > max_rows,
+        }
+
+    @staticmethod
+    def _compare(conn, sql, solution, options, actual=None):
+        def result_of(query, what):
+            cursor = conn.execute(query)
+            if cursor.description is None:
+                raise ValueError(f"{what} returned no result set")
+            return [col[0] for col in cursor.description], cursor
+
+        columns, sample = [], []
+        given = actual is not None
+
+        def reference():
+            # compare_results streams the reference a second time only to
+            # recover missing rows; the sample comes from the first pass.
+            ref_columns, rows = result_of(solution, "reference solution")
+            if given:
+                # Rows fetched by a JSON client carry BLOBs as hex, like _run sends them.
+                rows = (tuple(_json_value(v) for v in row) for row in rows)
+            if columns:
+                return ref_columns, rows
+            columns.extend(ref_columns)
+            return ref_columns, _sampled(rows, sample, SAMPLE_ROWS)
+
+        if actual is None:
+            actual = result_of(sql, "query")
+        elif actual[0] is None:
+            # A client that only has row objects can't name the columns of an
+            # empty result; nothing to match column-wise, so take the reference's
+            # (compare_results reads the reference, filling `columns`, first).
+            actual = (columns, actual[1])
+        verdict = compare_results(reference, actual, options)
+        for side in ("missing", "extra"):
+            verdict[side] = [[_json_value(v) for v in row] for row in verdict[side]]
+        verdict["columns"], verdict["sample"] = columns, sample
+        return verdict
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "pending_by_lesson": dict(self._pending_by_lesson),
+                "max_pending": self.max_pending,
+                "per_lesson": self.per_lesson,
+                "open_connections": sum(p.open_connections for p in self._pools.values()),
+                "lessons": len(self._pools),
+                **self._counters,
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for pool in self._pools.values():
+            pool.close()
+
+
+# === HTTP front end ===
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "LessonQueryEngine/1"
+    protocol_version = "HTTP/1.1"
+
+    def address_string(self):
+        # Unix-socket clients have no address.
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload, headers=()):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"ok": True})
+        elif self.path == "/stats":
+            self._send(200, self.server.engine.stats())
+        else:
+            self._send(404, {"success": False, "error": "not found"})
+
+    def do_POST(self):
+        if self.path not in ("/execute", "/compare"):
+            self._send(404, {"success": False, "error": "not found"})
+            return
+        engine = self.server.engine
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            lesson_id = request["lessonId"]
+            sql = request["sql"] if self.path == "/execute" or "rows" not in request else None
+            if not isinstance(lesson_id, str) or not (sql is None or isinstance(sql, str)):
+                raise TypeError("lessonId and sql must be strings")
+            if self.path == "/execute":
+                max_rows = int(request.get("maxRows", DEFAULT_MAX_ROWS))
+                if max_rows < 0:
+                    raise ValueError("maxRows must not be negative")
+                call = (engine.execute, lesson_id, sql, max_rows)
+            else:
+                options = request.get("options") or {}
+                if not isinstance(request["solution"], str):
+                    raise TypeError("solution must be a string")
+                actual = None
+                if sql is None:
+                    actual = (request.get("columns"), request["rows"])
+                call = (engine.compare, lesson_id, sql, request["solution"], options, actual)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self._send(400, {"success": False, "error": f"bad request: {e}", "type": "BadRequest"})
+            return
+
+        try:
+            self._send(200, call[0](*call[1:]))
+        except (EngineError, QueryLimitExceeded) as e:
+            headers = [("Retry-After", "1")] if isinstance(e, EngineBusy) else []
+            self._send(e.status, {"success": False, "error": str(e), "type": type(e).__name__}, headers)
+        except Exception as e:
+            # Answer rather than drop the connection; the client sees a 500.
+            self.log_error("internal error: %r", e)
+            self._send(500, {"success": False, "error": "internal error", "type": type(e).__name__})
+
+
+# socketserver's default listen backlog of 5 resets connections in a burst.
+LISTEN_BACKLOG = 256
+
+
+class _UnixHTTPServer(ThreadingMixIn, HTTPServer):
+    address_family = socket.AF_UNIX
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        self.socket.bind(self.server_address)
+        self.server_name, self.server_port = "localhost", 0
+
+
+class _TCPHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+
+def make_server(engine, host="127.0.0.1", port=8765, socket_path=None, verbose=False):
+    """HTTP server bound to host:port, or to a Unix socket when `socket_path` is given."""
+    if socket_path:
+        server = _UnixHTTPServer(str(socket_path), _Handler)
+    else:
+        server = _TCPHTTPServer((host, port), _Handler)
+    server.engine = engine
+    server.verbose = verbose
+    return server
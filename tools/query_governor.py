@@ -0,0 +1,207 @@
+"""
+Per-query limits for user SQL, enforced with SQLite's progress handler.
+
+Every PROGRESS_STEP virtual-machine instructions SQLite calls back into the
+governor, which aborts the statement once it has used up its instruction
+budget or passed its wall-clock deadline. The caller gets a typed error
+(InstructionBudgetExceeded / QueryTimeout) instead of a worker pinned by a
+runaway recursive CTE or cross join.
+
+Budgets live in lesson-data/query-budgets.json, written by
+tools/build-query-budgets.py:
+
+  {
+    "version": 1,
+    "default": {"instructions": 5000000, "deadline_ms": 1000},
+    "lessons": {
+      "<id>": {"instructions": ..., "deadline_ms": ...,
+               "measured": {"instructions": ..., "ms": ..., "queries": ...}}
+    }
+  }
+
+A lesson's budget is its reference solutions' worst measured cost times a
+headroom factor, never below the floor. A lesson can pin its own budget with
+  "queryBudget": {"instructions": 20000000, "deadlineMs": 3000}
+"""
+
+import json
+import math
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from lesson_build import LESSON_DATA_DIR, db_path_for
+from lesson_queries import has_statement, is_write_error, iter_exercises, memory_copy, open_readonly
+
+BUDGETS_NAME = "query-budgets.json"
+BUDGETS_VERSION = 1
+
+# VM instructions between progress-handler calls while governing a query.
+PROGRESS_STEP = 1000
+# Finer step used when measuring a reference solution.
+MEASURE_STEP = 100
+
+DEFAULT_BUDGET = {"instructions": 5_000_000, "deadline_ms": 1000}
+MIN_BUDGET = {"instructions": 2_000_000, "deadline_ms": 500}
+DEFAULT_HEADROOM = 20
+
+
+class QueryLimitExceeded(Exception):
+    """A query was stopped by the governor."""
+
+    status = 422
+
+    def __init__(self, message, budget):
+        super().__init__(message)
+        self.budget = budget
+
+
+class InstructionBudgetExceeded(QueryLimitExceeded):
+    pass
+
+
+class QueryTimeout(QueryLimitExceeded):
+    status = 408
+
+
+def default_budgets_path(data_dir=LESSON_DATA_DIR):
+    return Path(data_dir) / BUDGETS_NAME
+
+
+@contextmanager
+def governed(conn, budget, step=PROGRESS_STEP):
+    """
+    Enforce `budget` ({"instructions", "deadline_ms"}) on whatever runs on
+    `conn` inside the block, including fetching rows.
+    """
+    max_calls = max(1, math.ceil(budget["instructions"] / step))
+    deadline = time.perf_counter() + budget["deadline_ms"] / 1000
+    state = {"calls": 0, "stopped": None}
+
+    def check():
+        state["calls"] += 1
+        if state["calls"] > max_calls:
+            state["stopped"] = "instructions"
+            return 1
+        if time.perf_counter() > deadline:
+            state["stopped"] = "deadline"
+            return 1
+        return 0
+
+    conn.set_progress_handler(check, step)
+    try:
+        yield state
+    except sqlite3.OperationalError as e:
+        if state["stopped"] == "instructions":
+            raise InstructionBudgetExceeded(
+                f"Query stopped: it exceeded its budget of {budget['instructions']:,} SQLite instructions",
+                budget) from e
+        if state["stopped"] == "deadline":
+            raise QueryTimeout(f"Query stopped: it ran longer than {budget['deadline_ms']:g} ms", budget) from e
+        raise
+    finally:
+        conn.set_progress_handler(None, step)
+
+
+# === Budgets file ===
+
+def load_budgets(path=None):
+    """The budgets file, or just the defaults if it is missing or outdated."""
+    path = Path(path) if path else default_budgets_path()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            budgets = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        budgets = {}
+    if budgets.get("version") != BUDGETS_VERSION:
+        budgets = {"version": BUDGETS_VERSION}
+    budgets.setdefault("default", dict(DEFAULT_BUDGET))
+    budgets.setdefault("lessons", {})
+    return budgets
+
+
+def budget_for(budgets, lesson_id):
+    entry = budgets["lessons"].get(lesson_id) or budgets["default"]
+    return {"instructions": entry["instructions"], "deadline_ms": entry["deadline_ms"]}
+
+
+def save_budgets(budgets, path=None):
+    path = Path(path) if path else default_budgets_path()
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(budgets, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+# === Measuring reference solutions ===
+
+def measure_cost(conn, sql):
+    """Approximate VM instructions and wall time of running `sql` to completion."""
+    calls = [0]
+
+    def count():
+        calls[0] += 1
+        return 0
+
+    conn.set_progress_handler(count, MEASURE_STEP)
+    try:
+        started = time.perf_counter()
+        cursor = conn.execute(sql)
+        if cursor.description is not None:
+            cursor.fetchall()
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.set_progress_handler(None, MEASURE_STEP)
+    return {"instructions": calls[0] * MEASURE_STEP, "ms": elapsed * 1000}
+
+
+def measure_lesson(lesson, data_dir=LESSON_DATA_DIR):
+    """
+    Worst-case cost of a lesson's reference solutions:
+    {"instructions", "ms", "queries"}, or None if none of them run.
+    """
+    db_path = db_path_for(lesson["id"], data_dir)
+    if not db_path.exists() or not db_path.stat().st_size:
+        return None
+    worst = {"instructions": 0, "ms": 0.0, "queries": 0}
+    conn = open_readonly(db_path)
+    try:
+        for _, _, sql in iter_exercises(lesson):
+            if not has_statement(sql):
+                continue
+            try:
+                try:
+                    cost = measure_cost(conn, sql)
+                except sqlite3.OperationalError as e:
+                    if not is_write_error(e):
+                        raise
+                    scratch = memory_copy(db_path)
+                    try:
+                        cost = measure_cost(scratch, sql)
+                    finally:
+                        scratch.close()
+            except (sqlite3.Error, ValueError):
+                continue  # broken solutions are validate-lessons.py's business
+            worst["instructions"] = max(worst["instructions"], cost["instructions"])
+            worst["ms"] = max(worst["ms"], round(cost["ms"], 3))
+            worst["queries"] += 1
+    finally:
+        conn.close()
+    return worst if worst["queries"] else None
+
+
+def derive_budget(measured, headroom=DEFAULT_HEADROOM, override=None):
+    """Budget for one lesson from its measured cost and optional `queryBudget` override."""
+    budget = dict(DEFAULT_BUDGET)
+    if measured:
+        budget = {
+            "instructions": max(MIN_BUDGET["instructions"], measured["instructions"] * headroom),
+            "deadline_ms": max(MIN_BUDGET["deadline_ms"], round(measured["ms"] * headroom)),
+        }
+    if override:
+        budget["instructions"] = override.get("instructions", budget["instructions"])
+        budget["deadline_ms"] = override.get("deadlineMs", budget["deadline_ms"])
+    return budget
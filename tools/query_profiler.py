@@ -0,0 +1,114 @@
+"""
+Measure how expensive a lesson's own SQL is against its lesson-data DB.
+
+Each query (exercise solutions, starterQuery, examples[].query) is run N times
+and summarised as p50/p95 wall time, rows returned and its EXPLAIN QUERY PLAN.
+Read-only queries share one read-only connection per lesson; statements that
+write get a fresh in-memory copy per run, and the copy is not timed.
+"""
+
+import math
+import sqlite3
+import time
+
+from lesson_build import LESSON_DATA_DIR, db_path_for
+from lesson_queries import has_statement, is_write_error, iter_lesson_queries, memory_copy, open_readonly
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def query_plan(conn, sql):
+    """EXPLAIN QUERY PLAN as indented text lines, or [] if it can't be planned."""
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    except sqlite3.Error:
+        return []
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def _timed_run(conn, sql):
+    started = time.perf_counter()
+    cursor = conn.execute(sql)
+    rows = len(cursor.fetchall()) if cursor.description is not None else 0
+    return time.perf_counter() - started, rows
+
+
+def profile_query(db_path, sql, runs=5, conn=None):
+    """
+    Run `sql` `runs` times and return its profile:
+    {"status": "ok" | "error" | "skipped", "runs", "p50_ms", "p95_ms", "max_ms", "rows", "writes", "plan", "error"}
+    """
+    result = {"status": "ok", "runs": 0, "p50_ms": None, "p95_ms": None, "max_ms": None,
+              "rows": None, "writes": False, "plan": [], "error": None}
+    if not has_statement(sql):
+        # A placeholder ("-- Solution will depend on ..."), not a broken query.
+        result.update(status="skipped", error="no SQL statement")
+        return result
+
+    own_conn = conn is None
+    if own_conn:
+        conn = open_readonly(db_path)
+    samples = []
+    try:
+        result["plan"] = query_plan(conn, sql)
+        try:
+            elapsed, rows = _timed_run(conn, sql)
+        except sqlite3.OperationalError as e:
+            if not is_write_error(e):
+                raise
+            result["writes"] = True
+
+        if result["writes"]:
+            for _ in range(runs):
+                scratch = memory_copy(db_path)
+                try:
+                    elapsed, rows = _timed_run(scratch, sql)
+                finally:
+                    scratch.close()
+                samples.append(elapsed)
+        else:
+            samples.append(elapsed)
+            for _ in range(runs - 1):
+                elapsed, rows = _timed_run(conn, sql)
+                samples.append(elapsed)
+        result["rows"] = rows
+    except (sqlite3.Error, ValueError) as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    finally:
+        if own_conn:
+            conn.close()
+
+    if samples:
+        ms = [s * 1000 for s in samples]
+        result.update(runs=len(ms), p50_ms=percentile(ms, 50), p95_ms=percentile(ms, 95), max_ms=max(ms))
+    return result
+
+
+def profile_lesson(lesson, data_dir=LESSON_DATA_DIR, runs=5):
+    """Profile every query a lesson ships; returns a list of per-query dicts."""
+    db_path = db_path_for(lesson["id"], data_dir)
+    if not db_path.exists():
+        return [{"lesson": lesson["id"], "kind": "db", "query_id": db_path.name, "sql": "",
+                 "status": "error", "error": "lesson DB not found"}]
+
+    conn = open_readonly(db_path)
+    try:
+        return [
+            {"lesson": lesson["id"], "kind": kind, "query_id": query_id, "sql": sql,
+             **profile_query(db_path, sql, runs, conn)}
+            for kind, query_id, sql in iter_lesson_queries(lesson)
+        ]
+    finally:
+        conn.close()
@@ -0,0 +1,251 @@
+"""
+Compare a query result against the reference result as a multiset of rows.
+
+Rows are never held on both sides. The reference result is streamed once
+into a table of per-row hashes (a 16-byte digest and a count per distinct
+row, not the rows), the candidate result is streamed against it, and only
+rows that fail to match are kept, up to LEFTOVER_LIMIT. Duplicate rows
+count: [1, 1] is not [1].
+
+Options (per exercise, from its optional "compare" object):
+  rowOrder     rows must come back in the same order (ORDER BY exercises)
+  columnOrder  columns must come back in the same order; otherwise columns
+               are matched by name
+  tolerance    relative tolerance for numbers, so 1 and 1.0000001 from AVG()
+               compare equal; 0 means exact
+  maxDiff      how many missing/extra rows to report
+
+Numbers are rounded to a few more significant digits than the tolerance
+allows before hashing, so hash-equal numbers are always within tolerance.
+Numbers that are within tolerance but round differently end up as
+leftovers and are paired up afterwards with a (NumPy-vectorized, when NumPy
+is installed) closeness check.
+"""
+
+import hashlib
+import math
+from collections import Counter, defaultdict, deque
+
+from expected_results import canonical_value
+
+try:
+    import numpy as np
+except ImportError:  # optional: the pure Python path gives the same answers
+    np = None
+
+DEFAULT_OPTIONS = {"rowOrder": False, "columnOrder": False, "tolerance": 1e-6, "maxDiff": 10}
+ABS_TOLERANCE = 1e-9
+
+# Unmatched rows kept per side for tolerant pairing and the diff.
+LEFTOVER_LIMIT = 10_000
+
+
+def compare_options(exercise=None, **overrides):
+    """Defaults, overlaid with an exercise's "compare" object and any overrides."""
+    options = dict(DEFAULT_OPTIONS)
+    if exercise and isinstance(exercise.get("compare"), dict):
+        options.update(exercise["compare"])
+    options.update({k: v for k, v in overrides.items() if v is not None})
+    return options
+
+
+def column_mapping(expected_columns, actual_columns, column_order=False):
+    """
+    For each expected column, the index of the matching actual column, or
+    None if the two results don't have the same columns.
+    """
+    if column_order:
+        return list(range(len(actual_columns))) if list(expected_columns) == list(actual_columns) else None
+    if sorted(expected_columns) != sorted(actual_columns):
+        return None
+    positions = defaultdict(deque)
+    for i, name in enumerate(actual_columns):
+        positions[name].append(i)
+    return [positions[name].popleft() for name in expected_columns]
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _significant_digits(tolerance):
+    # One more digit than the tolerance resolves: rounding can then only
+    # merge numbers that are already within tolerance of each other.
+    return max(1, math.ceil(-math.log10(tolerance)) + 1) if tolerance else None
+
+
+def _hash_cell(value, digits):
+    if digits and isinstance(value, float) and math.isfinite(value):
+        if abs(value) <= ABS_TOLERANCE:
+            return "i:0"
+        value = float(f"{value:.{digits}g}")
+    return canonical_value(value)
+
+
+def row_hash(row, digits=None):
+    text = "\x1f".join(_hash_cell(value, digits) for value in row)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _close(a, b, tolerance):
+    if _is_number(a) and _is_number(b):
+        if a == b:
+            return True
+        # Tolerance is for computed values: two integers (counts, ids) must match exactly.
+        if not tolerance or (isinstance(a, int) and isinstance(b, int)):
+            return False
+        return abs(a - b) <= max(tolerance * max(abs(a), abs(b)), ABS_TOLERANCE)
+    return canonical_value(a) == canonical_value(b)
+
+
+def rows_close(a, b, tolerance):
+    return len(a) == len(b) and all(_close(x, y, tolerance) for x, y in zip(a, b))
+
+
+def _exact_part(row):
+    """Everything about a row except the values of its numeric cells."""
+    return tuple("#" if _is_number(v) else canonical_value(v) for v in row)
+
+
+def _pair_leftovers(missing, extra, tolerance):
+    """
+    Pair rows that are within tolerance of each other; returns the rows of
+    each side that found no partner.
+    """
+    groups = defaultdict(list)
+    for i, row in enumerate(extra):
+        groups[_exact_part(row)].append(i)
+    used = [False] * len(extra)
+    unmatched = []
+
+    for row in missing:
+        candidates = [i for i in groups.get(_exact_part(row), ()) if not used[i]]
+        match = None
+        if candidates and np is not None:
+            # Vectorized prefilter over every candidate, confirmed exactly below.
+            numeric = [j for j, v in enumerate(row) if _is_number(v)]
+            want = np.array([row[j] for j in numeric], dtype=float)
+            have = np.array([[extra[i][j] for j in numeric] for i in candidates], dtype=float)
+            allowed = np.maximum(tolerance * np.maximum(np.abs(have), np.abs(want)), ABS_TOLERANCE)
+            hits = np.flatnonzero((np.abs(have - want) <= allowed).all(axis=1))
+            match = next((candidates[h] for h in hits if rows_close(row, extra[candidates[h]], tolerance)), None)
+        else:
+            match = next((i for i in candidates if rows_close(row, extra[i], tolerance)), None)
+        if match is None:
+            unmatched.append(row)
+        else:
+            used[match] = True
+    return unmatched, [row for i, row in enumerate(extra) if not used[i]]
+
+
+def _result(equal, expected_count, actual_count, missing, extra, missing_count, extra_count, options, reason=None):
+    limit = options["maxDiff"]
+    return {
+        "equal": equal,
+        "reason": reason,
+        "expected_rows": expected_count,
+        "actual_rows": actual_count,
+        "missing_count": missing_count,
+        "extra_count": extra_count,
+        "missing": [list(row) for row in missing[:limit]],
+        "extra": [list(row) for row in extra[:limit]],
+    }
+
+
+def _compare_ordered(expected_rows, actual_rows, mapping, options):
+    tolerance = options["tolerance"]
+    missing, extra = [], []
+    missing_count = extra_count = expected_count = actual_count = 0
+    sentinel = object()
+    expected_iter, actual_iter = iter(expected_rows), iter(actual_rows)
+    while True:
+        want = next(expected_iter, sentinel)
+        have = next(actual_iter, sentinel)
+        if want is sentinel and have is sentinel:
+            break
+        if have is not sentinel:
+            actual_count += 1
+            have = tuple(have[i] for i in mapping)
+        if want is not sentinel:
+            expected_count += 1
+        if want is not sentinel and have is not sentinel and rows_close(tuple(want), have, tolerance):
+            continue
+        if want is not sentinel:
+            missing_count += 1
+            if len(missing) < options["maxDiff"]:
+                missing.append(want)
+        if have is not sentinel:
+            extra_count += 1
+            if len(extra) < options["maxDiff"]:
+                extra.append(have)
+    equal = not missing_count and not extra_count
+    reason = None if equal else "rows differ (row order matters for this exercise)"
+    return _result(equal, expected_count, actual_count, missing, extra, missing_count, extra_count, options, reason)
+
+
+def compare_results(expected, actual, options=None):
+    """
+    Compare two results.
+
+    `expected` is a zero-argument callable returning (columns, rows); it is
+    called a second time only when rows are missing, to recover them for the
+    diff. `actual` is (columns, rows). `rows` may be any iterable, e.g. a live
+    cursor. Returns {"equal", "reason", "expected_rows", "actual_rows",
+    "missing_count", "extra_count", "missing", "extra"}; diff rows are in the
+    expected column order.
+    """
+    options = compare_options(**(options or {}))
+    expected_columns, expected_rows = expected()
+    actual_columns, actual_rows = actual
+
+    mapping = column_mapping(expected_columns, actual_columns, options["columnOrder"])
+    if mapping is None:
+        reason = (f"columns differ: expected {list(expected_columns)}, got {list(actual_columns)}")
+        return _result(False, None, None, [], [], 0, 0, options, reason)
+    if options["rowOrder"]:
+        return _compare_ordered(expected_rows, actual_rows, mapping, options)
+
+    digits = _significant_digits(options["tolerance"])
+    remaining = Counter()
+    expected_count = 0
+    for row in expected_rows:
+        remaining[row_hash(row, digits)] += 1
+        expected_count += 1
+
+    extra, extra_count, actual_count = [], 0, 0
+    for row in actual_rows:
+        actual_count += 1
+        row = tuple(row[i] for i in mapping)
+        key = row_hash(row, digits)
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            extra_count += 1
+            if len(extra) < LEFTOVER_LIMIT:
+                extra.append(row)
+
+    missing_count = sum(remaining.values())
+    if not missing_count and not extra_count:
+        return _result(True, expected_count, actual_count, [], [], 0, 0, options)
+
+    # Second pass over the reference result, only for the rows we lack.
+    missing = []
+    if missing_count:
+        _, rows = expected()
+        for row in rows:
+            key = row_hash(row, digits)
+            if remaining[key]:
+                remaining[key] -= 1
+                missing.append(tuple(row))
+                if len(missing) >= LEFTOVER_LIMIT:
+                    break
+
+    complete = missing_count == len(missing) and extra_count == len(extra)
+    if options["tolerance"] and missing and extra and complete:
+        missing, extra = _pair_leftovers(missing, extra, options["tolerance"])
+        missing_count, extra_count = len(missing), len(extra)
+        if not missing and not extra:
+            return _result(True, expected_count, actual_count, [], [], 0, 0, options)
+
+    reason = f"{missing_count} expected row(s) missing, {extra_count} unexpected row(s)"
+    return _result(False, expected_count, actual_count, missing, extra, missing_count, extra_count, options, reason)
@@ -0,0 +1,117 @@
+"""
+Check exercise solutions against a lesson's real lesson-data DB before they
+are written into the lesson, so generated content can't ship a solution that
+names a table the lesson doesn't have or never finishes.
+
+Each solution goes through two stages:
+
+  compile  `EXPLAIN <sql>` prepares the statement without running it, which
+           catches syntax errors and unknown tables/columns for the price of
+           a parse
+  execute  the statement is run under the lesson's query budget
+           (query_governor.governed) and at most MAX_ROWS rows are fetched;
+           writes run on an in-memory copy so the shipped DB is never touched
+
+Lessons are checked across a process pool when there are enough of them.
+"""
+
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from lesson_build import LESSON_DATA_DIR, db_path_for
+from lesson_queries import has_statement, is_write_error, iter_exercises, memory_copy, open_readonly
+from query_governor import QueryLimitExceeded, budget_for, default_budgets_path, governed, load_budgets
+
+# Enough rows to prove a query produces results; the rest is never fetched.
+MAX_ROWS = 1000
+
+# Checking a lesson opens its DB, so a pool pays off sooner than for JSON checks.
+PARALLEL_THRESHOLD = 16
+
+
+def compile_error(conn, sql):
+    """Why `sql` can't be prepared on `conn`, or None if it compiles."""
+    if not has_statement(sql):
+        return "solution has no SQL statement"
+    try:
+        conn.execute(f"EXPLAIN {sql}").close()
+    except (sqlite3.Error, ValueError) as e:
+        return f"does not compile: {e}"
+    return None
+
+
+def _execute(conn, sql, budget):
+    with governed(conn, budget):
+        cursor = conn.execute(sql)
+        if cursor.description is not None:
+            cursor.fetchmany(MAX_ROWS)
+        cursor.close()
+
+
+def execute_error(db_path, conn, sql, budget):
+    """Why `sql` fails or runs away when executed, or None if it runs."""
+    try:
+        try:
+            _execute(conn, sql, budget)
+        except sqlite3.OperationalError as e:
+            if not is_write_error(e):
+                raise
+            scratch = memory_copy(db_path)
+            try:
+                _execute(scratch, sql, budget)
+            finally:
+                scratch.close()
+    except QueryLimitExceeded as e:
+        return str(e)
+    except (sqlite3.Error, ValueError) as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def check_lesson(lesson, data_dir=LESSON_DATA_DIR, budget=None):
+    """
+    Check every solution in one lesson. Returns a list of
+    (exercise_id, message) for the ones that fail; empty means all good.
+    """
+    lesson_id = lesson.get("id")
+    exercises = [(exercise_id, sql) for _, exercise_id, sql in iter_exercises(lesson)]
+    db_path = db_path_for(lesson_id, data_dir)
+    if not db_path.exists():
+        return [(exercise_id, f"no lesson DB at {db_path.name}") for exercise_id, _ in exercises]
+    if budget is None:
+        budget = budget_for(load_budgets(default_budgets_path(data_dir)), lesson_id)
+
+    failures = []
+    conn = open_readonly(db_path)
+    try:
+        for exercise_id, sql in exercises:
+            message = compile_error(conn, sql) or execute_error(db_path, conn, sql, budget)
+            if message:
+                failures.append((exercise_id, message))
+    finally:
+        conn.close()
+    return failures
+
+
+def _check_chunk(lessons, data_dir):
+    return [(lesson.get("id"), check_lesson(lesson, data_dir)) for lesson in lessons]
+
+
+def check_lessons(lessons, data_dir=LESSON_DATA_DIR, jobs=0):
+    """
+    Check many lessons, returning {lesson_id: failures} (see check_lesson).
+    jobs=0 means one worker per core.
+    """
+    lessons = list(lessons)
+    data_dir = Path(data_dir)
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1 or len(lessons) < PARALLEL_THRESHOLD:
+        results = _check_chunk(lessons, data_dir)
+    else:
+        chunks = [lessons[i::jobs] for i in range(jobs)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = [r for chunk in pool.map(_check_chunk, chunks, [data_dir] * jobs) for r in chunk]
+    return dict(results)
@@ -0,0 +1,317 @@
+"""
+Deterministic synthetic data for a lesson's declared schema.
+
+grow_lesson(lesson, rows, seed) returns row sources that the DB builder can
+stream straight into SQLite: the lesson's own sample_data first (solutions
+refer to those rows), then generated rows up to the target count. Nothing is
+collected into lists, so memory stays flat from 10^4 to 10^7 rows.
+
+How values are chosen:
+  * integer primary keys continue after the largest sample key
+  * foreign keys (REFERENCES ... or <name>_id naming) point at existing parent
+    keys with a Zipf-like skew, so a few parents own most children
+  * numeric columns follow a log-normal fitted to the sample values
+  * low-cardinality text (category, status, ...) reuses the sample values
+    with skewed weights; names, emails and other text get realistic fakes
+  * dates spread over the sample range (or 2020-2025)
+  * the NULL rate of each column matches its sample data
+Tables that other tables reference are grown to about sqrt(rows) so that
+joins fan out realistically; every other table gets the full row count.
+"""
+
+import itertools
+import math
+import random
+import re
+from datetime import date, datetime, timedelta
+
+FIRST_NAMES = ["Alice", "Bob", "Charlie", "Diana", "Ethan", "Fatima", "George", "Hana", "Ivan", "Julia",
+               "Kenji", "Laura", "Mohammed", "Nina", "Omar", "Priya", "Quinn", "Rosa", "Sam", "Tara",
+               "Umar", "Vera", "Wei", "Ximena", "Yusuf", "Zoe"]
+LAST_NAMES = ["Smith", "Johnson", "Garcia", "Brown", "Khan", "Lee", "Martin", "Nguyen", "Patel", "Rossi",
+              "Silva", "Tanaka", "Williams", "Young", "Zhang", "Kowalski", "Muller", "Dubois", "Ivanova"]
+CITIES = ["New York", "London", "Paris", "Berlin", "Tokyo", "Mumbai", "Sydney", "Toronto", "Madrid",
+          "Chicago", "Boston", "Seattle", "Austin", "Dublin", "Singapore"]
+WORDS = ["alpha", "bright", "cedar", "delta", "ember", "falcon", "granite", "harbor", "indigo", "jade",
+         "kernel", "lumen", "maple", "nova", "orbit", "pixel", "quartz", "river", "summit", "tundra"]
+
+DEFAULT_DATE_RANGE = (date(2020, 1, 1), date(2025, 12, 31))
+CATEGORICAL_MAX_DISTINCT = 12
+_REFERENCES_RE = re.compile(r"REFERENCES\s+(\w+)\s*\(\s*(\w+)\s*\)", re.IGNORECASE)
+
+
+# === Schema analysis ===
+
+def primary_key(table):
+    for col in table["columns"]:
+        if "PRIMARY KEY" in (col.get("constraints") or "").upper():
+            return col["name"]
+    return None
+
+
+def is_integer_type(col_type):
+    return "INT" in col_type.upper()
+
+
+def find_foreign_keys(schema, sample_data):
+    """
+    {(table, column): (parent_table, parent_column)} from explicit REFERENCES
+    constraints, falling back to <name>_id naming and the sample data.
+    """
+    tables = {t["name"]: t for t in schema.get("tables", [])}
+    pks = {name: primary_key(t) for name, t in tables.items()}
+    fks = {}
+    for name, table in tables.items():
+        for col in table["columns"]:
+            col_name = col["name"]
+            match = _REFERENCES_RE.search(col.get("constraints") or "")
+            if match and match.group(1) in tables:
+                fks[(name, col_name)] = (match.group(1), match.group(2))
+                continue
+            if col_name == pks[name] or not col_name.lower().endswith("_id"):
+                continue
+            parent = _guess_parent(col_name, name, tables, pks, sample_data)
+            if parent:
+                fks[(name, col_name)] = parent
+    return fks
+
+
+def _guess_parent(col_name, table_name, tables, pks, sample_data):
+    stem = col_name[:-3].lower()
+    for other, pk in pks.items():
+        if other != table_name and pk and pk.lower() == col_name.lower():
+            return other, pk
+    for other, pk in pks.items():
+        if other == table_name or not pk:
+            continue
+        lowered = other.lower()
+        if lowered in (stem, stem + "s", stem + "es", stem[:-1] + "ies") or lowered.startswith(stem):
+            return other, pk
+    # Self reference (manager_id, parent_id, ...): every sample value is one of our own keys.
+    own_pk = pks.get(table_name)
+    rows = sample_data.get(table_name) or []
+    values = {row.get(col_name) for row in rows} - {None}
+    if own_pk and values and values <= {row.get(own_pk) for row in rows}:
+        return table_name, own_pk
+    return None
+
+
+def table_order(schema, fks):
+    """Tables ordered so that parents come before the tables that reference them."""
+    names = [t["name"] for t in schema.get("tables", [])]
+    deps = {name: {parent for (child, _), (parent, _) in fks.items() if child == name and parent != name}
+            for name in names}
+    ordered, done = [], set()
+
+    def visit(name, stack=()):
+        if name in done or name in stack:
+            return
+        for parent in sorted(deps[name]):
+            visit(parent, stack + (name,))
+        done.add(name)
+        ordered.append(name)
+
+    for name in names:
+        visit(name)
+    return ordered
+
+
+def target_counts(schema, fks, rows):
+    parents = {parent for (child, _), (parent, _) in fks.items() if child != parent}
+    dimension_rows = max(10, int(math.sqrt(rows)))
+    return {t["name"]: (min(rows, dimension_rows) if t["name"] in parents else rows)
+            for t in schema.get("tables", [])}
+
+
+# === Key spaces ===
+
+class KeySpace:
+    """
+    The primary keys of a table: its sample keys followed by generated keys.
+    Key number i is computed on demand, never stored.
+    """
+
+    def __init__(self, sample_keys, total, integer, prefix):
+        self.sample_keys = list(sample_keys)
+        self.total = max(total, len(self.sample_keys))
+        self.integer = integer
+        self.prefix = prefix
+        numeric = [k for k in self.sample_keys if isinstance(k, int)]
+        self.start = (max(numeric) if numeric else 0) + 1
+
+    def key(self, i):
+        if i < len(self.sample_keys):
+            return self.sample_keys[i]
+        n = i - len(self.sample_keys)
+        return self.start + n if self.integer else f"{self.prefix}{self.start + n}"
+
+    def pick(self, rng, skew=1.1):
+        # Bounded Zipf-like draw: low indexes (the "popular" parents) come up most.
+        i = int(self.total * (rng.random() ** (1 + skew))) if self.total else 0
+        return self.key(min(i, self.total - 1))
+
+
+# === Column generators ===
+
+def _sample_values(rows, col_name):
+    return [row.get(col_name) for row in rows]
+
+
+def _null_rate(values):
+    return (sum(1 for v in values if v is None) / len(values)) if values else 0.0
+
+
+def _lognormal_params(numbers):
+    positive = [float(v) for v in numbers if isinstance(v, (int, float)) and v > 0]
+    if not positive:
+        return math.log(50.0), 1.0
+    logs = [math.log(v) for v in positive]
+    mu = sum(logs) / len(logs)
+    sigma = math.sqrt(sum((x - mu) ** 2 for x in logs) / len(logs)) if len(logs) > 1 else 0.5
+    return mu, max(sigma, 0.25)
+
+
+def _parse_date(value):
+    for fmt, kind in (("%Y-%m-%d %H:%M:%S", "datetime"), ("%Y-%m-%d", "date")):
+        try:
+            return datetime.strptime(value, fmt), kind
+        except (TypeError, ValueError):
+            continue
+    return None, None
+
+
+def column_generator(col, table_name, sample_rows, rng):
+    """Return a function (row_number) -> value for one non-key column."""
+    name = col["name"]
+    lowered = name.lower()
+    col_type = (col.get("type") or "TEXT").upper()
+    constraints = (col.get("constraints") or "").upper()
+    values = _sample_values(sample_rows, name)
+    present = [v for v in values if v is not None]
+    null_rate = 0.0 if "NOT NULL" in constraints else _null_rate(values)
+    # Unique columns never draw from a small pool (categories, cities, first
+    # names): repeats would break the constraint as the row count grows.
+    unique = "UNIQUE" in constraints or "PRIMARY KEY" in constraints
+
+    def with_nulls(fn):
+        if not null_rate:
+            return fn
+        return lambda n: None if rng.random() < null_rate else fn(n)
+
+    if col_type == "BOOLEAN" or (present and all(v in (0, 1, True, False) for v in present) and "BOOL" in col_type):
+        p = (sum(1 for v in present if v) / len(present)) if present else 0.5
+        return with_nulls(lambda n: 1 if rng.random() < p else 0)
+
+    if any(t in col_type for t in ("DATE", "TIME")):
+        parsed = [_parse_date(v) for v in present]
+        stamps = [p for p, _ in parsed if p]
+        kind = next((k for _, k in parsed if k), "datetime" if "TIME" in col_type else "date")
+        if stamps:
+            low, high = min(stamps), max(stamps)
+            if (high - low).days < 30:
+                low, high = low - timedelta(days=365), high + timedelta(days=365)
+        else:
+            low, high = (datetime.combine(d, datetime.min.time()) for d in DEFAULT_DATE_RANGE)
+        span = int((high - low).total_seconds())
+        fmt = "%Y-%m-%d %H:%M:%S" if kind == "datetime" else "%Y-%m-%d"
+        return with_nulls(lambda n: (low + timedelta(seconds=rng.randrange(span + 1))).strftime(fmt))
+
+    if is_integer_type(col_type) or any(t in col_type for t in ("REAL", "NUM", "DEC", "FLOAT", "DOUBLE")):
+        integer = is_integer_type(col_type)
+        if unique:
+            # Count up from past the largest seeded value so no generated
+            # value can equal one already in sample_data.
+            seeded = [v for v in present if isinstance(v, (int, float)) and not isinstance(v, bool)]
+            counter = itertools.count(max(0, math.floor(max(seeded, default=0))) + 1)
+            return lambda n: next(counter)
+        mu, sigma = _lognormal_params(present)
+        if integer:
+            return with_nulls(lambda n: max(0, int(round(rng.lognormvariate(mu, sigma)))))
+        return with_nulls(lambda n: round(rng.lognormvariate(mu, sigma), 2))
+
+    # Text
+    distinct = sorted(set(map(str, present)))
+    if "email" in lowered:
+        return with_nulls(lambda n: f"{rng.choice(FIRST_NAMES).lower()}.{rng.choice(LAST_NAMES).lower()}{n}@example.com")
+    if not unique and ((distinct and len(distinct) <= CATEGORICAL_MAX_DISTINCT and len(present) > len(distinct))
+                       or lowered in ("category", "status", "department", "role", "region", "type", "country")):
+        choices = distinct or [f"{name}_{i}" for i in range(1, 6)]
+        weights = [1 / (rank + 1) for rank in range(len(choices))]
+        return with_nulls(lambda n: rng.choices(choices, weights)[0])
+    if "name" in lowered and not any(w in lowered for w in ("product", "title", "table", "file")):
+        if lowered in ("first_name", "firstname") and not unique:
+            return with_nulls(lambda n: rng.choice(FIRST_NAMES))
+        if lowered in ("last_name", "lastname", "surname") and not unique:
+            return with_nulls(lambda n: rng.choice(LAST_NAMES))
+        suffix = (lambda n: f" {n}") if unique else (lambda n: "")
+        return with_nulls(lambda n: f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}{suffix(n)}")
+    if ("city" in lowered or "location" in lowered) and not unique:
+        return with_nulls(lambda n: rng.choice(CITIES))
+    base = distinct or [name.replace("_", " ").title()]
+    return with_nulls(lambda n: f"{rng.choice(base)} {rng.choice(WORDS).title()} {n}")
+
+
+# === Row streams ===
+
+def _generated_rows(table, count, keyspaces, fks, sample_rows, seed):
+    """Yield `count` generated rows (tuples, in column order) for one table."""
+    rng = random.Random(f"{seed}:{table['name']}")
+    own = keyspaces[table["name"]]
+    pk = primary_key(table)
+    makers = []
+    for col in table["columns"]:
+        name = col["name"]
+        if name == pk:
+            makers.append(lambda n, i: own.key(i))
+        elif (table["name"], name) in fks:
+            parent, _ = fks[(table["name"], name)]
+            space = keyspaces[parent]
+            if parent == table["name"]:
+                # Self reference: point at an earlier row so hierarchies stay acyclic.
+                makers.append(lambda n, i, space=space: None if i == 0 else space.key(int(i * rng.random() ** 2)))
+            else:
+                makers.append(lambda n, i, space=space: space.pick(rng))
+        else:
+            gen = column_generator(col, table["name"], sample_rows, rng)
+            makers.append(lambda n, i, gen=gen: gen(n))
+
+    first = len(sample_rows)
+    for i in range(first, first + count):
+        n = own.key(i) if pk else i + 1
+        yield tuple(make(n, i) for make in makers)
+
+
+def grow_lesson(lesson, rows, seed=0):
+    """
+    Row sources for every table of a lesson grown to about `rows` rows:
+    {table_name: (columns, iterator_of_tuples)}, in dependency order.
+    """
+    schema = lesson.get("schema", {}) or {}
+    sample_data = lesson.get("sample_data", {}) or {}
+    fks = find_foreign_keys(schema, sample_data)
+    counts = target_counts(schema, fks, rows)
+    tables = {t["name"]: t for t in schema.get("tables", [])}
+
+    keyspaces = {}
+    for name, table in tables.items():
+        pk = primary_key(table)
+        pk_col = next((c for c in table["columns"] if c["name"] == pk), None)
+        sample_keys = [row.get(pk) for row in sample_data.get(name, [])] if pk else []
+        keyspaces[name] = KeySpace(sample_keys, counts[name], is_integer_type(pk_col["type"]) if pk_col else True,
+                                   prefix=f"{name[:3].upper()}-")
+
+    sources = {}
+    for name in table_order(schema, fks):
+        table = tables[name]
+        columns = [c["name"] for c in table["columns"]]
+        sample_rows = sample_data.get(name, []) or []
+        extra = max(0, counts[name] - len(sample_rows))
+        sources[name] = (columns, _chain_rows(columns, sample_rows,
+                                              _generated_rows(table, extra, keyspaces, fks, sample_rows, seed)))
+    return sources
+
+
+def _chain_rows(columns, sample_rows, generated):
+    for row in sample_rows:
+        yield tuple(row.get(col) for col in columns)
+    yield from generated
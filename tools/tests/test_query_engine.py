@@ -0,0 +1,109 @@
+import http.client
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from query_engine import LessonPool, QueryEngine, make_server  # noqa: E402
+
+
+def _make_db(path, value):
+    tmp_path = path.with_suffix(".tmp")
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("CREATE TABLE t (v INTEGER)")
+    conn.execute("INSERT INTO t VALUES (?)", (value,))
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, path)
+
+
+class LessonPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.dir.name) / "lesson_t.db"
+        _make_db(self.db_path, 1)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_waiter_gets_a_connection_when_db_is_rebuilt_under_it(self):
+        pool = LessonPool(self.db_path, size=1)
+        held = pool.acquire()
+        _make_db(self.db_path, 2)
+
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire()), daemon=True)
+        waiter.start()
+        waiter.join(0.2)
+        self.assertTrue(waiter.is_alive(), "pool of 1 should make the second caller wait")
+
+        pool.release(*held)
+        waiter.join(2)
+        self.assertFalse(waiter.is_alive(), "waiter still blocked after a stale release")
+        generation, conn = got[0]
+        self.assertEqual(conn.execute("SELECT v FROM t").fetchone(), (2,))
+        pool.release(generation, conn)
+        self.assertEqual(pool.open_connections, 1)
+        pool.close()
+
+    def test_current_connection_is_handed_to_waiter(self):
+        pool = LessonPool(self.db_path, size=1)
+        held = pool.acquire()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire()), daemon=True)
+        waiter.start()
+        pool.release(*held)
+        waiter.join(2)
+        self.assertFalse(waiter.is_alive())
+        self.assertIs(got[0][1], held[1])
+        pool.release(*got[0])
+        pool.close()
+
+
+class CompareRequestTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        _make_db(Path(self.dir.name) / "lesson_t.db", 1)
+        self.engine = QueryEngine(self.dir.name, workers=1, budgets=Path(self.dir.name) / "none.json")
+        self.server = make_server(self.engine, port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.engine.close()
+        self.dir.cleanup()
+
+    def post(self, payload):
+        conn = http.client.HTTPConnection(*self.server.server_address, timeout=5)
+        try:
+            conn.request("POST", "/compare", json.dumps(payload), {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            conn.close()
+
+    def test_valid_rows_are_graded(self):
+        status, body = self.post({"lessonId": "t", "solution": "SELECT v FROM t", "columns": ["v"], "rows": [[1]]})
+        self.assertEqual(status, 200)
+        self.assertTrue(body["equal"])
+
+    def test_malformed_input_is_a_400_not_a_dropped_connection(self):
+        base = {"lessonId": "t", "solution": "SELECT v FROM t", "columns": ["v"], "rows": [[1]]}
+        for bad in ({"options": {"tolerance": "x"}}, {"options": {"maxDiff": -1}}, {"options": {"rowOrder": 1}},
+                    {"rows": [[1, 2]]}, {"rows": [{"v": 1}]}, {"rows": [[[1]]]}, {"columns": [1]},
+                    {"columns": None}):
+            with self.subTest(bad=bad):
+                status, body = self.post({**base, **bad})
+                self.assertEqual(status, 400)
+                self.assertFalse(body["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
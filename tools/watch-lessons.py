@@ -0,0 +1,65 @@
+import argparse
+from pathlib import Path
+
+from lesson_build import LESSON_CONTENT_DIR, LESSON_DATA_DIR, lesson_files
+from lesson_schema import RULE_SETS
+from lesson_watch import DEFAULT_DEBOUNCE, DEFAULT_INTERVAL, LessonWatcher
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Watch lesson-content and revalidate/rebuild only the lesson that was saved")
+    parser.add_argument("--content-dir", type=Path, default=LESSON_CONTENT_DIR)
+    parser.add_argument("--data-dir", type=Path, default=LESSON_DATA_DIR)
+    parser.add_argument("--catalog", type=Path, help="catalog DB to keep current (default: <data-dir>/catalog.db)")
+    parser.add_argument("--rules", default=",".join(RULE_SETS),
+                        help=f"comma-separated rule sets to run (available: {', '.join(RULE_SETS)})")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between polls")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="seconds a file must be quiet before it is processed")
+    parser.add_argument("--once", action="store_true",
+                        help="process every lesson once and exit instead of watching")
+    return parser.parse_args()
+
+
+def print_report(report):
+    total_ms = sum(report["steps"].values()) * 1000
+    label = f"{report['file']} ({report['lesson']})" if report["lesson"] else report["file"]
+    for issue in report["issues"]:
+        icon = "❌" if issue["severity"] == "error" else "⚠️"
+        print(f"   {icon} {issue['path'] or issue['rule']}: {issue['message']}")
+    if report["status"] != "ok":
+        print(f"❌ {label}: not rebuilt, fix the errors above ({total_ms:.0f} ms)")
+        return
+    steps = " · ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in report["steps"].items())
+    actions = ", ".join(report["actions"]) or "nothing to rebuild"
+    print(f"✅ {label}: {actions} — {steps} — {total_ms:.0f} ms total")
+
+
+def print_removal(name, lesson_id):
+    print(f"🗑️ {name} deleted" + (f", removed lesson {lesson_id}" if lesson_id else ""))
+
+
+def main():
+    args = parse_args()
+    rules = [name.strip() for name in args.rules.split(",") if name.strip()]
+    unknown = [name for name in rules if name not in RULE_SETS]
+    if unknown:
+        raise SystemExit(f"Unknown rule set(s): {', '.join(unknown)}")
+
+    watcher = LessonWatcher(args.content_dir, args.data_dir, args.catalog, rules)
+    try:
+        if args.once:
+            for path in lesson_files(args.content_dir):
+                print_report(watcher.process(path.name))
+            return
+        print(f"👀 Watching {args.content_dir} (Ctrl+C to stop)...")
+        watcher.watch(print_report, print_removal, interval=args.interval, debounce=args.debounce)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching.")
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()